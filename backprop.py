@@ -1,9 +1,16 @@
 from manim import *
 import numpy as np
 import random
+import draft
+from group_fade import GroupFadeOut
+from instanced import InstancedGroup, instanced_drawing
+from training import StreamingCurve, Train, TrainingRun
 
 
 class BackpropExplainer(Scene):
+    def setup(self):
+        instanced_drawing(self.renderer.camera)
+
     def construct(self):
         # Title
         title = Text("Backpropagation", font_size=48)
@@ -35,6 +42,7 @@ class BackpropExplainer(Scene):
         self.show_forward_pass()
         self.show_loss_computation()
         self.show_backward_pass()
+        self.show_training()
         
         # Conclusion
         conclusion = Text("Backpropagation: The Foundation of Deep Learning", font_size=40)
@@ -50,10 +58,10 @@ class BackpropExplainer(Scene):
         
         # Create layers
         for i, size in enumerate(layer_sizes):
-            layer = VGroup(*[
-                Circle(radius=0.25, fill_opacity=0.8, fill_color=BLUE if i < len(layer_sizes)-1 else GREEN)
-                for _ in range(size)
-            ]).arrange(DOWN, buff=0.4)
+            layer = InstancedGroup(
+                Circle(radius=0.25, fill_opacity=0.8, fill_color=BLUE if i < len(layer_sizes)-1 else GREEN),
+                size
+            ).arrange(DOWN, buff=0.4)
             
             # Add layer label
             if i == 0:
@@ -109,11 +117,11 @@ class BackpropExplainer(Scene):
         nn_group.scale(0.9).center()
         
         # Add formula for neuron computation
-        formula_text = MathTex(
+        formula_text = draft.tex(
             "z_j^{(l)} = \\sum_i w_{ji}^{(l)} a_i^{(l-1)} + b_j^{(l)}"
         ).scale(0.8)
         
-        activation_text = MathTex(
+        activation_text = draft.tex(
             "a_j^{(l)} = \\sigma(z_j^{(l)})"
         ).scale(0.8)
         
@@ -142,7 +150,7 @@ class BackpropExplainer(Scene):
         # Show incoming connections
         incoming_edges = []
         for edge in edge_groups[1]:
-            if edge.get_end() == selected_neuron.get_left():
+            if np.allclose(edge.get_end(), selected_neuron.get_left()):
                 incoming_edges.append(edge)
         
         self.play(
@@ -161,7 +169,7 @@ class BackpropExplainer(Scene):
             color=YELLOW
         ).scale(0.3)
         
-        activation_curve.next_to(selected_neuron, UP, buff=0.5)
+        activation_curve.next_to(selected_neuron.get_top(), UP, buff=0.5)
         activation_label = Text("σ(x)", font_size=16).next_to(activation_curve, UP, buff=0.1)
         
         self.play(
@@ -208,11 +216,10 @@ class BackpropExplainer(Scene):
         
         # Use the network from the previous section
         network = self.network
-        edges = self.edges
         edge_groups = self.edge_groups
         
         # Create data flow
-        input_data = MathTex("\\mathbf{x} = [0.2, 0.7, -0.1]").scale(0.8)
+        input_data = draft.tex("\\mathbf{x} = [0.2, 0.7, -0.1]").scale(0.8)
         input_data.next_to(network[0], LEFT, buff=1)
         
         # Animate
@@ -222,7 +229,7 @@ class BackpropExplainer(Scene):
         # Activate input layer neurons
         input_neurons = network[0][0]
         self.play(
-            *[neuron.animate.set_fill(YELLOW) for neuron in input_neurons],
+            input_neurons.animate.set_fill(YELLOW),
             run_time=1
         )
         
@@ -230,24 +237,23 @@ class BackpropExplainer(Scene):
         for i in range(1, len(network)):
             # Light up the edges from previous layer
             self.play(
-                *[edge.animate.set_stroke(YELLOW, width=2, opacity=1) 
-                  for edge in edge_groups[i-1]],
+                edge_groups[i-1].animate.set_stroke(YELLOW, width=2, opacity=1),
                 run_time=1
             )
             
             # Activate the current layer
             current_neurons = network[i][0]
             self.play(
-                *[neuron.animate.set_fill(YELLOW) for neuron in current_neurons],
+                current_neurons.animate.set_fill(YELLOW),
                 run_time=1
             )
             
             # Create computation visualization for first neuron in layer
             if i < len(network) - 1:  # Not for the output layer
-                weighted_sum = MathTex("\\sum w_{ji} a_i + b_j").scale(0.7)
-                weighted_sum.next_to(current_neurons[0], UP, buff=0.4)
+                weighted_sum = draft.tex("\\sum w_{ji} a_i + b_j").scale(0.7)
+                weighted_sum.next_to(current_neurons[0].get_top(), UP, buff=0.4)
                 
-                activation = MathTex("\\sigma(z_j)").scale(0.7)
+                activation = draft.tex("\\sigma(z_j)").scale(0.7)
                 activation.next_to(weighted_sum, UP, buff=0.2)
                 
                 self.play(Write(weighted_sum))
@@ -259,7 +265,7 @@ class BackpropExplainer(Scene):
                 )
         
         # Show predicted output
-        output_value = MathTex("\\hat{y} = [0.85, 0.23]").scale(0.8)
+        output_value = draft.tex("\\hat{y} = [0.85, 0.23]").scale(0.8)
         output_value.next_to(network[-1], RIGHT, buff=1)
         
         self.play(Write(output_value))
@@ -277,9 +283,9 @@ class BackpropExplainer(Scene):
         
         # Reset colors for next section but keep network visible
         self.play(
-            *[neuron.animate.set_fill(BLUE) for group in network for neuron in group[0] if isinstance(neuron, Circle) and neuron.get_fill_color() != GREEN],
-            *[neuron.animate.set_fill(GREEN) for neuron in network[-1][0]],
-            *[edge.animate.set_stroke(WHITE, width=1, opacity=0.6) for edge in edges]
+            *[group[0].animate.set_fill(BLUE) for group in network[:-1]],
+            network[-1][0].animate.set_fill(GREEN),
+            *[group.animate.set_stroke(WHITE, width=1, opacity=0.6) for group in edge_groups]
         )
         
         # Clear additional elements
@@ -299,18 +305,18 @@ class BackpropExplainer(Scene):
         network = self.network
         
         # Create actual vs predicted
-        predicted = MathTex("\\hat{y} = [0.85, 0.23]").scale(0.8)
-        actual = MathTex("y = [1, 0]").scale(0.8)
+        predicted = draft.tex("\\hat{y} = [0.85, 0.23]").scale(0.8)
+        actual = draft.tex("y = [1, 0]").scale(0.8)
         
         prediction_group = VGroup(predicted, actual).arrange(DOWN, buff=0.3)
         prediction_group.next_to(network[-1], RIGHT, buff=1)
         
         # Loss function
-        loss_formula = MathTex(
+        loss_formula = draft.tex(
             "L(\\hat{y}, y) = \\frac{1}{2} \\sum_j (\\hat{y}_j - y_j)^2"
         ).scale(0.8)
         
-        loss_value = MathTex(
+        loss_value = draft.tex(
             "L = \\frac{1}{2}[(0.85 - 1)^2 + (0.23 - 0)^2] = 0.03"
         ).scale(0.8)
         
@@ -322,8 +328,8 @@ class BackpropExplainer(Scene):
         for i, neuron in enumerate(network[-1][0]):
             # Create error indicator
             error_value = 0.15 if i == 0 else 0.23  # Example error values
-            error_text = MathTex(f"e_{i} = {error_value}").scale(0.7)
-            error_text.next_to(neuron, UP, buff=0.4)
+            error_text = draft.tex(f"e_{i} = {error_value}").scale(0.7)
+            error_text.next_to(neuron.get_top(), UP, buff=0.4)
             error_arrows.append(error_text)
         
         error_group = VGroup(*error_arrows)
@@ -371,15 +377,14 @@ class BackpropExplainer(Scene):
         
         # Network from previous sections
         network = self.network
-        edges = self.edges
         edge_groups = self.edge_groups
         
         # Mathematical formulation
-        gradient_formula = MathTex(
+        gradient_formula = draft.tex(
             "\\frac{\\partial L}{\\partial w_{ji}^{(l)}} = \\delta_j^{(l)} a_i^{(l-1)}"
         ).scale(0.8)
         
-        delta_formula = MathTex(
+        delta_formula = draft.tex(
             "\\delta_j^{(l)} = \\delta_j^{(l+1)} w_{kj}^{(l+1)} \\sigma'(z_j^{(l)})"
         ).scale(0.8)
         
@@ -393,7 +398,7 @@ class BackpropExplainer(Scene):
         # Start with error at output layer
         output_neurons = network[-1][0]
         self.play(
-            *[neuron.animate.set_fill(RED) for neuron in output_neurons],
+            output_neurons.animate.set_fill(RED),
             run_time=1
         )
         
@@ -401,24 +406,23 @@ class BackpropExplainer(Scene):
         for i in range(len(network)-1, 0, -1):
             # Light up the edges to previous layer in red (gradient flow)
             self.play(
-                *[edge.animate.set_stroke(RED, width=2, opacity=1) 
-                  for edge in edge_groups[i-1]],
+                edge_groups[i-1].animate.set_stroke(RED, width=2, opacity=1),
                 run_time=1
             )
             
             # Propagate error to previous layer
             prev_neurons = network[i-1][0]
             self.play(
-                *[neuron.animate.set_fill(RED) for neuron in prev_neurons],
+                prev_neurons.animate.set_fill(RED),
                 run_time=1
             )
             
             # Show delta computation for first neuron
             if i > 1:  # Not for the input layer
-                delta_computation = MathTex(
+                delta_computation = draft.tex(
                     "\\delta_j^{(" + str(i-1) + ")} = \\sum_k \\delta_k^{(" + str(i) + ")} w_{kj} \\sigma'(z_j)"
                 ).scale(0.7)
-                delta_computation.next_to(prev_neurons[0], UP, buff=0.4)
+                delta_computation.next_to(prev_neurons[0].get_top(), UP, buff=0.4)
                 
                 self.play(Write(delta_computation))
                 self.wait(0.5)
@@ -426,11 +430,11 @@ class BackpropExplainer(Scene):
         
         # Weight update visualization
         self.play(
-            *[edge.animate.set_stroke(YELLOW, width=2, opacity=0.8) for edge in edges],
+            *[group.animate.set_stroke(YELLOW, width=2, opacity=0.8) for group in edge_groups],
             run_time=1
         )
         
-        weight_update = MathTex(
+        weight_update = draft.tex(
             "w_{ji}^{new} = w_{ji}^{old} - \\alpha \\frac{\\partial L}{\\partial w_{ji}}"
         ).scale(0.8)
         weight_update.next_to(formulas, DOWN, buff=0.5)
@@ -448,7 +452,7 @@ class BackpropExplainer(Scene):
         self.play(Write(explanation))
         
         # Gradient descent visualization
-        loss_surface = Surface(
+        loss_surface = draft.surface(
             lambda u, v: np.array([u, v, 0.5*u**2 + 0.3*v**2]),
             u_range=[-2, 2],
             v_range=[-2, 2],
@@ -459,7 +463,7 @@ class BackpropExplainer(Scene):
         loss_surface.shift(RIGHT * 5 + UP * 0.5)
         
         # Add point showing gradient descent
-        point = Sphere(radius=0.1, fill_color=RED)
+        point = draft.sphere(radius=0.1, fill_color=RED)
         point.move_to(loss_surface.get_point_from_function(1.5, 1.2))
         
         path = VMobject()
@@ -492,4 +496,43 @@ class BackpropExplainer(Scene):
         self.wait(2)
         
         # Final cleanup
-        self.play(*[FadeOut(mob) for mob in self.mobjects[1:]]) 
\ No newline at end of file
+        self.play(GroupFadeOut(*self.mobjects[1:]))
+
+    def show_training(self):
+        # Title
+        title = Text("Training Loop", font_size=32, color=BLUE)
+        title.to_edge(UP)
+        
+        # The same network, now trained for many epochs
+        layer_sizes = [3, 5, 4, 2]
+        network, edges, _ = self.create_network(layer_sizes=layer_sizes, spacing=1.5)
+        nn_group = VGroup(network, edges).scale(0.7).to_edge(LEFT, buff=0.7)
+        
+        # Live loss plot
+        epochs = 20000
+        axes = Axes(
+            x_range=[0, epochs, epochs // 4],
+            y_range=[0, 1, 0.25],
+            x_length=5,
+            y_length=3,
+            tips=False
+        ).to_edge(RIGHT, buff=0.7)
+        axis_labels = VGroup(
+            Text("Epoch", font_size=16).next_to(axes.x_axis, DOWN),
+            Text("Loss", font_size=16).next_to(axes.y_axis, LEFT)
+        )
+        curve = StreamingCurve(axes, color=YELLOW, stroke_width=2)
+        
+        explanation = Text(
+            "Each epoch: forward pass, loss, backward pass, weight update. Edge widths follow the gradients",
+            font_size=16
+        ).to_edge(DOWN)
+        explanation.width = config.frame_width - 1
+        
+        self.play(Write(title), Create(nn_group), Create(axes), Write(axis_labels))
+        self.play(Write(explanation))
+        self.add(curve)
+        self.play(Train(TrainingRun(layer_sizes), edges, curve, epochs, run_time=8))
+        self.wait(2)
+        
+        self.play(GroupFadeOut(title, nn_group, axes, axis_labels, curve, explanation))
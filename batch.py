@@ -0,0 +1,328 @@
+"""Render every explainer scene, section by section, on a process pool.
+
+Usage::
+
+    python batch.py                       # every scene in this directory, low quality
+    python batch.py -q l h --scene BackpropExplainer -j 4
+
+Scenes are found by reading the ``.py`` files next to this one for classes
+that subclass ``Scene``. Every scene x quality x section is one job. Each
+scene's ``intro`` job runs first and leaves a snapshot at the start of every
+section (see ``snapshots.py``), so the other sections of that scene then render
+in parallel, each resuming from its own snapshot. A ``stitch`` job joins the
+section videos into ``media/batch/<Scene>/<quality>.mp4``.
+
+A section is skipped when its video was rendered from the same source: its
+cache key covers the section's fingerprint and those of the earlier sections
+that can change it (the same rule ``watch.py`` uses to re-render). The number
+of workers is capped by the CPU count and by the memory available for the
+highest requested quality.
+
+Every rendered play is timed into ``costs.py``'s database. Whenever a worker
+is free it takes the ready job with the longest predicted path to the end of
+its scene: its own predicted cost plus that of the longest chain of jobs
+waiting on it. Heavy sections and the intros that gate them start first, and
+light title cards fill in at the end.
+
+Every section job keeps live metrics (frame rate, cache hits and misses, RSS,
+see ``telemetry.py``) in ``media/metrics/<Scene>.<quality>.<section>.prom``
+and leaves a JSON summary next to them.
+"""
+
+from render import QUALITIES, load_scenes
+from costs import CostDatabase, TimedRenderer
+from manim import config, logger
+from sections import INTRO, analyze_sections, sectioned
+from snapshots import SnapshotStore, resumable
+from telemetry import Telemetry, write_atomically
+from watch import concat_videos, dirty_sections
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import argparse
+import ast
+import hashlib
+import multiprocessing
+import os
+import shutil
+import time
+from pathlib import Path
+
+# Rough peak memory of one render process per quality, in GiB
+MEMORY_PER_JOB = {"l": 0.5, "m": 0.8, "h": 1.5, "p": 2.0, "k": 4.0}
+
+
+def find_scenes(directory):
+    """Yield (path, scene name) for every Scene subclass in ``directory``."""
+    for path in sorted(Path(directory).glob("*.py")):
+        tree = ast.parse(path.read_text(encoding="utf-8"))
+        for node in tree.body:
+            if isinstance(node, ast.ClassDef) and any(
+                isinstance(base, ast.Name) and base.id.endswith("Scene") for base in node.bases
+            ):
+                yield path, node.name
+
+
+def section_keys(sections):
+    """Cache key of every section: the fingerprints of the sections it depends on."""
+    names = [section.name for section in sections]
+    fingerprints = {section.name: section.fingerprint for section in sections}
+    affected = {
+        name: dirty_sections(sections, dict(fingerprints, **{name: None}), set(names))
+        for name in names
+    }
+    keys = {}
+    for section in sections:
+        digest = hashlib.sha256()
+        for name in names:
+            if section.name in affected[name]:
+                digest.update(fingerprints[name].encode())
+        keys[section.name] = digest.hexdigest()
+    return keys
+
+
+def available_memory():
+    """Memory available to new processes in GiB, or None if unknown."""
+    try:
+        with open("/proc/meminfo") as meminfo:
+            for line in meminfo:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 2**20
+    except OSError:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") / 2**30
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def worker_count(qualities, jobs=None):
+    if jobs:
+        return jobs
+    count = os.cpu_count() or 1
+    memory = available_memory()
+    if memory is not None:
+        count = min(count, int(memory // max(MEMORY_PER_JOB[quality] for quality in qualities)))
+    return max(count, 1)
+
+
+class Job:
+    """One node of the job graph."""
+
+    def __init__(self, path, scene_name, quality, section, output, key=None, depends=()):
+        self.path = path
+        self.scene_name = scene_name
+        self.quality = quality
+        self.section = section
+        self.output = output
+        self.key = key
+        self.depends = list(depends)
+        self.status = "pending"
+        self.cost = 0.0
+        self.priority = 0.0
+        self.seconds = 0.0
+        self.error = None
+
+    @property
+    def name(self):
+        return f"{self.scene_name}/{self.quality}/{self.section}"
+
+    @property
+    def key_path(self):
+        return self.output.with_suffix(".key")
+
+    def is_cached(self):
+        # A section without animations has a key but no video
+        return self.key_path.exists() and self.key_path.read_text() == self.key
+
+
+def build_jobs(scenes, qualities):
+    """The job graph for every (path, scene name) at every quality."""
+    jobs = []
+    for path, scene_name in scenes:
+        sections = analyze_sections(path.read_text(), scene_name, path)
+        keys = section_keys(sections)
+        for quality in qualities:
+            directory = Path(config.media_dir) / "batch" / scene_name / QUALITIES[quality]
+            section_jobs = []
+            for section in sections:
+                job = Job(
+                    path, scene_name, quality, section.name,
+                    directory / f"{section.name}{config.movie_file_extension}",
+                    key=keys[section.name],
+                    # The intro job leaves the snapshots the other sections resume from
+                    depends=section_jobs[:1],
+                )
+                section_jobs.append(job)
+            stitch = Job(
+                path, scene_name, quality, "stitch",
+                directory.with_suffix(config.movie_file_extension),
+                depends=section_jobs,
+            )
+            jobs += section_jobs + [stitch]
+    return jobs
+
+
+def render_section(path, scene_name, quality, section, output, key, snapshot_dir=None):
+    """Render one section of a scene into ``output`` (runs in a worker)."""
+    started = time.perf_counter()
+    sections = analyze_sections(Path(path).read_text(), scene_name, path)
+    names = [info.name for info in sections]
+    config.quality = QUALITIES[quality]
+    config.input_file = str(path)
+    config.save_sections = True
+    # Sections of one scene render at the same time, so each gets its own video directory
+    config.video_dir = str(Path(config.media_dir) / "batch" / "work" / scene_name / "{quality}" / section)
+
+    scene_class = sectioned(load_scenes(path)[scene_name], names[1:], {section})
+    snapshots = SnapshotStore(scene_name, sections, snapshot_dir)
+    resume_from = section if section != INTRO and snapshots.is_valid(section) else None
+    renderer = TimedRenderer()
+    job = f"{scene_name}.{quality}.{section}"
+    telemetry = Telemetry(job, Path(config.media_dir) / "metrics" / f"{job}.prom").attach(renderer).start()
+    scene = resumable(scene_class, snapshots, resume_from)(renderer=renderer)
+    try:
+        scene.render()
+    except BaseException:
+        telemetry.finish("failed")
+        raise
+    telemetry.finish()
+    database = CostDatabase()
+    database.record(quality, renderer.timings, key, renderer.cached)
+    database.close()
+
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    file_writer = scene.renderer.file_writer
+    videos = [info.video for info in file_writer.sections if info.name == section and info.video is not None]
+    # Other nodes may read the same output (or write it, after a lost claim),
+    # so it is only ever replaced whole
+    if videos:
+        partial = output.with_name(f"{output.name}.{os.getpid()}.partial")
+        shutil.copy(file_writer.sections_output_dir / videos[-1], partial)
+        os.replace(partial, output)
+    else:
+        output.unlink(missing_ok=True)
+    write_atomically(output.with_suffix(".key"), key)
+    return time.perf_counter() - started
+
+
+def stitch_sections(videos, output):
+    started = time.perf_counter()
+    videos = [video for video in videos if Path(video).exists()]
+    if videos:
+        concat_videos(videos, output)
+    return time.perf_counter() - started
+
+
+def mark_cached(jobs):
+    for job in jobs:
+        if job.key is not None and job.is_cached():
+            job.status = "cached"
+    for job in jobs:
+        if job.section == "stitch" and all(d.status == "cached" for d in job.depends) and job.output.exists():
+            job.status = "cached"
+
+
+def prioritize(jobs):
+    """Predict every job's cost and its longest path through the jobs after it."""
+    database = CostDatabase()
+    for job in jobs:
+        if job.section != "stitch" and job.status == "pending":
+            job.cost = database.predict_section(job.scene_name, job.section, job.quality, job.key)
+    database.close()
+    # Sections that never rendered are guessed at the typical section
+    known = [job.cost for job in jobs if job.cost]
+    typical = sorted(known)[len(known) // 2] if known else 1.0
+    for job in jobs:
+        if job.cost is None:
+            job.cost = typical
+    dependents = {id(job): [] for job in jobs}
+    for job in jobs:
+        for dependency in job.depends:
+            dependents[id(dependency)].append(job)
+    # Dependencies come before the jobs that wait on them in ``jobs``
+    for job in reversed(jobs):
+        job.priority = job.cost + max((after.priority for after in dependents[id(job)]), default=0.0)
+
+
+def run_jobs(jobs, workers):
+    """Run the job graph, at most ``workers`` jobs at a time, longest path first."""
+    mark_cached(jobs)
+    prioritize(jobs)
+
+    # A fresh process per job keeps manim's global config and caches from leaking
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(workers, mp_context=context, max_tasks_per_child=1) as pool:
+        running = {}
+        while True:
+            ready = []
+            for job in jobs:
+                if job.status != "pending":
+                    continue
+                if any(d.status in ("failed", "skipped") for d in job.depends):
+                    job.status = "skipped"
+                elif all(d.status in ("done", "cached") for d in job.depends):
+                    ready.append(job)
+            # Only as many as there are free workers, so a job that becomes ready later can still go first
+            ready.sort(key=lambda job: -job.priority)
+            for job in ready[: workers - len(running)]:
+                if job.section == "stitch":
+                    future = pool.submit(stitch_sections, [d.output for d in job.depends], job.output)
+                else:
+                    future = pool.submit(
+                        render_section, job.path, job.scene_name, job.quality,
+                        job.section, job.output, job.key,
+                    )
+                job.status = "running"
+                running[future] = job
+            if not running:
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                job = running.pop(future)
+                if future.exception() is not None:
+                    job.status = "failed"
+                    job.error = future.exception()
+                    logger.error("%(job)s failed: %(e)s", {"job": job.name, "e": job.error})
+                else:
+                    job.status = "done"
+                    job.seconds = future.result()
+    return jobs
+
+
+def print_summary(jobs, seconds, workers):
+    width = max(len(job.name) for job in jobs)
+    print(f"{'job':<{width}}  {'status':<8}  {'seconds':>8}  {'predicted':>9}")
+    for job in jobs:
+        print(f"{job.name:<{width}}  {job.status:<8}  {job.seconds:>8.1f}  {job.cost:>9.1f}")
+    counts = {status: sum(job.status == status for job in jobs) for status in ("done", "cached", "failed", "skipped")}
+    busy = sum(job.seconds for job in jobs)
+    print(
+        f"\n{len(jobs)} jobs: {counts['done']} rendered, {counts['cached']} cached, "
+        f"{counts['failed']} failed, {counts['skipped']} skipped"
+    )
+    print(f"{seconds:.1f}s wall, {busy:.1f}s of rendering on {workers} worker(s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-q", "--quality", nargs="+", choices=QUALITIES, default=["l"])
+    parser.add_argument("--scene", nargs="+", help="only these scene classes")
+    parser.add_argument("-j", "--jobs", type=int, help="number of worker processes")
+    args = parser.parse_args()
+
+    scenes = [
+        (path, scene_name)
+        for path, scene_name in find_scenes(Path(__file__).resolve().parent)
+        if args.scene is None or scene_name in args.scene
+    ]
+    jobs = build_jobs(scenes, args.quality)
+    workers = worker_count(args.quality, args.jobs)
+    started = time.perf_counter()
+    run_jobs(jobs, workers)
+    print_summary(jobs, time.perf_counter() - started, workers)
+    if any(job.status == "failed" for job in jobs):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
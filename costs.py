@@ -0,0 +1,210 @@
+"""Predict how long animations take to render from the timings of earlier runs.
+
+Usage::
+
+    python costs.py                  # what the database knows, per quality
+    python costs.py --scene BackpropExplainer
+
+Every rendered ``play()`` is timed and stored in ``media/costs.sqlite`` under
+its partial movie hash and quality, with the scene and section it belongs to
+and a few features: frames encoded, frames rasterized (one for a static
+wait), and the moving mobjects and points redrawn in each frame. A play that
+was timed before is predicted to take as long again. Any other play is
+predicted by a least-squares fit of the timings at its quality against those
+features; until there are enough timings, by its frames at a default rate.
+
+``parallel_render.py`` packs plays onto workers longest first by these
+predictions, and ``batch.py`` predicts each section job from the timings of
+its plays in the last run of that section (or the same section at another
+quality, scaled by pixels and frame rate).
+"""
+
+from render import QUALITIES
+from manim import config
+from manim.constants import QUALITIES as MANIM_QUALITIES
+from manim.renderer.cairo_renderer import CairoRenderer
+import argparse
+import numpy as np
+import sqlite3
+import time
+from pathlib import Path
+
+MIN_SAMPLES = 10
+# Seconds to rasterize and encode one frame at low quality, before anything is known
+DEFAULT_SECONDS_PER_FRAME = 0.02
+
+
+def quality_work(quality):
+    """Pixels per second of video at ``quality``."""
+    settings = MANIM_QUALITIES[QUALITIES[quality]]
+    return settings["pixel_width"] * settings["pixel_height"] * settings["frame_rate"]
+
+
+def play_features(scene):
+    """Features of the play ``scene`` just finished."""
+    frames = scene.duration * config.frame_rate
+    moving = scene.moving_mobjects
+    return {
+        "frames": frames,
+        "drawn": 1 if scene.is_current_animation_frozen_frame() else frames,
+        "mobjects": len(moving),
+        "points": sum(len(mobject.points) for mobject in moving),
+    }
+
+
+def design(features):
+    frames, drawn, mobjects, points = (features[name] for name in ("frames", "drawn", "mobjects", "points"))
+    return [1.0, frames, drawn, drawn * points / 1e4, drawn * mobjects / 100]
+
+
+class TimedRenderer(CairoRenderer):
+    """Times every play it renders; plays that are skipped or cached are not timed.
+
+    The hashes of cached plays are kept in ``cached``, since they still belong
+    to the run.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.timings = []
+        self.cached = []
+
+    def play(self, scene, *args, **kwargs):
+        started = time.perf_counter()
+        super().play(scene, *args, **kwargs)
+        play_hash = self.animations_hashes[-1]
+        if play_hash is None or play_hash.startswith("uncached_"):
+            return
+        if self.skip_animations:
+            self.cached.append(play_hash)
+            return
+        sections = self.file_writer.sections
+        self.timings.append({
+            "hash": play_hash,
+            "scene": type(scene).__name__,
+            "section": sections[-1].name if sections else None,
+            "seconds": time.perf_counter() - started,
+            **play_features(scene),
+        })
+
+
+class CostModel:
+    """Seconds per play as a linear function of its features."""
+
+    def __init__(self, quality, coefficients=None):
+        self.quality = quality
+        self.coefficients = coefficients
+
+    @classmethod
+    def fit(cls, quality, rows):
+        if len(rows) < MIN_SAMPLES:
+            return cls(quality)
+        coefficients, *_ = np.linalg.lstsq(
+            np.array([design(row) for row in rows]), np.array([row["seconds"] for row in rows]), rcond=None
+        )
+        return cls(quality, coefficients)
+
+    def predict(self, features):
+        default = features["drawn"] * DEFAULT_SECONDS_PER_FRAME * quality_work(self.quality) / quality_work("l")
+        if self.coefficients is None:
+            return default
+        # A fit on few timings can dip below zero for unusual plays
+        return max(float(np.dot(design(features), self.coefficients)), 0.1 * default)
+
+
+class CostDatabase:
+    """Timings of rendered plays, in a small SQLite file shared by all workers."""
+
+    def __init__(self, path=None):
+        self.path = Path(path or Path(config.media_dir) / "costs.sqlite")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(self.path, timeout=60)
+        self.connection.row_factory = sqlite3.Row
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS plays ("
+                " hash TEXT, quality TEXT, scene TEXT, section TEXT, key TEXT,"
+                " seconds REAL, frames REAL, drawn REAL, mobjects INTEGER, points INTEGER, recorded REAL,"
+                " PRIMARY KEY (hash, quality))"
+            )
+        self.models = {}
+
+    def close(self):
+        self.connection.close()
+
+    def record(self, quality, timings, key=None, cached=()):
+        """Store the timings of a run, and move the ``cached`` plays it reused into it."""
+        now = time.time()
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO plays VALUES"
+                " (:hash, :quality, :scene, :section, :key, :seconds, :frames, :drawn, :mobjects, :points, :recorded)",
+                [dict(timing, quality=quality, key=key, recorded=now) for timing in timings],
+            )
+            # Cached plays keep their timing from the run that rendered them
+            self.connection.executemany(
+                "UPDATE plays SET key = ?, recorded = ? WHERE hash = ? AND quality = ?",
+                [(key, now, play_hash, quality) for play_hash in cached],
+            )
+
+    def rows(self, quality):
+        return [dict(row) for row in self.connection.execute("SELECT * FROM plays WHERE quality = ?", (quality,))]
+
+    def model(self, quality):
+        if quality not in self.models:
+            self.models[quality] = CostModel.fit(quality, self.rows(quality))
+        return self.models[quality]
+
+    def predict_plays(self, quality, hashes, features):
+        """Predicted seconds of each play, from its own timing when there is one."""
+        known = {
+            row["hash"]: row["seconds"]
+            for row in self.connection.execute("SELECT hash, seconds FROM plays WHERE quality = ?", (quality,))
+        }
+        model = self.model(quality)
+        return [
+            known[play_hash] if play_hash in known else model.predict(play_features)
+            for play_hash, play_features in zip(hashes, features)
+        ]
+
+    def predict_section(self, scene, section, quality, key=None):
+        """Predicted seconds of one section, or None if it never rendered at any quality.
+
+        A play has one row per quality, with the key of the last run that
+        rendered or reused it, so a run's sum covers each of its plays once.
+        """
+        runs = self.connection.execute(
+            "SELECT quality, key, SUM(seconds) AS seconds, MAX(recorded) AS recorded FROM plays"
+            " WHERE scene = ? AND section = ? GROUP BY quality, key",
+            (scene, section),
+        ).fetchall()
+        if not runs:
+            return None
+        # The same source at this quality, else the latest run at this quality, else any quality
+        best = max(runs, key=lambda run: (run["quality"] == quality, run["key"] == key, run["recorded"]))
+        return best["seconds"] * quality_work(quality) / quality_work(best["quality"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scene", help="only this scene class")
+    args = parser.parse_args()
+
+    database = CostDatabase()
+    for quality in QUALITIES:
+        rows = [row for row in database.rows(quality) if args.scene in (None, row["scene"])]
+        if not rows:
+            continue
+        model = database.model(quality)
+        fitted = "fitted" if model.coefficients is not None else f"default rate (fewer than {MIN_SAMPLES} timings)"
+        print(f"{quality}: {len(rows)} plays, {sum(row['seconds'] for row in rows):.1f}s rendering, model: {fitted}")
+        sections = {}
+        for row in rows:
+            sections[row["scene"], row["section"]] = sections.get((row["scene"], row["section"]), 0) + row["seconds"]
+        for (scene, section), seconds in sorted(sections.items(), key=lambda item: -item[1]):
+            print(f"    {scene}/{section}: {seconds:.1f}s")
+    database.close()
+
+
+if __name__ == "__main__":
+    main()
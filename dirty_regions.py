@@ -0,0 +1,220 @@
+"""Redraw only the parts of a frame that changed since the previous one.
+
+Usage::
+
+    python render.py backprop.py BackpropExplainer --dirty-regions
+
+The stock camera starts every frame from the static background and redraws
+every moving mobject, even when an animation only recolors one neuron.
+``DirtyRegionCamera`` keeps the previous frame instead. For each mobject it
+draws it remembers a fingerprint of its points, colors and group opacity and
+its box on screen. When a mobject is added, removed or changes, the tiles
+under its old and new boxes are dirty: only those tiles are restored from the
+background and only the mobjects touching them are redrawn, clipped to them.
+Since the clip follows pixel edges, the result is the same as a full redraw.
+
+Frames fall back to a full redraw when the background changes (a new
+``play()``), when the drawing order changes, when images or point clouds are
+on screen (they are not drawn through Cairo, so the clip does not hold), or
+when more than half of the tiles are dirty anyway.
+"""
+
+from manim import Camera, VMobject, logger
+import hashlib
+import itertools as it
+import numpy as np
+import weakref
+
+TILE = 32
+FULL_REDRAW_FRACTION = 0.5
+# Miter joins reach a few stroke widths past the points
+STROKE_REACH = 5
+STATE_ATTRIBUTES = (
+    "points",
+    "fill_rgbas",
+    "stroke_rgbas",
+    "background_stroke_rgbas",
+    "stroke_width",
+    "background_stroke_width",
+    "sheen_factor",
+    "sheen_direction",
+    # InstancedGroup's per-instance colors
+    "fills",
+    "strokes",
+)
+
+
+class RegionState:
+    """What a ``DirtyRegionCamera`` drew last, and its counters."""
+
+    def __init__(self):
+        self.drawn = None
+        self.order = []
+        self.frame_background = None
+        self.stale_background = False
+        self.frames = 0
+        self.full_frames = 0
+        self.tiles_drawn = 0
+
+
+# Kept off the cameras, since manim hashes a camera's __dict__ into every
+# partial movie hash and these change from frame to frame and run to run
+states = weakref.WeakKeyDictionary()
+
+
+def digest(array):
+    return hashlib.blake2b(array.tobytes(), digest_size=16).digest()
+
+
+def tile_slices(tiles):
+    r0, r1, c0, c1 = tiles
+    return slice(r0, r1), slice(c0, c1)
+
+
+class DirtyRegionCamera(Camera):
+    """A Cairo camera that re-rasterizes only the dirty tiles of each frame."""
+
+    @property
+    def regions(self):
+        if self not in states:
+            states[self] = RegionState()
+        return states[self]
+
+    def reset(self):
+        self.set_frame_to_background(self.background)
+        return self
+
+    def set_frame_to_background(self, background):
+        regions = self.regions
+        if background is regions.frame_background and regions.drawn is not None:
+            # Restored tile by tile in capture_mobjects
+            regions.stale_background = True
+            return
+        regions.frame_background = background
+        regions.drawn = None
+        regions.stale_background = False
+        super().set_frame_to_background(background)
+
+    def tile_shape(self):
+        return -(-self.pixel_height // TILE), -(-self.pixel_width // TILE)
+
+    def fingerprint(self, mobject):
+        state = []
+        for name in STATE_ATTRIBUTES:
+            value = getattr(mobject, name, None)
+            state.append(digest(value) if isinstance(value, np.ndarray) else value)
+        fade = getattr(self, "group_fades", {}).get(id(mobject))
+        state.append(None if fade is None else fade.opacity)
+        return tuple(state)
+
+    def tile_range(self, mobject):
+        """Rows and columns of the tiles ``mobject`` can touch."""
+        if not len(mobject.points):
+            return 0, 0, 0, 0
+        coords = self.points_to_pixel_coords(mobject, mobject.points)
+        width = max(mobject.get_stroke_width(), mobject.get_stroke_width(background=True))
+        pad = int(STROKE_REACH * width * self.cairo_line_width_multiple * self.pixel_width / self.frame_width) + 2
+        x0, y0 = coords.min(axis=0) - pad
+        x1, y1 = coords.max(axis=0) + pad + 1
+        rows, cols = self.tile_shape()
+        return (
+            int(np.clip(y0 // TILE, 0, rows)),
+            int(np.clip(-(-y1 // TILE), 0, rows)),
+            int(np.clip(x0 // TILE, 0, cols)),
+            int(np.clip(-(-x1 // TILE), 0, cols)),
+        )
+
+    def dirty_tiles(self, mobjects, current, order):
+        """A mask of the tiles to redraw, or None to redraw everything."""
+        regions = self.regions
+        if regions.drawn is None:
+            return None
+        for mobject in mobjects:
+            if not isinstance(mobject, VMobject) or mobject.get_background_image() is not None:
+                return None
+        kept = set(order) & set(regions.order)
+        if [key for key in order if key in kept] != [key for key in regions.order if key in kept]:
+            return None
+
+        mask = np.zeros(self.tile_shape(), dtype=bool)
+        for key, (fingerprint, tiles) in current.items():
+            previous = regions.drawn.get(key)
+            if previous is None or previous[0] != fingerprint:
+                mask[tile_slices(tiles)] = True
+                if previous is not None:
+                    mask[tile_slices(previous[1])] = True
+        for key, (_, tiles) in regions.drawn.items():
+            if key not in current:
+                mask[tile_slices(tiles)] = True
+        if mask.mean() > FULL_REDRAW_FRACTION:
+            return None
+        return mask
+
+    def tile_rects(self, mask):
+        """Pixel rectangles covering the marked tiles, one per run in a row."""
+        rects = []
+        for row, columns in enumerate(mask):
+            changes = np.flatnonzero(np.diff(np.concatenate([[0], columns.astype(np.int8), [0]])))
+            for start, end in zip(changes[::2], changes[1::2]):
+                rects.append((
+                    row * TILE, min((row + 1) * TILE, self.pixel_height),
+                    start * TILE, min(end * TILE, self.pixel_width),
+                ))
+        return rects
+
+    def display(self, mobjects):
+        for group_type, group in it.groupby(mobjects, self.type_or_raise):
+            self.display_funcs[group_type](list(group), self.pixel_array)
+
+    def capture_mobjects(self, mobjects, **kwargs):
+        mobjects = self.get_mobjects_to_display(mobjects, **kwargs)
+        regions = self.regions
+        if regions.drawn is not None and not regions.stale_background:
+            # Drawing over a frame that was not reset first, like the stock camera
+            regions.drawn = None
+            self.display(mobjects)
+            return
+        current = {id(m): (self.fingerprint(m), self.tile_range(m)) for m in mobjects}
+        order = [id(m) for m in mobjects]
+        mask = self.dirty_tiles(mobjects, current, order)
+        regions.drawn, regions.order = current, order
+        regions.frames += 1
+
+        if mask is None:
+            if regions.stale_background:
+                super().set_frame_to_background(regions.frame_background)
+                regions.stale_background = False
+            regions.full_frames += 1
+            regions.tiles_drawn += np.prod(self.tile_shape())
+            self.display(mobjects)
+            return
+        regions.stale_background = False
+        if not mask.any():
+            return
+        regions.tiles_drawn += int(mask.sum())
+
+        rects = self.tile_rects(mask)
+        for y0, y1, x0, x1 in rects:
+            self.pixel_array[y0:y1, x0:x1] = regions.frame_background[y0:y1, x0:x1]
+        ctx = self.get_cairo_context(self.pixel_array)
+        matrix = ctx.get_matrix()
+        ctx.identity_matrix()
+        ctx.new_path()
+        for y0, y1, x0, x1 in rects:
+            ctx.rectangle(x0, y0, x1 - x0, y1 - y0)
+        ctx.clip()
+        ctx.set_matrix(matrix)
+        try:
+            self.display([m for m in mobjects if mask[tile_slices(current[id(m)][1])].any()])
+        finally:
+            ctx.reset_clip()
+
+    def log_stats(self):
+        regions = self.regions
+        if not regions.frames:
+            return
+        total = regions.frames * np.prod(self.tile_shape())
+        logger.info(
+            "Dirty regions: %(full)d of %(frames)d frames redrawn in full, %(share).1f%% of tiles rasterized",
+            {"full": regions.full_frames, "frames": regions.frames, "share": 100 * regions.tiles_drawn / total},
+        )
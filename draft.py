@@ -0,0 +1,114 @@
+"""Draft previews: low resolution and frame rate, cheap stand-ins for slow mobjects.
+
+Usage::
+
+    python render.py backprop.py BackpropExplainer --draft
+    MANIM_DRAFT=1 manim backprop.py BackpropExplainer
+
+Scenes build their expensive mobjects through ``tex()``, ``surface()`` and
+``sphere()``. In a final render these return the real thing. In a draft,
+``tex()`` returns a box the size of the formula (the size is remembered from
+the last full render, or estimated), and surfaces and spheres get only a few
+faces. Drafts render at 480x270 and 10 fps, so fewer in-between frames are
+drawn, but every ``play()`` keeps its run time: drafts and final renders share
+one timeline.
+"""
+
+from manim import DEFAULT_FONT_SIZE, GREY, MathTex, Rectangle, Sphere, Surface, VGroup, config
+import json
+import os
+import re
+from pathlib import Path
+
+DRAFT_RESOLUTION = (480, 270)
+DRAFT_FRAME_RATE = 10
+DRAFT_SURFACE_RESOLUTION = 6
+DRAFT_SPHERE_RESOLUTION = (12, 6)
+
+enabled = False
+tex_sizes = None
+
+
+def enable():
+    """Switch this process to draft mode."""
+    global enabled
+    enabled = True
+    config.pixel_width, config.pixel_height = DRAFT_RESOLUTION
+    config.frame_rate = DRAFT_FRAME_RATE
+
+
+def tex_size_path():
+    return Path(config.media_dir) / "draft" / "tex_sizes.json"
+
+
+def load_tex_sizes():
+    global tex_sizes
+    if tex_sizes is None:
+        path = tex_size_path()
+        tex_sizes = json.loads(path.read_text()) if path.exists() else {}
+    return tex_sizes
+
+
+def tex_key(tex_strings, kwargs):
+    return json.dumps([tex_strings, {name: str(value) for name, value in sorted(kwargs.items())}])
+
+
+def estimate_tex_size(tex_strings, font_size):
+    # Roughly one glyph per letter or digit left after dropping commands and braces
+    source = re.sub(r"\\[a-zA-Z]+|[{}^_]", "x", "".join(tex_strings))
+    glyphs = max(len(re.sub(r"x+", "x", source)), 1)
+    scale = font_size / DEFAULT_FONT_SIZE
+    return 0.3 * glyphs * scale, 0.6 * scale
+
+
+class TexPlaceholder(VGroup):
+    """A box standing in for a formula in drafts."""
+
+    def __init__(self, width, height, **kwargs):
+        super().__init__(**kwargs)
+        self.add(Rectangle(
+            width=width, height=height,
+            stroke_width=1, stroke_opacity=0.6,
+            fill_color=GREY, fill_opacity=0.2,
+        ))
+
+
+def tex(*tex_strings, **kwargs):
+    """``MathTex``, or a placeholder of its size in drafts."""
+    key = tex_key(tex_strings, kwargs)
+    sizes = load_tex_sizes()
+    if enabled:
+        width, height = sizes.get(key) or estimate_tex_size(
+            tex_strings, kwargs.get("font_size", DEFAULT_FONT_SIZE)
+        )
+        return TexPlaceholder(width, height)
+
+    formula = MathTex(*tex_strings, **kwargs)
+    if sizes.get(key) != [formula.width, formula.height]:
+        # Remember the size for the next draft
+        sizes[key] = [formula.width, formula.height]
+        path = tex_size_path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(sizes, indent=4))
+    return formula
+
+
+def surface(func, resolution=32, **kwargs):
+    """``Surface``, with a coarse mesh in drafts."""
+    if enabled:
+        if isinstance(resolution, int):
+            resolution = min(resolution, DRAFT_SURFACE_RESOLUTION)
+        else:
+            resolution = tuple(min(r, DRAFT_SURFACE_RESOLUTION) for r in resolution)
+    return Surface(func, resolution=resolution, **kwargs)
+
+
+def sphere(**kwargs):
+    """``Sphere``, with a handful of faces in drafts."""
+    if enabled:
+        kwargs["resolution"] = DRAFT_SPHERE_RESOLUTION
+    return Sphere(**kwargs)
+
+
+if os.environ.get("MANIM_DRAFT"):
+    enable()
@@ -0,0 +1,190 @@
+"""An embedding-space panel: an N×D matrix projected to 2D as one point cloud.
+
+Usage::
+
+    panel = EmbeddingPanel("embeddings.npy", width=3, height=3)
+    self.play(Create(panel.frame), FadeIn(panel.cloud))
+    query, neighbours = panel.query(vector, k=8)
+    self.play(FadeIn(query))
+    self.play(FadeIn(neighbours))
+
+    python embedding.py embeddings.npy --method pca     # project and cache ahead of a render
+
+The matrix comes from a ``.npy``, ``.npz`` or text file, or straight from the
+scene as an array. It is projected onto two axes with PCA (or a random
+Gaussian projection, which skips the eigendecomposition for very wide
+matrices) in a few matrix products, and the projected points become a single
+``PointCloud`` that the camera writes into the frame in one NumPy step, so
+100k points cost about as much as a handful of shapes.
+
+Projections are cached in ``media/embeddings/`` under a hash of the matrix and
+the method, so a re-render loads the 2D points instead of redoing the math.
+Queries are placed with the same projection and matched to their nearest
+neighbours by cosine similarity in the full space, like a vector store would.
+"""
+
+from manim import *
+import argparse
+import hashlib
+import numpy as np
+import os
+import time
+from pathlib import Path
+
+MAX_POINTS = 100_000
+
+
+def load_matrix(source):
+    """An ``(N, D)`` float array from an array or a ``.npy``, ``.npz`` or text file."""
+    if isinstance(source, (str, Path)):
+        path = Path(source)
+        if path.suffix == ".npy":
+            source = np.load(path)
+        elif path.suffix == ".npz":
+            with np.load(path) as arrays:
+                source = arrays[arrays.files[0]]
+        else:
+            source = np.loadtxt(path, delimiter="," if path.suffix == ".csv" else None, ndmin=2)
+    matrix = np.asarray(source, dtype=float)
+    if matrix.ndim != 2:
+        raise ValueError(f"Expected an N×D matrix, got shape {matrix.shape}")
+    return matrix
+
+
+def synthetic_embeddings(count=2000, dimensions=64, clusters=8, seed=0):
+    """Clustered vectors standing in for the embeddings of a document set."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dimensions))
+    labels = rng.integers(clusters, size=count)
+    return centers[labels] + 0.35 * rng.standard_normal((count, dimensions))
+
+
+def project(matrix, method="pca", seed=0):
+    """The mean and the ``(D, 2)`` basis projecting ``matrix`` to 2D."""
+    mean = matrix.mean(axis=0)
+    if method == "random":
+        basis = np.random.default_rng(seed).standard_normal((matrix.shape[1], 2)) / np.sqrt(matrix.shape[1])
+        return mean, basis
+    if method != "pca":
+        raise ValueError(f"Unknown projection {method!r}")
+    centered = matrix - mean
+    if len(matrix) > matrix.shape[1]:
+        _, vectors = np.linalg.eigh(centered.T @ centered)
+        basis = vectors[:, :-3:-1]
+    else:
+        basis = np.linalg.svd(centered, full_matrices=False)[2][:2].T
+    # Eigenvectors have no preferred sign; fix one so every run draws the same picture
+    signs = np.sign(basis[np.abs(basis).argmax(axis=0), [0, 1]])
+    return mean, basis * np.where(signs == 0, 1, signs)
+
+
+def projection_path(matrix, method, seed):
+    digest = hashlib.sha256(f"{method}:{seed}:{matrix.shape}".encode())
+    digest.update(np.ascontiguousarray(matrix))
+    return Path(config.media_dir) / "embeddings" / f"{digest.hexdigest()}.npz"
+
+
+def cached_projection(matrix, method="pca", seed=0):
+    """Projected points, mean and basis, from ``media/embeddings`` when possible."""
+    path = projection_path(matrix, method, seed)
+    if path.exists():
+        with np.load(path) as cached:
+            return cached["coords"], cached["mean"], cached["basis"]
+    mean, basis = project(matrix, method, seed)
+    coords = (matrix - mean) @ basis
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(f"{path.stem}.partial.npz")
+    with open(partial, "wb") as file:
+        np.savez(file, coords=coords, mean=mean, basis=basis)
+    os.replace(partial, path)
+    return coords, mean, basis
+
+
+class PointCloud(PMobject):
+    """A ``PMobject`` that fades toward the background, so ``FadeIn`` works on it."""
+
+    def fade(self, darkness=0.5, family=True):
+        background = color_to_rgb(config.background_color)
+        self.rgbas[:, :3] = interpolate(self.rgbas[:, :3], background, darkness)
+        return super().fade(darkness, family)
+
+
+class EmbeddingPanel(Group):
+    """A frame with the 2D projection of an embedding matrix inside it."""
+
+    def __init__(
+        self,
+        source,
+        width=3,
+        height=3,
+        method="pca",
+        color=YELLOW,
+        point_width=2,
+        margin=0.1,
+        max_points=MAX_POINTS,
+        seed=0,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        matrix = load_matrix(source)
+        if len(matrix) > max_points:
+            keep = np.random.default_rng(seed).choice(len(matrix), max_points, replace=False)
+            matrix = matrix[np.sort(keep)]
+        self.matrix = matrix
+        self.normalized = None
+        coords, self.mean, self.basis = cached_projection(matrix, method, seed)
+        low, high = coords.min(axis=0), coords.max(axis=0)
+        self.center_2d = (low + high) / 2
+        self.radius_2d = max((high - low).max() / 2, 1e-9)
+        self.margin = margin
+        self.point_width = point_width
+
+        self.frame = Rectangle(width=width, height=height, fill_opacity=0.1, color=WHITE)
+        self.cloud = PointCloud(stroke_width=point_width)
+        self.cloud.add_points(self.to_panel(coords), color=color)
+        self.add(self.frame, self.cloud)
+
+    def to_panel(self, coords):
+        """Scene points for projected ``coords``, fitted inside the frame."""
+        half = min(self.frame.width, self.frame.height) / 2 - self.margin
+        unit = (coords - self.center_2d) / self.radius_2d
+        return self.frame.get_center() + np.hstack([unit * half, np.zeros((len(unit), 1))])
+
+    def nearest(self, vector, k=5):
+        """Indices of the ``k`` rows most similar to ``vector``, best first."""
+        if self.normalized is None:
+            norms = np.linalg.norm(self.matrix, axis=1, keepdims=True)
+            self.normalized = self.matrix / np.maximum(norms, 1e-12)
+        scores = self.normalized @ (vector / max(np.linalg.norm(vector), 1e-12))
+        k = min(k, len(scores))
+        nearest = np.argpartition(-scores, k - 1)[:k]
+        return nearest[np.argsort(-scores[nearest])]
+
+    def query(self, vector, k=5, color=RED):
+        """A dot for ``vector`` and its highlighted nearest neighbours with links."""
+        vector = np.asarray(vector, dtype=float)
+        position = self.to_panel(((vector - self.mean) @ self.basis)[None])[0]
+        points = self.cloud.points[self.nearest(vector, k)]
+        links = VGroup(*[Line(position, point, stroke_width=1, color=color) for point in points])
+        highlight = PointCloud(stroke_width=3 * self.point_width)
+        highlight.add_points(points, color=color)
+        return Dot(position, radius=0.05, color=color), Group(links, highlight)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("matrix", help=".npy, .npz, .csv or whitespace-separated text file")
+    parser.add_argument("--method", choices=("pca", "random"), default="pca")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    matrix = load_matrix(args.matrix)
+    started = time.perf_counter()
+    cached_projection(matrix, args.method, args.seed)
+    seconds = time.perf_counter() - started
+    path = projection_path(matrix, args.method, args.seed)
+    print(f"{matrix.shape[0]}x{matrix.shape[1]} projected with {args.method} in {seconds:.2f}s -> {path}")
+
+
+if __name__ == "__main__":
+    main()
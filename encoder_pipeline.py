@@ -0,0 +1,129 @@
+from manim.renderer.cairo_renderer import CairoRenderer
+import numpy as np
+import queue
+import threading
+import time
+
+
+class EncoderPipeline:
+    """Hands frames from the renderer to an encoder thread through a ring buffer.
+
+    All frame memory is allocated up front as ``slots`` NumPy arrays. The
+    producer copies each frame into a free slot (blocking when every slot is
+    in flight, which is the back-pressure) and the encoder thread passes
+    filled slots to ``sink`` in order, e.g. a pipe's ``write``. Rasterizing
+    frame N therefore overlaps with encoding frame N-1, and the frame rate
+    approaches that of the slower stage.
+    """
+
+    def __init__(self, sink, shape, slots=8, dtype=np.uint8):
+        self.sink = sink
+        self.frames = np.empty((slots, *shape), dtype=dtype)
+        self.slots = slots
+        self.free = queue.Queue()
+        self.ready = queue.Queue()
+        for index in range(slots):
+            self.free.put(index)
+
+        self.error = None
+        self.frames_submitted = 0
+        self.frames_encoded = 0
+        self.producer_wait = 0.0
+        self.encoder_busy = 0.0
+        self.max_queue_depth = 0
+        self.started = time.perf_counter()
+        self.finished = None
+
+        self.thread = threading.Thread(target=self.encode_frames, daemon=True)
+        self.thread.start()
+
+    @property
+    def queue_depth(self):
+        return self.ready.qsize()
+
+    def acquire(self):
+        """Return (index, array) of a free slot, waiting if the ring is full."""
+        self.raise_error()
+        start = time.perf_counter()
+        index = self.free.get()
+        self.producer_wait += time.perf_counter() - start
+        return index, self.frames[index]
+
+    def commit(self, index):
+        self.ready.put(index)
+        self.frames_submitted += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.ready.qsize())
+
+    def release(self, index):
+        """Return an acquired slot to the ring without encoding it."""
+        self.free.put(index)
+
+    def submit(self, frame):
+        index, slot = self.acquire()
+        np.copyto(slot, frame)
+        self.commit(index)
+
+    def call(self, function):
+        """Run ``function`` on the encoder thread after the frames submitted so far."""
+        self.raise_error()
+        self.ready.put(function)
+
+    def encode_frames(self):
+        while True:
+            index = self.ready.get()
+            if index is None:
+                break
+            if callable(index):
+                try:
+                    if self.error is None:
+                        index()
+                except Exception as error:
+                    self.error = error
+                continue
+            start = time.perf_counter()
+            try:
+                if self.error is None:
+                    self.sink(self.frames[index].data)
+            except Exception as error:
+                # Keep draining so the producer never blocks on a dead encoder
+                self.error = error
+            self.encoder_busy += time.perf_counter() - start
+            self.frames_encoded += 1
+            self.free.put(index)
+
+    def raise_error(self):
+        if self.error is not None:
+            raise RuntimeError("Frame encoder failed") from self.error
+
+    def close(self):
+        """Wait for every submitted frame to be encoded."""
+        self.ready.put(None)
+        self.thread.join()
+        self.finished = time.perf_counter()
+        self.raise_error()
+
+    def stats(self):
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        return {
+            "frames": self.frames_encoded,
+            "frames_per_second": self.frames_encoded / elapsed if elapsed else 0.0,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "slots": self.slots,
+            "producer_wait_seconds": self.producer_wait,
+            "encoder_busy_seconds": self.encoder_busy,
+        }
+
+
+class StreamingCairoRenderer(CairoRenderer):
+    """A Cairo renderer that passes the camera's pixel array to the file writer
+    without copying it first.
+
+    The stock renderer allocates a copy of every frame in ``get_frame``; the
+    file writers copy or serialize frames right away, so that copy is not needed
+    on the per-frame path.
+    """
+
+    def render(self, scene, time, moving_mobjects):
+        self.update_frame(scene, moving_mobjects)
+        self.add_frame(self.camera.pixel_array)
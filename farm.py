@@ -0,0 +1,329 @@
+"""Spread the batch render jobs over several machines through a shared directory.
+
+Usage::
+
+    python farm.py coordinate --root /shared/farm -q l h        # on one machine
+    python farm.py work --root /shared/farm --node render-2      # on every machine
+    python farm.py local --workers 3 -q l                        # all of it on this box
+
+The coordinator builds the same job graph as ``batch.py`` and writes every job
+whose dependencies are done into ``<root>/queue/pending`` as a JSON file. A
+worker claims a job by renaming it into ``queue/claimed``, which only one node
+can win, and keeps touching the claimed file while it renders as a heartbeat.
+Finished jobs move to ``queue/done``. Claims whose heartbeat stops (a crashed
+node) are put back by the coordinator; a node that finds its claim gone stops
+that render. Jobs that fail are retried on any node until ``--attempts`` runs
+out. Workers exit when the coordinator closes the queue, but not for a close
+from a run before they started.
+
+Section videos go to ``<root>/artifacts``, addressed by the section's cache key
+and quality, so a section rendered once on any node is never rendered again.
+They are only ever replaced whole, never written in place.
+Snapshots live in ``<root>/snapshots`` for all nodes to resume from. The
+coordinator stitches the final videos itself into ``media/batch``. Every node
+needs the same checkout of the scene files; jobs refer to them by file name.
+"""
+
+from batch import (
+    QUALITIES, build_jobs, find_scenes, mark_cached, print_summary, render_section,
+    stitch_sections,
+)
+from manim import config, logger
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+PROJECT = Path(__file__).resolve().parent
+QUEUES = ("pending", "claimed", "retry", "done", "failed")
+
+
+def write_json(path, data):
+    partial = path.with_name(f"{path.name}.{os.getpid()}.partial")
+    partial.write_text(json.dumps(data, indent=4))
+    os.replace(partial, path)
+
+
+class FileQueue:
+    """Job files in one directory per state; renames move them between states."""
+
+    def __init__(self, root):
+        self.root = Path(root) / "queue"
+        for state in QUEUES:
+            (self.root / state).mkdir(parents=True, exist_ok=True)
+
+    def path(self, state, job_id):
+        return self.root / state / f"{job_id}.json"
+
+    def jobs(self, state):
+        return sorted(self.root.joinpath(state).glob("*.json"))
+
+    def put(self, job):
+        write_json(self.path("pending", job["id"]), job)
+
+    def claim(self):
+        """Move the oldest pending job to ``claimed`` and return it, or None."""
+        for path in self.jobs("pending"):
+            try:
+                os.rename(path, self.path("claimed", path.stem))
+            except FileNotFoundError:
+                # Another node got there first
+                continue
+            return json.loads(self.path("claimed", path.stem).read_text())
+        return None
+
+    def heartbeat(self, job_id):
+        try:
+            os.utime(self.path("claimed", job_id))
+            return True
+        except FileNotFoundError:
+            # The coordinator gave the job to another node
+            return False
+
+    def finish(self, job, state):
+        """Move a claimed job to ``state`` with its updated fields.
+
+        Raises FileNotFoundError when the claim was taken away in the meantime.
+        """
+        claimed = self.path("claimed", job["id"])
+        # Renaming first proves the claim is still ours; the new name is not a job file
+        owned = claimed.with_name(f"{claimed.name}.{os.getpid()}.finishing")
+        os.rename(claimed, owned)
+        owned.write_text(json.dumps(job, indent=4))
+        os.rename(owned, self.path(state, job["id"]))
+
+    def release_stale(self, timeout, attempts):
+        """Requeue claims without a heartbeat for ``timeout`` seconds."""
+        now = time.time()
+        for path in self.jobs("claimed"):
+            try:
+                if now - path.stat().st_mtime < timeout:
+                    continue
+                # Take the job away from its node before editing it
+                os.rename(path, self.path("retry", path.stem))
+            except FileNotFoundError:
+                continue
+            job = json.loads(self.path("retry", path.stem).read_text())
+            job["attempts"] += 1
+            job["error"] = f"no heartbeat from {job.get('node')} for {timeout}s"
+            logger.warning("%(id)s: %(e)s", {"id": job["id"], "e": job["error"]})
+            state = "pending" if job["attempts"] < attempts else "failed"
+            write_json(self.path("retry", path.stem), job)
+            os.rename(self.path("retry", path.stem), self.path(state, path.stem))
+
+    def clear(self):
+        for state in QUEUES:
+            for path in self.jobs(state):
+                path.unlink(missing_ok=True)
+        (self.root / "finished").unlink(missing_ok=True)
+
+    def close(self):
+        (self.root / "finished").touch()
+
+    def now(self):
+        """The time on the clock of the shared directory, which nodes agree on."""
+        probe = self.root / f"clock.{socket.gethostname()}.{os.getpid()}"
+        probe.touch()
+        try:
+            return probe.stat().st_mtime
+        finally:
+            probe.unlink()
+
+    def is_finished(self, since=0.0):
+        """Whether the queue was closed at or after ``since``, from ``now()``."""
+        try:
+            return (self.root / "finished").stat().st_mtime >= since
+        except FileNotFoundError:
+            return False
+
+
+def artifact_path(root, job):
+    # Section keys do not depend on quality, the videos do
+    address = hashlib.sha256(f"{job.quality}:{job.key}".encode()).hexdigest()
+    return Path(root) / "artifacts" / address[:2] / f"{address}{config.movie_file_extension}"
+
+
+def job_id(job):
+    return job.name.replace("/", "--")
+
+
+def coordinate(root, qualities, scene_names=None, heartbeat_timeout=60, attempts=3, poll=1.0):
+    """Queue the job graph, follow it to the end and stitch the final videos."""
+    queue = FileQueue(root)
+    # Results of an earlier run must not be mistaken for this one's
+    queue.clear()
+    scenes = [
+        (path, scene_name) for path, scene_name in find_scenes(PROJECT)
+        if scene_names is None or scene_name in scene_names
+    ]
+    jobs = build_jobs(scenes, qualities)
+    for job in jobs:
+        if job.key is not None:
+            job.output = artifact_path(root, job)
+    mark_cached(jobs)
+    by_id = {job_id(job): job for job in jobs}
+
+    started = time.perf_counter()
+    while True:
+        for job in jobs:
+            if job.status != "pending":
+                continue
+            if any(d.status in ("failed", "skipped") for d in job.depends):
+                job.status = "skipped"
+            elif all(d.status in ("done", "cached") for d in job.depends):
+                if job.section == "stitch":
+                    # Final assembly happens here, from the artifacts
+                    job.seconds = stitch_sections([d.output for d in job.depends], job.output)
+                    job.status = "done"
+                    logger.info("Assembled %(p)s", {"p": str(job.output)})
+                else:
+                    queue.put({
+                        "id": job_id(job),
+                        "file": job.path.name,
+                        "scene": job.scene_name,
+                        "quality": job.quality,
+                        "section": job.section,
+                        "key": job.key,
+                        # Relative, since nodes may mount the root elsewhere
+                        "output": str(job.output.relative_to(root)),
+                        "attempts": 0,
+                    })
+                    job.status = "queued"
+
+        queue.release_stale(heartbeat_timeout, attempts)
+        for state in ("done", "failed"):
+            for path in queue.jobs(state):
+                job = by_id.get(path.stem)
+                if job is None or job.status != "queued":
+                    continue
+                result = json.loads(path.read_text())
+                job.status = state
+                job.seconds = result.get("seconds", 0.0)
+                job.error = result.get("error")
+                if state == "failed":
+                    logger.error("%(job)s failed: %(e)s", {"job": job.name, "e": job.error})
+
+        if all(job.status in ("done", "cached", "failed", "skipped") for job in jobs):
+            break
+        time.sleep(poll)
+
+    queue.close()
+    return jobs, time.perf_counter() - started
+
+
+def render_job(root, job, results):
+    """Render a claimed job and send back (seconds, error); runs in its own process."""
+    try:
+        seconds = render_section(
+            PROJECT / job["file"], job["scene"], job["quality"],
+            job["section"], Path(root) / job["output"], job["key"], Path(root) / "snapshots",
+        )
+        results.send((seconds, None))
+    except BaseException as error:
+        results.send((None, repr(error)))
+
+
+def work(root, node, slots=1, attempts=3, poll=1.0):
+    """Claim and render jobs until the coordinator closes the queue."""
+    queue = FileQueue(root)
+    # A queue closed before this node started belongs to an earlier run
+    started = queue.now()
+    context = multiprocessing.get_context("spawn")
+    # One process per job, so a render can be stopped when its claim is lost
+    running = {}
+    while True:
+        while len(running) < slots:
+            job = queue.claim()
+            if job is None:
+                break
+            job["node"] = node
+            logger.info("%(node)s: rendering %(id)s", {"node": node, "id": job["id"]})
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(target=render_job, args=(root, job, sender))
+            process.start()
+            sender.close()
+            running[job["id"]] = (process, receiver, job)
+
+        for key, (process, receiver, job) in list(running.items()):
+            if process.is_alive():
+                if not queue.heartbeat(job["id"]):
+                    # Requeued as stale; another node renders it again
+                    logger.warning("%(id)s: claim lost, stopping on %(node)s", {"id": job["id"], "node": node})
+                    process.terminate()
+                    process.join()
+                    del running[key]
+                continue
+            process.join()
+            del running[key]
+            seconds, error = receiver.recv() if receiver.poll() else (None, f"exit code {process.exitcode}")
+            receiver.close()
+            if error is None:
+                job["seconds"] = seconds
+                state = "done"
+            else:
+                job["attempts"] += 1
+                job["error"] = error
+                logger.error("%(id)s failed on %(node)s: %(e)s", {"id": job["id"], "node": node, "e": job["error"]})
+                state = "pending" if job["attempts"] < attempts else "failed"
+            try:
+                queue.finish(job, state)
+            except FileNotFoundError:
+                # Timed out and requeued; another node renders it again
+                pass
+
+        if not running and queue.is_finished(started):
+            break
+        time.sleep(poll)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    coordinator = commands.add_parser("coordinate", help="queue the jobs and assemble the videos")
+    worker = commands.add_parser("work", help="render queued jobs on this node")
+    local = commands.add_parser("local", help="a coordinator and several worker nodes on this box")
+    for command in (coordinator, worker, local):
+        command.add_argument("--root", default=str(Path(config.media_dir) / "farm"),
+                             help="directory shared by every node")
+        command.add_argument("--attempts", type=int, default=3, help="tries per job before it fails")
+    for command in (coordinator, local):
+        command.add_argument("-q", "--quality", nargs="+", choices=QUALITIES, default=["l"])
+        command.add_argument("--scene", nargs="+", help="only these scene classes")
+        command.add_argument("--heartbeat-timeout", type=float, default=60)
+    worker.add_argument("--node", default=socket.gethostname())
+    worker.add_argument("--slots", type=int, default=1, help="jobs rendered at once on this node")
+    local.add_argument("--workers", type=int, default=2, help="worker nodes to start")
+    args = parser.parse_args()
+
+    if args.command == "work":
+        work(args.root, args.node, args.slots, args.attempts)
+        return
+
+    nodes = []
+    if args.command == "local":
+        FileQueue(args.root).clear()
+        nodes = [
+            subprocess.Popen([
+                sys.executable, str(Path(__file__).resolve()), "work",
+                "--root", args.root, "--node", f"node-{index}", "--attempts", str(args.attempts),
+            ])
+            for index in range(args.workers)
+        ]
+    jobs, seconds = coordinate(
+        args.root, args.quality, args.scene, args.heartbeat_timeout, args.attempts
+    )
+    for node in nodes:
+        node.wait()
+    print_summary(jobs, seconds, len(nodes) or "remote")
+    if any(job.status == "failed" for job in jobs):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+from manim import RendererType, __version__, config, logger
+from manim.scene.scene_file_writer import SceneFileWriter
+from manim.utils.file_ops import is_gif_format, is_webm_format, modify_atime, write_to_movie
+from encoder_pipeline import EncoderPipeline
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from pydub import AudioSegment
+import os
+import subprocess
+
+
+def codec_args():
+    """The output codec flags manim itself uses for partial movie files."""
+    if is_webm_format():
+        return ["-vcodec", "libvpx-vp9", "-auto-alt-ref", "0"]
+    if config["transparent"]:
+        return ["-vcodec", "qtrle"]
+    return ["-vcodec", "libx264", "-pix_fmt", "yuv420p"]
+
+
+def frame_size():
+    return config["pixel_width"], config["pixel_height"]
+
+
+def frame_rate():
+    fps = config["frame_rate"]
+    return int(fps) if fps == int(fps) else fps
+
+
+def raw_video_command(output):
+    """ffmpeg reading RGBA frames from stdin and encoding them like manim does."""
+    width, height = frame_size()
+    return [
+        config.ffmpeg_executable,
+        "-y",
+        "-f", "rawvideo",
+        "-s", "%dx%d" % (width, height),
+        "-pix_fmt", "rgba",
+        "-r", str(frame_rate()),
+        "-i", "-",
+        "-an",
+        "-loglevel", config["ffmpeg_loglevel"].lower(),
+        *codec_args(),
+        str(output),
+    ]
+
+
+class PipeSceneFileWriter(SceneFileWriter):
+    """Writes the whole scene through one long-lived ffmpeg process.
+
+    The stock writer starts an encoder for every ``play()`` and concatenates the
+    partial movie files at the end. Here every frame goes into a single ffmpeg
+    pipe, and animations that are already cached are decoded back into the same
+    pipe. The scene's sound is muxed into that movie at the end.
+
+    Rendered plays are not written to the partial movie cache unless
+    ``cache_partials`` is set (or sections are saved, which are cut from the
+    partials). Then the encoder thread also feeds the raw frames of every
+    rendered play to an ffmpeg of its own, so each of those frames is encoded
+    twice; a partial is written under a temporary name and renamed when
+    complete, so an interrupted render never leaves a partial that looks cached.
+
+    Frames reach ffmpeg through an :class:`EncoderPipeline` with ``ring_slots``
+    preallocated frames, so rasterization overlaps with encoding.
+
+    GIF output and the OpenGL renderer fall back to the stock behaviour.
+    """
+
+    cache_workers = 2
+
+    def __init__(self, renderer, scene_name, ring_slots=8, cache_partials=False, **kwargs):
+        super().__init__(renderer, scene_name, **kwargs)
+        self.ring_slots = ring_slots
+        self.cache_partials = cache_partials or config.save_sections
+        self.pipeline = None
+        self.piped = (
+            write_to_movie()
+            and not is_gif_format()
+            and config.renderer == RendererType.CAIRO
+            and not config["dry_run"]
+        )
+        self.movie_pipe = None
+        # (ffmpeg, temporary path, path) of the play being encoded, only touched
+        # on the encoder thread
+        self.partial = None
+        self.partial_closers = None
+        self.partials_written = 0
+        self.frames_written = 0
+
+    def open_scene_pipe(self):
+        width, height = frame_size()
+        self.movie_pipe = subprocess.Popen(raw_video_command(self.movie_file_path), stdin=subprocess.PIPE)
+        self.partial_closers = ThreadPoolExecutor(max_workers=self.cache_workers)
+        self.pipeline = EncoderPipeline(self.write_raw_frame, (height, width, 4), slots=self.ring_slots)
+
+    def write_raw_frame(self, data):
+        self.movie_pipe.stdin.write(data)
+        if self.partial is not None:
+            self.partial[0].stdin.write(data)
+
+    def open_partial(self, file_path):
+        file_path = Path(file_path)
+        temporary = file_path.with_name(f"{file_path.stem}.partial{file_path.suffix}")
+        process = subprocess.Popen(raw_video_command(temporary), stdin=subprocess.PIPE)
+        self.partial = (process, temporary, file_path)
+
+    def close_partial(self):
+        if self.partial is None:
+            return
+        # ffmpeg flushes its last frames on a worker, so the scene pipe keeps going
+        self.partial_closers.submit(self.finish_partial, *self.partial)
+        self.partial = None
+
+    def begin_animation(self, allow_write=False, file_path=None):
+        if not self.piped:
+            return super().begin_animation(allow_write, file_path)
+        if self.movie_pipe is None:
+            self.open_scene_pipe()
+        if not allow_write:
+            self.replay_cached_animation()
+            return
+        if not self.cache_partials:
+            return
+        file_path = self.partial_movie_files[self.renderer.num_plays]
+        if file_path is not None:
+            self.pipeline.call(lambda: self.open_partial(file_path))
+
+    def end_animation(self, allow_write=False):
+        if not self.piped:
+            return super().end_animation(allow_write)
+        if allow_write and self.cache_partials:
+            self.pipeline.call(self.close_partial)
+
+    def write_frame(self, frame_or_renderer, *args, **kwargs):
+        if not self.piped:
+            return super().write_frame(frame_or_renderer, *args, **kwargs)
+        # Later manim versions pass the repeat count, as num_frames= or repeat=
+        repeat = kwargs.get("repeat", kwargs.get("num_frames", args[0] if args else 1))
+        for _ in range(repeat):
+            self.pipeline.submit(frame_or_renderer)
+        self.frames_written += repeat
+
+    def replay_cached_animation(self):
+        """Decode a cached partial movie file into the scene pipe."""
+        if self.renderer.num_plays >= len(self.partial_movie_files):
+            return
+        file_path = self.partial_movie_files[self.renderer.num_plays]
+        if file_path is None or not Path(file_path).exists():
+            return
+        decoder = subprocess.Popen(
+            [
+                config.ffmpeg_executable,
+                "-i", file_path,
+                "-f", "rawvideo",
+                "-pix_fmt", "rgba",
+                "-loglevel", "error",
+                "-",
+            ],
+            stdout=subprocess.PIPE,
+        )
+        while True:
+            # Decode straight into a ring slot instead of allocating per frame
+            index, slot = self.pipeline.acquire()
+            if decoder.stdout.readinto(slot.reshape(-1)) < slot.size:
+                self.pipeline.release(index)
+                break
+            self.pipeline.commit(index)
+            self.frames_written += 1
+        decoder.wait()
+        modify_atime(file_path)
+
+    def finish_partial(self, process, temporary, file_path):
+        process.stdin.close()
+        if process.wait() == 0:
+            os.replace(temporary, file_path)
+            self.partials_written += 1
+        else:
+            temporary.unlink(missing_ok=True)
+            logger.warning("Could not write partial movie file %(path)s", {"path": str(file_path)})
+
+    def add_sound(self):
+        """Mux the scene's sound into the movie, as ``combine_to_movie`` does."""
+        movie = Path(self.movie_file_path)
+        sound = movie.with_suffix(".wav")
+        # Pads the sound to the length of the video
+        self.add_audio_segment(AudioSegment.silent(0))
+        self.audio_segment.export(sound, bitrate="312k")
+        temporary = movie.with_name(f"{movie.stem}.partial{movie.suffix}")
+        subprocess.run(
+            [
+                config.ffmpeg_executable,
+                "-y",
+                "-i", str(movie),
+                "-i", str(sound),
+                "-c:v", "copy",
+                "-c:a", "libopus" if is_webm_format() else "aac",
+                "-b:a", "320k",
+                "-map", "0:v:0",
+                "-map", "1:a:0",
+                "-loglevel", config.ffmpeg_loglevel.lower(),
+                "-metadata", f"comment=Rendered with Manim Community v{__version__}",
+                str(temporary),
+            ],
+            check=True,
+        )
+        os.replace(temporary, movie)
+        sound.unlink()
+
+    def finish(self):
+        if not self.piped:
+            return super().finish()
+        if self.movie_pipe is not None:
+            self.pipeline.close()
+            self.movie_pipe.stdin.close()
+            self.movie_pipe.wait()
+            self.partial_closers.shutdown()
+            stats = self.pipeline.stats()
+            logger.info(
+                "Encoded %(frames)d frames at %(fps).1f fps "
+                "(max queue depth %(depth)d/%(slots)d, renderer waited %(wait).2fs)",
+                {
+                    "frames": stats["frames"],
+                    "fps": stats["frames_per_second"],
+                    "depth": stats["max_queue_depth"],
+                    "slots": stats["slots"],
+                    "wait": stats["producer_wait_seconds"],
+                },
+            )
+        if self.includes_sound:
+            self.add_sound()
+        self.print_file_ready_message(str(self.movie_file_path))
+        if self.cache_partials:
+            logger.info("Cached %(n)d partial movie file(s)", {"n": self.partials_written})
+
+        if config.save_sections:
+            self.combine_to_section_videos()
+        if config["flush_cache"]:
+            self.flush_cache_directory()
+        else:
+            self.clean_cache()
+        if self.subcaptions:
+            self.write_subcaption_file()
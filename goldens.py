@@ -0,0 +1,217 @@
+"""Catch layout regressions by comparing sampled frames against stored goldens.
+
+Usage::
+
+    python goldens.py --update            # record goldens for every scene
+    python goldens.py                     # compare against them (make goldens)
+    python goldens.py --every 10 --scene BackpropExplainer
+
+Scenes run at 320x180 without writing any video. By default only the last
+frame of every ``play()`` is rasterized: animations are skipped to their end,
+so a whole scene costs one frame per animation. ``--every N`` samples every
+Nth frame instead and rasterizes only those. Each sample is reduced to a
+64-bit perceptual hash (a DCT of the downscaled grayscale frame, thresholded
+at its median), which survives anti-aliasing and font hinting noise but not
+a box that moved. Samples more than ``--tolerance`` bits away from their
+golden fail, and the frame is saved to ``media/goldens/<Scene>/`` to look at.
+
+Goldens live in ``goldens/<Scene>.json`` and are committed with the scenes;
+scenes are checked in parallel. A scene without goldens fails the check; only
+``--update`` records them. ``tests/test_goldens.py`` runs the check under
+pytest where Cairo and Pango are available.
+"""
+
+from render import load_scenes
+from manim import config
+from manim.renderer.cairo_renderer import CairoRenderer
+from batch import find_scenes
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image
+import argparse
+import json
+import multiprocessing
+import numpy as np
+import random
+import time
+from pathlib import Path
+
+GOLDEN_DIR = Path(__file__).resolve().parent / "goldens"
+RESOLUTION = (320, 180)
+HASH_SIZE = 8
+DCT_SIZE = 32
+
+
+def dct_matrix(size):
+    k = np.arange(size)
+    matrix = np.cos(np.pi * (2 * k[None, :] + 1) * k[:, None] / (2 * size))
+    matrix[0] /= np.sqrt(2)
+    return matrix * np.sqrt(2 / size)
+
+
+DCT = dct_matrix(DCT_SIZE)
+
+
+def perceptual_hash(frame):
+    """64-bit pHash of an RGBA frame, as a hex string."""
+    gray = Image.fromarray(frame).convert("L").resize((DCT_SIZE, DCT_SIZE), Image.LANCZOS)
+    coefficients = DCT @ np.asarray(gray, dtype=np.float64) @ DCT.T
+    # The lowest frequencies without the DC term, which only tracks brightness
+    low = coefficients[:HASH_SIZE, :HASH_SIZE].reshape(-1)
+    bits = low > np.median(low[1:])
+    return f"{int(''.join('1' if bit else '0' for bit in bits), 2):016x}"
+
+
+def hash_distance(a, b):
+    return bin(int(a, 16) ^ int(b, 16)).count("1")
+
+
+class SampledRenderer(CairoRenderer):
+    """Rasterizes only the sampled frames and keeps their perceptual hashes.
+
+    With ``every=None`` animations are skipped to their end and the last frame
+    of each ``play()`` is sampled; otherwise every ``every``-th frame is.
+    """
+
+    def __init__(self, every=None, **kwargs):
+        super().__init__(skip_animations=every is None, **kwargs)
+        self.every = every
+        self.frame_index = 0
+        self.samples = []
+
+    def sample(self, label):
+        frame = self.camera.pixel_array
+        self.samples.append({"label": label, "hash": perceptual_hash(frame), "frame": frame.copy()})
+
+    def play(self, scene, *args, **kwargs):
+        super().play(scene, *args, **kwargs)
+        if self.every is None:
+            self.sample(f"play {self.num_plays - 1}")
+
+    def render(self, scene, time, moving_mobjects):
+        if self.every is None:
+            self.update_frame(scene, moving_mobjects)
+            return
+        if self.frame_index % self.every == 0:
+            self.update_frame(scene, moving_mobjects)
+            self.sample(f"frame {self.frame_index}")
+        self.frame_index += 1
+
+    def freeze_current_frame(self, duration):
+        if self.every is None:
+            return
+        frames = int(duration * self.camera.frame_rate)
+        first = True
+        for index in range(self.frame_index, self.frame_index + frames):
+            if index % self.every:
+                continue
+            if first:
+                self.sample(f"frame {index}")
+                first = False
+            else:
+                # The frame does not change during a wait, so its hash is reused
+                self.samples.append(dict(self.samples[-1], label=f"frame {index}"))
+        self.frame_index += frames
+
+
+def check_scene(path, scene_name, every=None, goldens=None, tolerance=6):
+    """Run a scene and return its samples, saving the frames that fail."""
+    started = time.perf_counter()
+    config.pixel_width, config.pixel_height = RESOLUTION
+    config.frame_rate = 15
+    config.dry_run = True
+    config.disable_caching = True
+    config.input_file = str(path)
+    random.seed(0)
+    np.random.seed(0)
+
+    renderer = SampledRenderer(every)
+    load_scenes(path)[scene_name](renderer=renderer).render()
+
+    failures = []
+    golden_hashes = [sample["hash"] for sample in goldens or []]
+    for index, sample in enumerate(renderer.samples):
+        frame = sample.pop("frame")
+        if goldens is None:
+            continue
+        if index >= len(golden_hashes):
+            failures.append(f"{sample['label']}: not in the goldens")
+            continue
+        distance = hash_distance(sample["hash"], golden_hashes[index])
+        if distance > tolerance:
+            output = Path(config.media_dir) / "goldens" / scene_name / f"{index:04}.png"
+            output.parent.mkdir(parents=True, exist_ok=True)
+            Image.fromarray(frame).save(output)
+            failures.append(f"{sample['label']}: {distance} bits off, see {output}")
+    if goldens is not None and len(golden_hashes) > len(renderer.samples):
+        failures.append(f"{len(golden_hashes) - len(renderer.samples)} golden sample(s) missing")
+    return renderer.samples, failures, time.perf_counter() - started
+
+
+def golden_path(scene_name):
+    return GOLDEN_DIR / f"{scene_name}.json"
+
+
+def record_goldens(scene_name, sampling, samples):
+    GOLDEN_DIR.mkdir(exist_ok=True)
+    golden_path(scene_name).write_text(json.dumps(
+        {"sampling": sampling, "resolution": RESOLUTION, "samples": samples}, indent=4
+    ) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--update", action="store_true", help="record new goldens")
+    parser.add_argument("--every", type=int, help="sample every Nth frame instead of the end of each play")
+    parser.add_argument("--tolerance", type=int, default=6, help="bits a hash may differ by")
+    parser.add_argument("--scene", nargs="+", help="only these scene classes")
+    parser.add_argument("-j", "--jobs", type=int, help="number of worker processes")
+    args = parser.parse_args()
+
+    sampling = f"every {args.every}" if args.every else "last"
+    scenes = [
+        (path, scene_name)
+        for path, scene_name in find_scenes(Path(__file__).resolve().parent)
+        if args.scene is None or scene_name in args.scene
+    ]
+    goldens = {}
+    if not args.update:
+        missing = [scene_name for _, scene_name in scenes if not golden_path(scene_name).exists()]
+        if missing:
+            raise SystemExit(f"No goldens for {', '.join(missing)}; record them with --update and commit goldens/")
+        for path, scene_name in scenes:
+            stored = json.loads(golden_path(scene_name).read_text())
+            if stored["sampling"] != sampling:
+                raise SystemExit(
+                    f"The goldens for {scene_name} sample {stored['sampling']!r}, not {sampling!r}; "
+                    "run with --update to replace them"
+                )
+            goldens[scene_name] = stored["samples"]
+
+    started = time.perf_counter()
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(args.jobs, mp_context=context, max_tasks_per_child=1) as pool:
+        futures = {
+            scene_name: pool.submit(
+                check_scene, path, scene_name, args.every, goldens.get(scene_name), args.tolerance
+            )
+            for path, scene_name in scenes
+        }
+        failed = False
+        for scene_name, future in futures.items():
+            samples, failures, seconds = future.result()
+            if args.update:
+                record_goldens(scene_name, sampling, samples)
+                print(f"{scene_name}: recorded {len(samples)} samples in {seconds:.1f}s")
+                continue
+            status = "FAIL" if failures else "ok"
+            print(f"{scene_name}: {status}, {len(samples)} samples in {seconds:.1f}s")
+            for failure in failures:
+                print(f"    {failure}")
+            failed = failed or bool(failures)
+    print(f"{len(scenes)} scene(s) in {time.perf_counter() - started:.1f}s")
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Fade many mobjects at once through a single opacity multiplier.
+
+``FadeOut(mob) for mob in self.mobjects`` builds one Transform per mobject,
+copies every mobject for its start and target, and interpolates all of their
+points and colors every frame. ``GroupFadeOut`` and ``GroupFadeIn`` never touch
+the mobjects: each frame they only change one ``opacity`` number, and the Cairo
+camera multiplies the alpha of every faded mobject by it when drawing.
+
+Play them directly in ``self.play`` rather than inside an ``AnimationGroup``,
+which would add all the mobjects to the scene a second time. Vectorized
+mobjects and point clouds are faded; images simply appear or disappear at the
+end.
+
+The multiplier hooks into the Cairo camera only. With a camera that lacks its
+drawing hooks (the OpenGL renderer's), they play a plain ``FadeOut`` or
+``FadeIn`` of all the mobjects instead.
+"""
+
+from manim import *
+
+# Camera methods group_fades wraps; the Cairo camera has them, OpenGL's does not
+FADE_HOOKS = ("set_cairo_context_color", "display_point_cloud")
+
+
+def group_fades(camera):
+    """Let ``camera`` apply group opacities when it draws; returns their registry."""
+    if not hasattr(camera, "group_fades"):
+        camera.group_fades = {}
+        set_color = camera.set_cairo_context_color
+
+        def set_cairo_context_color(ctx, rgbas, vmobject):
+            fade = camera.group_fades.get(id(vmobject))
+            if fade is not None:
+                rgbas = rgbas.copy()
+                rgbas[:, 3] *= fade.opacity
+            return set_color(ctx, rgbas, vmobject)
+
+        camera.set_cairo_context_color = set_cairo_context_color
+        display_point_cloud = camera.display_point_cloud
+
+        def display_faded_point_cloud(pmobject, points, rgbas, thickness, pixel_array):
+            fade = camera.group_fades.get(id(pmobject))
+            if fade is not None:
+                # Point pixels are written without blending, so fade toward the background
+                rgbas = rgbas.copy()
+                rgbas[:, :3] = interpolate(color_to_rgb(camera.background_color), rgbas[:, :3], fade.opacity)
+            return display_point_cloud(pmobject, points, rgbas, thickness, pixel_array)
+
+        camera.display_point_cloud = display_faded_point_cloud
+    return camera.group_fades
+
+
+def all_except(mobjects, *keep):
+    """The mobjects that are not one of ``keep``, compared by identity."""
+    kept = {id(mobject) for mobject in keep}
+    return [mobject for mobject in mobjects if id(mobject) not in kept]
+
+
+class GroupFade(Animation):
+    fade_in = False
+
+    def __init__(self, *mobjects, **kwargs):
+        self.mobjects = mobjects
+        self.opacity = 0.0 if self.fade_in else 1.0
+        self.fades = None
+        self.family_ids = ()
+        self.fallback = None
+        # Introducer, so the scene does not add the whole group as one more mobject
+        super().__init__(None, introducer=True, remover=not self.fade_in, **kwargs)
+
+    def _setup_scene(self, scene):
+        if not all(hasattr(scene.renderer.camera, hook) for hook in FADE_HOOKS):
+            fade = FadeIn if self.fade_in else FadeOut
+            self.fallback = fade(*self.mobjects, run_time=self.run_time, rate_func=self.rate_func)
+            self.fallback._setup_scene(scene)
+            return
+        if self.fade_in:
+            scene.add(*self.mobjects)
+        self.fades = group_fades(scene.renderer.camera)
+        self.family_ids = {
+            id(member) for mobject in self.mobjects for member in mobject.get_family()
+        }
+        for member_id in self.family_ids:
+            self.fades[member_id] = self
+        # The scene redraws every mobject after the first one that moves
+        self.mobject = next(
+            (member for member in scene.get_mobject_family_members() if id(member) in self.family_ids),
+            self.mobject,
+        )
+
+    def begin(self):
+        if self.fallback is not None:
+            self.fallback.begin()
+            return
+        self.interpolate(0)
+
+    def interpolate(self, alpha):
+        if self.fallback is not None:
+            self.fallback.interpolate(alpha)
+            return
+        alpha = self.rate_func(alpha)
+        self.opacity = alpha if self.fade_in else 1 - alpha
+
+    def update_mobjects(self, dt):
+        if self.fallback is not None:
+            self.fallback.update_mobjects(dt)
+
+    def finish(self):
+        if self.fallback is not None:
+            self.fallback.finish()
+            return
+        self.interpolate(1)
+
+    def clean_up_from_scene(self, scene):
+        if self.fallback is not None:
+            self.fallback.clean_up_from_scene(scene)
+            if self.is_remover():
+                scene.remove(*self.mobjects)
+            return
+        for member_id in self.family_ids:
+            if self.fades.get(member_id) is self:
+                del self.fades[member_id]
+        self._on_finish(scene)
+        if self.is_remover():
+            scene.remove(*self.mobjects)
+
+
+class GroupFadeOut(GroupFade):
+    """Fade out and remove any number of mobjects."""
+
+
+class GroupFadeIn(GroupFade):
+    """Add and fade in any number of mobjects."""
+
+    fade_in = True
@@ -0,0 +1,243 @@
+from manim import *
+from localization import verbatim
+
+
+class GlyphCache:
+    """Shapes each distinct word once per font, size and color and hands out copies.
+
+    Templates are normalised so that the word starts at x = 0 and sits on the
+    baseline y = 0, which lets words from separate ``Text`` calls line up.
+    Use :meth:`for_font` to share one cache between all texts with the same style.
+    """
+
+    _shared = {}
+
+    def __init__(self, font_size=DEFAULT_FONT_SIZE, color=WHITE, font=""):
+        self.font_size = font_size
+        self.color = color
+        self.font = font
+        self.templates = {}
+
+        # Measure the advance of a space and the line height once per font
+        with verbatim():
+            probe = Text("x x", font_size=font_size, font=font)
+            line_height = Text("Ag", font_size=font_size, font=font).height
+        self.space_width = probe[1].get_left()[0] - probe[0].get_right()[0]
+        self.line_height = line_height * 1.4
+
+    @classmethod
+    def for_font(cls, font_size=DEFAULT_FONT_SIZE, color=WHITE, font=""):
+        key = (font, font_size, str(color))
+        if key not in cls._shared:
+            cls._shared[key] = cls(font_size=font_size, color=color, font=font)
+        return cls._shared[key]
+
+    def template(self, word):
+        if word not in self.templates:
+            # The leading "x" marks the baseline, since Text drops that information
+            with verbatim():
+                shaped = Text("x" + word, font_size=self.font_size, color=self.color, font=self.font)
+            anchor = shaped[0]
+            glyph = VGroup(*shaped.submobjects[1:])
+            glyph.shift(-glyph.get_left()[0] * RIGHT - anchor.get_bottom()[1] * UP)
+            self.templates[word] = glyph
+        return self.templates[word]
+
+    def get(self, word):
+        return self.template(word).copy()
+
+    def width(self, word):
+        return self.template(word).width
+
+
+class IncrementalText(VGroup):
+    """Text that grows word by word without re-running Pango on what is shown.
+
+    Every word is a separate span shaped through a shared :class:`GlyphCache`
+    and placed from a cursor relative to an invisible anchor at the top left, so
+    appending only lays out the new words and replacing a span only moves the
+    rest of its line (or reflows the lines after it when that line overflows).
+    With ``max_lines`` set, the oldest line is dropped once the text is full;
+    ``line_spacing`` scales the distance between baselines.
+    Move the group freely, but pick the size through ``font_size`` rather than
+    scaling it.
+    """
+
+    def __init__(self, font_size=DEFAULT_FONT_SIZE, color=WHITE, font="",
+                 max_width=None, max_lines=None, line_spacing=1, **kwargs):
+        super().__init__(**kwargs)
+        self.glyphs = GlyphCache.for_font(font_size=font_size, color=color, font=font)
+        self.max_width = max_width
+        self.max_lines = max_lines
+        self.line_height = self.glyphs.line_height * line_spacing
+        self.anchor = VectorizedPoint()
+        self.add(self.anchor)
+        self.lines = [[]]
+        self.cursor = 0
+        self.offsets = {}
+        self.parents = {}
+        # id()s of the scene a TypeIn last found this text on and of the
+        # top-level mobject of that scene it was found under
+        self.typed_on = None
+
+    @property
+    def spans(self):
+        return [span for line in self.lines for span in line]
+
+    def measure(self, line):
+        """Width of a single line of text, shaping its words into the cache."""
+        words = line.split()
+        if not words:
+            return 0
+        widths = sum(self.glyphs.width(word) for word in words)
+        return widths + self.glyphs.space_width * (len(words) - 1)
+
+    def move_span(self, span, x, line_index):
+        # Spans are shifted by the change in offset, never rebuilt
+        offset = np.array([x, -self.line_height * (line_index + 0.75), 0])
+        span.shift(offset - self.offsets.get(id(span), -self.anchor.get_center()))
+        self.offsets[id(span)] = offset
+
+    def place(self, span):
+        """Put ``span`` at the cursor, wrapping onto a new line if it doesn't fit."""
+        x = self.cursor + (self.glyphs.space_width if self.lines[-1] else 0)
+        if self.lines[-1] and self.max_width is not None and x + span.width > self.max_width:
+            self.lines.append([])
+            x = 0
+        self.move_span(span, x, len(self.lines) - 1)
+        self.lines[-1].append(span)
+        self.cursor = x + span.width
+
+    def append(self, string):
+        """Append ``string`` (newlines start new lines) and return the new spans."""
+        new_spans = VGroup()
+        for line_number, line in enumerate(string.split("\n")):
+            if line_number > 0:
+                self.new_line()
+            for word in line.split():
+                span = self.glyphs.get(word)
+                self.place(span)
+                new_spans.add(span)
+                self.parents[id(span)] = new_spans
+        # New spans stay grouped so an animation can target exactly them
+        self.add(new_spans)
+        self.trim_lines()
+        return new_spans
+
+    def new_line(self):
+        self.lines.append([])
+        self.cursor = 0
+        return self
+
+    def replace_span(self, index, word):
+        """Swap the span at ``index`` for ``word`` and return (old_span, new_span).
+
+        Only the spans after it on the same line move; if the line overflows,
+        the lines from there on are reflowed.
+        """
+        line_index, position = self.locate(index)
+        line = self.lines[line_index]
+        old = line[position]
+        new = self.glyphs.get(word)
+        x = self.offsets[id(old)][0]
+        self.move_span(new, x, line_index)
+        line[position] = new
+        self.detach(old)
+        self.add(new)
+        self.parents[id(new)] = self
+
+        delta = new.width - old.width
+        for span in line[position + 1:]:
+            self.move_span(span, self.offsets[id(span)][0] + delta, line_index)
+        if line_index == len(self.lines) - 1:
+            self.cursor += delta
+        if self.max_width is not None and line and self.line_width(line) > self.max_width:
+            self.reflow(line_index)
+        return old, new
+
+    def locate(self, index):
+        for line_index, line in enumerate(self.lines):
+            if index < len(line):
+                return line_index, index
+            index -= len(line)
+        raise IndexError("span index out of range")
+
+    def detach(self, span):
+        del self.offsets[id(span)]
+        parent = self.parents.pop(id(span))
+        parent.remove(span)
+        if parent is not self and not parent.submobjects:
+            self.remove(parent)
+
+    def line_width(self, line):
+        return self.offsets[id(line[-1])][0] + line[-1].width
+
+    def reflow(self, line_index):
+        """Lay out every span from ``line_index`` onwards again."""
+        tail = [span for line in self.lines[line_index:] for span in line]
+        self.lines = self.lines[:line_index] + [[]]
+        self.cursor = 0
+        for span in tail:
+            self.place(span)
+        self.trim_lines()
+
+    def trim_lines(self):
+        """Drop the oldest lines beyond ``max_lines`` and move the rest up."""
+        if self.max_lines is None or len(self.lines) <= self.max_lines:
+            return VGroup()
+        dropped = VGroup()
+        while len(self.lines) > self.max_lines:
+            for span in self.lines.pop(0):
+                self.detach(span)
+                dropped.add(span)
+        for line_index, line in enumerate(self.lines):
+            for span in line:
+                self.move_span(span, self.offsets[id(span)][0], line_index)
+        return dropped
+
+
+class TypeIn(Animation):
+    """Append ``string`` to an :class:`IncrementalText` and reveal it glyph by glyph.
+
+    The animated mobject is only the group of new spans, so the text already on
+    screen ends up in the renderer's static background and every frame costs
+    time proportional to the new words rather than the whole passage.
+    """
+
+    def __init__(self, text, string, **kwargs):
+        self.text = text
+        spans = text.append(string)
+        self.chars = [char for span in spans for char in span]
+        self.opacities = [char.get_fill_opacity() for char in self.chars]
+        self.shown = len(self.chars)
+        super().__init__(spans, introducer=True, **kwargs)
+
+    def _setup_scene(self, scene):
+        # Add the whole text rather than the new spans, which would split it apart.
+        # Only the first TypeIn on a scene searches the scene's family, which grows
+        # with every glyph typed; later ones just check that the top-level mobject
+        # the text was found under (itself, or a group holding it) is still there
+        if scene is None:
+            return
+        if self.text.typed_on is not None:
+            scene_id, root_id = self.text.typed_on
+            if scene_id == id(scene) and any(id(mobject) == root_id for mobject in scene.mobjects):
+                return
+        root = next((mobject for mobject in scene.mobjects if self.text in mobject.get_family()), None)
+        if root is None:
+            scene.add(self.text)
+            root = self.text
+        self.text.typed_on = (id(scene), id(root))
+
+    def begin(self):
+        for char in self.chars:
+            char.set_fill(opacity=0)
+        self.shown = 0
+        super().begin()
+
+    def interpolate_mobject(self, alpha):
+        # Only glyphs crossing the threshold since the previous frame are touched
+        target = int(np.ceil(self.rate_func(alpha) * len(self.chars)))
+        for char, opacity in zip(self.chars[self.shown:target], self.opacities[self.shown:target]):
+            char.set_fill(opacity=opacity)
+        self.shown = max(self.shown, target)
@@ -0,0 +1,338 @@
+"""Groups of identical shapes stored as one mobject.
+
+Usage::
+
+    neurons = InstancedGroup(Circle(radius=0.25, fill_opacity=0.8), 5).arrange(DOWN, buff=0.4)
+    self.play(Create(neurons))
+    self.play(neurons[1].animate.set_fill(YELLOW))
+
+    python instanced.py --count 10000     # compare with a VGroup of circles
+
+A ``VGroup`` of five circles is six mobjects, each with its own attributes,
+color arrays and point array. An ``InstancedGroup`` is a single mobject: the
+points of all instances live in one array, one block per instance with the
+template's curves, next to one row of fill and stroke color per instance.
+Moving, scaling and arranging the group works on the whole array at once.
+
+Indexing returns a lightweight ``Instance`` view that can be measured, moved,
+recolored and animated on its own. An ``Instance`` is not a mobject: it can't
+be added to a scene or a ``VGroup``, and ``next_to`` takes one of its points
+(``neurons[0].get_top()``) rather than the instance itself.
+
+A camera draws the instances that share a style as one path, so a column of
+neurons costs one fill and one stroke, once ``instanced_drawing`` is installed
+on it; scenes with instanced groups do that in ``setup``::
+
+    def setup(self):
+        instanced_drawing(self.renderer.camera)
+"""
+
+from manim import *
+import argparse
+import numpy as np
+import time
+import tracemalloc
+
+
+def cubic_pieces(curves, a, b):
+    """The ``[a, b]`` part of cubic Bezier curves shaped ``(..., 4, 3)``."""
+
+    def blossom(*ts):
+        points = curves
+        for t in ts:
+            points = (1 - t) * points[..., :-1, :] + t * points[..., 1:, :]
+        return points[..., 0, :]
+
+    return np.stack([blossom(a, a, a), blossom(a, a, b), blossom(a, b, b), blossom(b, b, b)], axis=-2)
+
+
+class Instance:
+    """One shape of an ``InstancedGroup``; reads and writes the group's arrays.
+
+    Only the methods below are supported, not the rest of the ``Mobject`` API.
+    """
+
+    # No __slots__: manim hashes the animations of a play() through their
+    # __dict__, and without one every instance of a group hashed the same
+    def __init__(self, group, index):
+        self.group = group
+        self.index = index
+
+    @property
+    def points(self):
+        return self.group.blocks()[self.index]
+
+    def get_critical_point(self, direction):
+        points = self.points
+        low, high = points.min(axis=0), points.max(axis=0)
+        return (low + high) / 2 + np.sign(direction) * (high - low) / 2
+
+    def get_center(self):
+        return self.get_critical_point(ORIGIN)
+
+    def get_top(self):
+        return self.get_critical_point(UP)
+
+    def get_bottom(self):
+        return self.get_critical_point(DOWN)
+
+    def get_left(self):
+        return self.get_critical_point(LEFT)
+
+    def get_right(self):
+        return self.get_critical_point(RIGHT)
+
+    @property
+    def width(self):
+        return np.ptp(self.points[:, 0])
+
+    @property
+    def height(self):
+        return np.ptp(self.points[:, 1])
+
+    def get_fill_color(self):
+        return ManimColor(self.group.fills[self.index, :3])
+
+    def shift(self, *vectors):
+        self.points[:] += sum(vectors)
+        return self
+
+    def move_to(self, point):
+        return self.shift(point - self.get_center())
+
+    def scale(self, factor):
+        center = self.get_center()
+        self.points[:] = center + (self.points - center) * factor
+        return self
+
+    def set_fill(self, color=None, opacity=None):
+        if color is not None:
+            self.group.fills[self.index, :3] = color_to_rgb(color)
+        if opacity is not None:
+            self.group.fills[self.index, 3] = opacity
+        return self
+
+    def set_stroke(self, color=None, opacity=None):
+        if color is not None:
+            self.group.strokes[self.index, :3] = color_to_rgb(color)
+        if opacity is not None:
+            self.group.strokes[self.index, 3] = opacity
+        return self
+
+    def set_color(self, color):
+        self.set_fill(color)
+        return self.set_stroke(color)
+
+    @property
+    def animate(self):
+        """An animation that records ``set_fill``, ``shift`` and the like to play."""
+        return InstanceAnimation(self)
+
+
+class InstancedGroup(VMobject):
+    """``count`` copies of ``template`` in one mobject."""
+
+    def __init__(self, template, count, **kwargs):
+        self.count = count
+        self.template_points = template.points.copy()
+        self.fills = np.repeat(template.get_fill_rgbas()[:1], count, axis=0)
+        self.strokes = np.repeat(template.get_stroke_rgbas()[:1], count, axis=0)
+        style = {
+            "fill_color": template.get_fill_color(),
+            "fill_opacity": template.get_fill_opacity(),
+            "stroke_color": template.get_stroke_color(),
+            "stroke_opacity": template.get_stroke_opacity(),
+            "stroke_width": template.get_stroke_width(),
+        }
+        super().__init__(**{**style, **kwargs})
+
+    def generate_points(self):
+        self.points = np.tile(self.template_points, (self.count, 1))
+
+    def blocks(self):
+        """The points as a ``(count, points per instance, 3)`` view."""
+        return self.points.reshape(self.count, -1, 3)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [Instance(self, i) for i in range(self.count)[index]]
+        return Instance(self, range(self.count)[index])
+
+    def __iter__(self):
+        return (Instance(self, i) for i in range(self.count))
+
+    def __len__(self):
+        return self.count
+
+    def arrange(self, direction=RIGHT, buff=DEFAULT_MOBJECT_TO_MOBJECT_BUFFER, center=True, aligned_edge=ORIGIN):
+        """Place each instance ``next_to`` the one before it, all in one step."""
+        blocks = self.blocks()
+        low, high = blocks.min(axis=1), blocks.max(axis=1)
+        centers, halves = (low + high) / 2, (high - low) / 2
+        direction, aligned_edge = np.asarray(direction), np.asarray(aligned_edge)
+        steps = (
+            np.sign(aligned_edge + direction) * halves[:-1]
+            - np.sign(aligned_edge - direction) * halves[1:]
+            + buff * direction
+        )
+        arranged = centers[0] + np.vstack([np.zeros((1, 3)), np.cumsum(steps, axis=0)])
+        blocks += (arranged - centers)[:, None, :]
+        if center:
+            self.center()
+        return self
+
+    def set_fill(self, color=None, opacity=None, family=True):
+        super().set_fill(color, opacity, family)
+        if color is not None:
+            self.fills[:, :3] = self.fill_rgbas[0, :3]
+        if opacity is not None:
+            self.fills[:, 3] = self.fill_rgbas[0, 3]
+        return self
+
+    def set_stroke(self, color=None, width=None, opacity=None, background=False, family=True):
+        super().set_stroke(color, width, opacity, background, family)
+        if background:
+            return self
+        if color is not None:
+            self.strokes[:, :3] = self.stroke_rgbas[0, :3]
+        if opacity is not None:
+            self.strokes[:, 3] = self.stroke_rgbas[0, 3]
+        return self
+
+    def interpolate_color(self, mobject1, mobject2, alpha):
+        super().interpolate_color(mobject1, mobject2, alpha)
+        self.fills = interpolate(mobject1.fills, mobject2.fills, alpha)
+        self.strokes = interpolate(mobject1.strokes, mobject2.strokes, alpha)
+
+    def pointwise_become_partial(self, vmobject, a, b):
+        """Cut every instance at once, so ``Create`` draws them side by side."""
+        if a <= 0 and b >= 1:
+            self.points = vmobject.points.copy()
+            return self
+        curves = vmobject.points.reshape(vmobject.count, -1, 4, 3)
+        lower_index, lower_residue = integer_interpolate(0, curves.shape[1], a)
+        upper_index, upper_residue = integer_interpolate(0, curves.shape[1], b)
+        if lower_index == upper_index:
+            pieces = [cubic_pieces(curves[:, lower_index], lower_residue, upper_residue)[:, None]]
+        else:
+            pieces = [
+                cubic_pieces(curves[:, lower_index], lower_residue, 1)[:, None],
+                curves[:, lower_index + 1:upper_index],
+                cubic_pieces(curves[:, upper_index], 0, upper_residue)[:, None],
+            ]
+        self.points = np.concatenate(pieces, axis=1).reshape(-1, 3)
+        return self
+
+    def batches(self):
+        """Swap in the points and colors of each set of same-styled instances."""
+        saved = self.points, self.fill_rgbas, self.stroke_rgbas
+        styles, batch_of = np.unique(np.hstack([self.fills, self.strokes]), axis=0, return_inverse=True)
+        batch_of = batch_of.reshape(-1)
+        blocks = self.blocks()
+        try:
+            for index, style in enumerate(styles):
+                self.points = blocks[batch_of == index].reshape(-1, 3)
+                self.fill_rgbas, self.stroke_rgbas = style[None, :4], style[None, 4:]
+                yield
+        finally:
+            self.points, self.fill_rgbas, self.stroke_rgbas = saved
+
+
+def instanced_drawing(camera):
+    """Let ``camera`` draw each ``InstancedGroup`` in batches of its styles."""
+    if not hasattr(camera, "instanced_drawing"):
+        camera.instanced_drawing = True
+        display_vectorized = camera.display_vectorized
+
+        def display_instanced(vmobject, ctx):
+            if not isinstance(vmobject, InstancedGroup):
+                return display_vectorized(vmobject, ctx)
+            for _ in vmobject.batches():
+                display_vectorized(vmobject, ctx)
+            return camera
+
+        camera.display_vectorized = display_instanced
+    return camera
+
+
+class InstanceAnimation(Animation):
+    """Moves and recolors one instance, leaving the rest of its group alone."""
+
+    def __init__(self, instance, **kwargs):
+        self.instance = instance
+        self.calls = []
+        self.start = self.end = None
+        super().__init__(instance.group, **kwargs)
+
+    def record(name):
+        def method(self, *args, **kwargs):
+            self.calls.append((name, args, kwargs))
+            return self
+
+        method.__name__ = name
+        return method
+
+    shift = record("shift")
+    move_to = record("move_to")
+    scale = record("scale")
+    set_fill = record("set_fill")
+    set_stroke = record("set_stroke")
+    set_color = record("set_color")
+    del record
+
+    def state(self):
+        group, index = self.instance.group, self.instance.index
+        return group.blocks()[index].copy(), group.fills[index].copy(), group.strokes[index].copy()
+
+    def _setup_scene(self, scene):
+        super()._setup_scene(scene)
+        if scene is not None:
+            instanced_drawing(scene.renderer.camera)
+
+    def begin(self):
+        self.start = self.state()
+        for name, args, kwargs in self.calls:
+            getattr(self.instance, name)(*args, **kwargs)
+        self.end = self.state()
+        super().begin()
+
+    def interpolate_mobject(self, alpha):
+        alpha = self.rate_func(alpha)
+        group, index = self.instance.group, self.instance.index
+        points, fill, stroke = (interpolate(a, b, alpha) for a, b in zip(self.start, self.end))
+        group.blocks()[index] = points
+        group.fills[index] = fill
+        group.strokes[index] = stroke
+
+    def update_mobjects(self, dt):
+        pass
+
+
+def measure(count):
+    """Seconds and traced bytes to build ``count`` circles either way."""
+    results = {}
+    for name, build in (
+        ("VGroup", lambda: VGroup(*[Circle(radius=0.25, fill_opacity=0.8) for _ in range(count)])),
+        ("InstancedGroup", lambda: InstancedGroup(Circle(radius=0.25, fill_opacity=0.8), count)),
+    ):
+        tracemalloc.start()
+        started = time.perf_counter()
+        group = build().arrange(DOWN, buff=0.1)
+        seconds = time.perf_counter() - started
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        results[name] = (seconds, size)
+        del group
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=1000, help="number of circles")
+    args = parser.parse_args()
+    for name, (seconds, size) in measure(args.count).items():
+        print(f"{name:<16} {seconds * 1000:9.1f} ms  {size / 2**20:8.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""Lay out a diagram in one pass instead of chained arrange and next_to calls.
+
+Usage::
+
+    layout = Layout()
+    cards = [layout.overlay(box, label) for box, label in zip(boxes, labels)]
+    layout.column(title, layout.row(*cards, buff=0.5), buff=0.5)
+    layout.next_to(caption, title, UP)
+    layout.apply()
+
+Every ``arrange``, ``next_to`` or ``align_to`` on a mobject walks its family
+to find its bounding box and then walks it again to shift its points, so a
+diagram built from nested groups is measured and moved many times over. A
+``Layout`` records the same rules, reads the box of each mobject once into
+two arrays, works out every rule on those arrays, and then shifts each
+mobject once by its total offset. The last ``SOLUTIONS`` solutions are
+remembered by rules and boxes, so laying out an unchanged diagram again skips
+the solve.
+
+The rules follow manim's own: ``row``, ``column`` and ``overlay`` behave like
+``arrange(RIGHT)``, ``arrange(DOWN)`` and ``arrange(ORIGIN)`` (centered on
+the origin unless ``center=False``), ``grid`` like ``arrange_in_grid``, and
+``next_to``, ``align_to``, ``move_to``, ``shift`` and ``to_edge`` like the
+methods of the same names. Rules apply in the order they are added. The
+mobjects in one layout must not contain each other.
+"""
+
+from manim import (
+    DEFAULT_MOBJECT_TO_EDGE_BUFFER,
+    DEFAULT_MOBJECT_TO_MOBJECT_BUFFER,
+    DOWN,
+    ORIGIN,
+    RIGHT,
+    Mobject,
+    config,
+)
+import functools
+import math
+import numpy as np
+
+# Solved layouts remembered across Layout instances
+SOLUTIONS = 256
+
+
+def as_tuple(vector):
+    return tuple(float(x) for x in vector)
+
+
+class Node:
+    """Some of a layout's mobjects, placed as one box."""
+
+    __slots__ = ("leaves",)
+
+    def __init__(self, leaves):
+        self.leaves = leaves
+
+
+class Layout:
+    """Placement rules for a set of mobjects, applied together."""
+
+    def __init__(self):
+        self.mobjects = []
+        self.leaf_of = {}
+        self.rules = []
+
+    def node(self, item):
+        if isinstance(item, Node):
+            return item
+        if not isinstance(item, Mobject):
+            raise TypeError(f"Cannot lay out {item!r}")
+        if id(item) not in self.leaf_of:
+            self.leaf_of[id(item)] = len(self.mobjects)
+            self.mobjects.append(item)
+        return Node((self.leaf_of[id(item)],))
+
+    def group(self, nodes):
+        return Node(tuple(leaf for node in nodes for leaf in node.leaves))
+
+    def add_rule(self, kind, items, *params):
+        nodes = [self.node(item) for item in items]
+        self.rules.append((kind, tuple(node.leaves for node in nodes), params))
+        return self.group(nodes)
+
+    def target(self, anchor):
+        """A node to measure, or a fixed point."""
+        if isinstance(anchor, (Node, Mobject)):
+            return self.node(anchor).leaves, None
+        return None, as_tuple(anchor)
+
+    def arrange(self, items, direction, buff=DEFAULT_MOBJECT_TO_MOBJECT_BUFFER, aligned_edge=ORIGIN, center=True):
+        return self.add_rule("arrange", items, as_tuple(direction), buff, as_tuple(aligned_edge), center)
+
+    def row(self, *items, **kwargs):
+        return self.arrange(items, RIGHT, **kwargs)
+
+    def column(self, *items, **kwargs):
+        return self.arrange(items, DOWN, **kwargs)
+
+    def overlay(self, *items, center=True):
+        return self.arrange(items, ORIGIN, buff=0, center=center)
+
+    def grid(self, *items, rows=None, cols=None, buff=DEFAULT_MOBJECT_TO_MOBJECT_BUFFER):
+        if rows is None and cols is None:
+            cols = math.ceil(math.sqrt(len(items)))
+        rows = rows or math.ceil(len(items) / cols)
+        cols = cols or math.ceil(len(items) / rows)
+        if rows * cols < len(items):
+            raise ValueError("Too few rows and columns to fit all mobjects.")
+        buff_x, buff_y = buff if isinstance(buff, tuple) else (buff, buff)
+        return self.add_rule("grid", items, rows, cols, buff_x, buff_y)
+
+    def next_to(self, item, anchor, direction=RIGHT, buff=DEFAULT_MOBJECT_TO_MOBJECT_BUFFER, aligned_edge=ORIGIN):
+        leaves, point = self.target(anchor)
+        self.add_rule("next_to", [item], leaves, point, as_tuple(direction), buff, as_tuple(aligned_edge))
+        return self.node(item)
+
+    def align_to(self, item, anchor, direction=ORIGIN):
+        leaves, point = self.target(anchor)
+        self.add_rule("align_to", [item], leaves, point, as_tuple(direction))
+        return self.node(item)
+
+    def move_to(self, item, anchor, aligned_edge=ORIGIN):
+        leaves, point = self.target(anchor)
+        self.add_rule("move_to", [item], leaves, point, as_tuple(aligned_edge))
+        return self.node(item)
+
+    def shift(self, item, vector):
+        self.add_rule("shift", [item], as_tuple(vector))
+        return self.node(item)
+
+    def to_edge(self, item, edge, buff=DEFAULT_MOBJECT_TO_EDGE_BUFFER):
+        self.add_rule("to_edge", [item], as_tuple(edge), buff)
+        return self.node(item)
+
+    def measure(self):
+        """Bounding boxes of every mobject, read once."""
+        families = [mobject.get_family() for mobject in self.mobjects]
+        owners = {}
+        for index, family in enumerate(families):
+            for member in family:
+                if owners.setdefault(id(member), index) != index:
+                    raise ValueError(f"{type(member).__name__} belongs to two mobjects of the layout")
+        lows = np.zeros((len(families), 3))
+        highs = np.zeros((len(families), 3))
+        for index, family in enumerate(families):
+            points = [member.points for member in family if len(member.points)]
+            if points:
+                points = np.concatenate(points)
+                lows[index], highs[index] = points.min(axis=0), points.max(axis=0)
+        return lows, highs
+
+    def apply(self):
+        """Work out all the rules and shift each mobject once."""
+        lows, highs = self.measure()
+        frame = (config.frame_x_radius, config.frame_y_radius)
+        offsets = solved(lows.tobytes(), highs.tobytes(), lows.shape, frame, tuple(self.rules))
+        for mobject, offset in zip(self.mobjects, offsets):
+            if offset.any():
+                mobject.shift(offset)
+        return self
+
+
+@functools.lru_cache(maxsize=SOLUTIONS)
+def solved(lows, highs, shape, frame, rules):
+    """``solve`` for boxes given as bytes, remembered; the offsets are read-only.
+
+    ``frame`` is only part of the key, since ``to_edge`` reads it from ``config``.
+    """
+    lows = np.frombuffer(lows).reshape(shape)
+    highs = np.frombuffer(highs).reshape(shape)
+    offsets = solve(lows, highs, rules)
+    offsets.flags.writeable = False
+    return offsets
+
+
+def solve(lows, highs, rules):
+    """Offsets of every box after applying ``rules`` in order."""
+    offsets = np.zeros_like(lows)
+
+    def box(leaves):
+        leaves = list(leaves)
+        return (lows[leaves] + offsets[leaves]).min(axis=0), (highs[leaves] + offsets[leaves]).max(axis=0)
+
+    def critical_point(leaves, direction):
+        low, high = box(leaves)
+        return (low + high) / 2 + np.sign(direction) * (high - low) / 2
+
+    def anchor_point(leaves, point, direction):
+        return np.array(point) if leaves is None else critical_point(leaves, direction)
+
+    def move(leaves, vector):
+        offsets[list(leaves)] += vector
+
+    for kind, nodes, params in rules:
+        if kind == "arrange":
+            direction, buff, aligned_edge, center = params
+            direction, aligned_edge = np.array(direction), np.array(aligned_edge)
+            boxes = [box(leaves) for leaves in nodes]
+            low, high = np.array([b[0] for b in boxes]), np.array([b[1] for b in boxes])
+            centers, halves = (low + high) / 2, (high - low) / 2
+            steps = (
+                np.sign(aligned_edge + direction) * halves[:-1]
+                - np.sign(aligned_edge - direction) * halves[1:]
+                + buff * direction
+            )
+            arranged = centers[0] + np.vstack([np.zeros((1, 3)), np.cumsum(steps, axis=0)])
+            for leaves, vector in zip(nodes, arranged - centers):
+                move(leaves, vector)
+            if center:
+                everything = [leaf for leaves in nodes for leaf in leaves]
+                move(everything, -critical_point(everything, ORIGIN))
+        elif kind == "grid":
+            rows, cols, buff_x, buff_y = params
+            boxes = [box(leaves) for leaves in nodes]
+            everything = [leaf for leaves in nodes for leaf in leaves]
+            start = critical_point(everything, ORIGIN)
+            sizes = np.zeros((rows * cols, 3))
+            sizes[: len(boxes)] = [high - low for low, high in boxes]
+            sizes = sizes.reshape(rows, cols, 3)
+            widths, heights = sizes[:, :, 0].max(axis=0), sizes[:, :, 1].max(axis=1)
+            xs = np.cumsum(np.concatenate([[0], widths[:-1] + buff_x])) + widths / 2
+            ys = -(np.cumsum(np.concatenate([[0], heights[:-1] + buff_y])) + heights / 2)
+            for index, (leaves, (low, high)) in enumerate(zip(nodes, boxes)):
+                cell = np.array([xs[index % cols], ys[index // cols], 0])
+                move(leaves, cell - (low + high) / 2)
+            move(everything, start - critical_point(everything, ORIGIN))
+        elif kind == "next_to":
+            (item,), (leaves, point, direction, buff, aligned_edge) = nodes, params
+            direction, aligned_edge = np.array(direction), np.array(aligned_edge)
+            target = anchor_point(leaves, point, aligned_edge + direction)
+            move(item, target - critical_point(item, aligned_edge - direction) + buff * direction)
+        elif kind == "align_to":
+            (item,), (leaves, point, direction) = nodes, params
+            direction = np.array(direction)
+            target = anchor_point(leaves, point, direction)
+            move(item, (target - critical_point(item, direction)) * (direction != 0))
+        elif kind == "move_to":
+            (item,), (leaves, point, aligned_edge) = nodes, params
+            target = anchor_point(leaves, point, aligned_edge)
+            move(item, target - critical_point(item, aligned_edge))
+        elif kind == "shift":
+            (item,), (vector,) = nodes, params
+            move(item, np.array(vector))
+        elif kind == "to_edge":
+            (item,), (edge, buff) = nodes, params
+            edge = np.array(edge)
+            target = np.sign(edge) * (config.frame_x_radius, config.frame_y_radius, 0)
+            move(item, (target - critical_point(item, edge) - buff * edge) * np.abs(np.sign(edge)))
+    return offsets
@@ -0,0 +1,268 @@
+"""Import only the parts of manim that a scene file uses.
+
+``from manim import *`` runs ``manim/__init__.py``, which imports the whole
+library (3D, OpenGL, tables, code highlighting, plugins, ...) before
+``construct`` starts. ``install()`` registers a slim ``manim`` package in
+``sys.modules`` instead: it loads the config right away, and every other name
+is imported from its submodule the first time it is looked up.
+``expose(path)`` then limits ``from manim import *`` in a scene file to the
+names that file (and the local modules it imports) refers to, so the star
+import only loads those. The project's own modules (``snapshots.py``,
+``watch.py``, ...) are exposed the same way as they are imported, since tools
+import them before any scene file. ``render.py`` installs all of this before
+anything imports manim.
+
+Names a scene looks up dynamically (``globals()["Circle"]``, ``eval``) are
+not seen by ``expose``. Set ``MANIM_EAGER_IMPORTS=1`` to import manim as
+usual.
+
+Usage::
+
+    python lazy_manim.py backprop.py BackpropExplainer --runs 3
+
+compares the time to the first ``play()`` with eager and lazy imports.
+"""
+
+import ast
+import importlib
+import importlib.util
+import json
+import os
+import sys
+from importlib.metadata import version
+from pathlib import Path
+
+INDEX_FORMAT = 1
+PROJECT = Path(__file__).resolve().parent
+INDEX_PATH = PROJECT / "__pycache__" / "lazy_manim_index.json"
+
+
+def is_lazy():
+    return getattr(sys.modules.get("manim"), "__lazy_index__", None) is not None
+
+
+def submodule_path(package_dir, module):
+    path = package_dir.joinpath(*module.split("."))
+    if path.is_dir():
+        return path / "__init__.py"
+    return path.with_suffix(".py")
+
+
+def resolve_relative(module, is_package, node):
+    parts = module.split(".") if is_package else module.split(".")[:-1]
+    parts = parts[:len(parts) - (node.level - 1)]
+    return ".".join(parts + ([node.module] if node.module else []))
+
+
+def exported_names(package_dir, module):
+    """The names ``from manim.<module> import *`` binds, read from the source."""
+    path = submodule_path(package_dir, module)
+    tree = ast.parse(path.read_text(encoding="utf-8"))
+    for node in tree.body:
+        if (
+            isinstance(node, ast.Assign)
+            and any(isinstance(target, ast.Name) and target.id == "__all__" for target in node.targets)
+        ):
+            return list(ast.literal_eval(node.value))
+
+    # Without __all__ every public top-level name is exported, e.g. the colors
+    names = []
+    for node in tree.body:
+        if isinstance(node, ast.ImportFrom) and node.names[0].name == "*":
+            if node.level:
+                names += exported_names(package_dir, resolve_relative(module, path.name == "__init__.py", node))
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            names += [(alias.asname or alias.name).split(".")[0] for alias in node.names]
+        elif isinstance(node, (ast.FunctionDef, ast.ClassDef)):
+            names.append(node.name)
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            names += [target.id for target in targets if isinstance(target, ast.Name)]
+    return [name for name in names if not name.startswith("_")]
+
+
+def build_index(package_dir):
+    """Map every name of ``manim``'s namespace to (module, attribute).
+
+    Follows the imports of ``manim/__init__.py`` in order, so later star
+    imports win just like they do there. ``attribute`` is None for names that
+    are modules themselves (``np``, ``rate_functions``).
+    """
+    tree = ast.parse((package_dir / "__init__.py").read_text(encoding="utf-8"))
+    index = {}
+    for node in tree.body:
+        if isinstance(node, ast.ImportFrom) and node.level == 1:
+            if node.names[0].name == "*":
+                for name in exported_names(package_dir, node.module):
+                    index[name] = (f"manim.{node.module}", name)
+            else:
+                for alias in node.names:
+                    module = f"manim.{node.module}"
+                    if submodule_path(package_dir, f"{node.module}.{alias.name}").exists():
+                        index[alias.asname or alias.name] = (f"{module}.{alias.name}", None)
+                    else:
+                        index[alias.asname or alias.name] = (module, alias.name)
+        elif isinstance(node, ast.Import):
+            for alias in node.names:
+                index[alias.asname or alias.name] = (alias.name, None)
+    return index
+
+
+def load_index(package_dir, manim_version):
+    key = {"format": INDEX_FORMAT, "version": manim_version, "path": str(package_dir)}
+    if INDEX_PATH.exists():
+        cached = json.loads(INDEX_PATH.read_text())
+        if cached["key"] == key:
+            return {name: tuple(target) for name, target in cached["index"].items()}
+    index = build_index(package_dir)
+    try:
+        INDEX_PATH.parent.mkdir(exist_ok=True)
+        INDEX_PATH.write_text(json.dumps({"key": key, "index": index}))
+    except OSError:
+        pass
+    return index
+
+
+def install():
+    """Register the lazy ``manim`` package. Returns whether manim is lazy.
+
+    Does nothing if manim has already been imported. Falls back to the normal
+    import when ``MANIM_EAGER_IMPORTS`` is set, when plugins are configured
+    (they are loaded by ``manim/__init__.py``) or when anything goes wrong.
+    """
+    if "manim" in sys.modules:
+        return is_lazy()
+    if os.environ.get("MANIM_EAGER_IMPORTS"):
+        importlib.import_module("manim")
+        return False
+
+    spec = importlib.util.find_spec("manim")
+    package = importlib.util.module_from_spec(spec)
+    sys.modules["manim"] = package
+    try:
+        package.__version__ = version("manim")
+        # Submodules import config, logger etc. from the package, so they come first
+        config_module = importlib.import_module("manim._config")
+        for name in config_module.__all__:
+            setattr(package, name, getattr(config_module, name))
+        if package.config["plugins"]:
+            raise ImportError("plugins need the full manim package")
+        index = load_index(Path(spec.origin).parent, package.__version__)
+    except Exception:
+        del sys.modules["manim"]
+        importlib.import_module("manim")
+        return False
+
+    def lazy_attribute(name):
+        try:
+            module_name, attribute = index[name]
+        except KeyError:
+            raise AttributeError(f"module 'manim' has no attribute {name!r}") from None
+        module = importlib.import_module(module_name)
+        value = module if attribute is None else getattr(module, attribute)
+        setattr(package, name, value)
+        return value
+
+    package.__getattr__ = lazy_attribute
+    package.__dir__ = lambda: sorted(set(package.__dict__) | set(index))
+    package.__all__ = list(config_module.__all__)
+    package.__lazy_index__ = index
+    sys.meta_path.insert(0, ExposingFinder(PROJECT))
+    return True
+
+
+class ExposingFinder:
+    """Exposes the names a module of ``directory`` uses just before it is imported.
+
+    Finds nothing itself; the regular finders load the module afterwards.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def find_spec(self, name, path=None, target=None):
+        if path is None and "." not in name:
+            module = self.directory / f"{name}.py"
+            if module.exists():
+                expose(module)
+        return None
+
+
+def referenced_names(path, seen=None):
+    """Every name used in a scene file and the local modules it imports."""
+    path = Path(path).resolve()
+    seen = set() if seen is None else seen
+    if path in seen:
+        return set()
+    seen.add(path)
+
+    tree = ast.parse(path.read_text(encoding="utf-8"))
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name):
+            names.add(node.id)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            modules = [alias.name for alias in node.names] if isinstance(node, ast.Import) else [node.module]
+            for module in modules:
+                local = path.parent / f"{module}.py" if module else None
+                if local is not None and local.exists():
+                    names |= referenced_names(local, seen)
+    return names
+
+
+def expose(path):
+    """Let ``from manim import *`` in ``path`` bind the names it uses."""
+    if not is_lazy():
+        return
+    package = sys.modules["manim"]
+    names = referenced_names(path) & set(package.__lazy_index__)
+    package.__all__ = sorted(set(package.__all__) | names)
+
+
+def measure(path, scene_name, eager):
+    """Run ``render.py --startup-only`` once and return its timings."""
+    import subprocess
+    import time
+
+    env = dict(os.environ)
+    env.pop("MANIM_EAGER_IMPORTS", None)
+    if eager:
+        env["MANIM_EAGER_IMPORTS"] = "1"
+    render = Path(__file__).resolve().parent / "render.py"
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, str(render), str(path), scene_name, "--startup-only"],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    timings["wall"] = time.perf_counter() - started
+    return timings
+
+
+def main():
+    import argparse
+    import statistics
+
+    parser = argparse.ArgumentParser(description="Compare scene startup with eager and lazy manim imports")
+    parser.add_argument("file", help="scene file, e.g. backprop.py")
+    parser.add_argument("scene", help="scene class name, e.g. BackpropExplainer")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    columns = ["imports", "scene_loaded", "first_play", "wall"]
+    print(f"{'mode':<8}" + "".join(f"{column:>14}" for column in columns) + f"{'modules':>10}")
+    for mode in ("eager", "lazy"):
+        runs = [measure(args.file, args.scene, mode == "eager") for _ in range(args.runs)]
+        medians = {column: statistics.median(run[column] for run in runs) for column in columns}
+        print(
+            f"{mode:<8}"
+            + "".join(f"{medians[column]:>13.3f}s" for column in columns)
+            + f"{runs[-1]['modules']:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
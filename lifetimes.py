@@ -0,0 +1,239 @@
+"""Track where mobjects come from and which ones outlive their use.
+
+Usage::
+
+    python lifetimes.py backprop.py BackpropExplainer               # report only
+    python lifetimes.py backprop.py BackpropExplainer --policy remove
+
+Every mobject created while the scene runs is tagged with the section that
+created it (sections as in ``sections.py``). At each section boundary the
+tracker logs the live mobjects and their point bytes by section, the
+mobjects that are still on the scene but fully transparent, the off-screen
+mobjects still held by ``self`` attributes, and the current and peak RSS.
+
+With ``--policy remove`` it also cleans up at each boundary. It removes
+invisible mobjects from the scene and deletes ``self`` attributes that hold
+only off-screen mobjects when no later section reads them. It also drops the
+last ``play()``'s animations, which keep copies of their mobjects.
+"""
+
+from manim import *
+from render import QUALITIES, load_scenes
+from sections import INTRO, analyze_sections
+import argparse
+import gc
+import resource
+import weakref
+from pathlib import Path
+
+POLICIES = ("report", "remove")
+
+
+def family_bytes(mobjects):
+    seen = set()
+    total = 0
+    for mobject in mobjects:
+        for member in mobject.get_family():
+            if id(member) not in seen:
+                seen.add(id(member))
+                total += member.points.nbytes
+    return total
+
+
+def is_invisible(mobject):
+    for member in mobject.get_family():
+        if not member.has_points():
+            continue
+        if not isinstance(member, VMobject):
+            return False
+        if member.get_fill_opacities().any() or member.get_stroke_opacities().any():
+            return False
+    return True
+
+
+def held_mobjects(value, depth=3):
+    """Mobjects reachable from an attribute value through containers."""
+    if isinstance(value, Mobject):
+        yield value
+    elif depth and isinstance(value, (list, tuple, set, frozenset)):
+        for item in value:
+            yield from held_mobjects(item, depth - 1)
+    elif depth and isinstance(value, dict):
+        for item in value.values():
+            yield from held_mobjects(item, depth - 1)
+
+
+def megabytes(size):
+    return size / 2**20
+
+
+def rss_megabytes():
+    """Current and peak resident set size of this process."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    try:
+        with open("/proc/self/statm") as statm:
+            current = int(statm.read().split()[1]) * resource.getpagesize() / 2**20
+    except OSError:
+        current = peak
+    return current, peak
+
+
+class MobjectTracker:
+    """Tags every new mobject with the current section."""
+
+    def __init__(self, sections, policy="report"):
+        self.sections = sections
+        self.policy = policy
+        self.section = INTRO
+        self.created = weakref.WeakKeyDictionary()
+        self.baseline = set()
+        self.history = []
+        self.original_init = None
+        self.original_copy = None
+
+    def install(self):
+        tracker = self
+        init = self.original_init = Mobject.__init__
+        copy = self.original_copy = Mobject.copy
+
+        def tracked_init(self, *args, **kwargs):
+            init(self, *args, **kwargs)
+            tracker.created.setdefault(self, tracker.section)
+
+        def tracked_copy(self, *args, **kwargs):
+            result = copy(self, *args, **kwargs)
+            for member in result.get_family():
+                tracker.created[member] = tracker.section
+            return result
+
+        Mobject.__init__ = tracked_init
+        Mobject.copy = tracked_copy
+
+    def uninstall(self):
+        Mobject.__init__ = self.original_init
+        Mobject.copy = self.original_copy
+
+    def later_reads(self, next_section):
+        """Attributes read by ``next_section`` and the ones after it."""
+        names = [section.name for section in self.sections]
+        start = names.index(next_section) if next_section in names else len(names)
+        # construct itself (the intro) runs across every section
+        return set().union(
+            self.sections[0].reads, *[section.reads for section in self.sections[start:]]
+        )
+
+    def boundary(self, scene, next_section):
+        """Report on the section that just ended and apply the policy."""
+        gc.collect()
+        on_scene = {id(member) for member in scene.get_mobject_family_members()}
+        invisible = [mobject for mobject in scene.mobjects if is_invisible(mobject)]
+        held = {}
+        only_off_scene = set()
+        for name, value in scene.__dict__.items():
+            if name in self.baseline:
+                continue
+            mobjects = list(held_mobjects(value))
+            off_scene = [m for m in mobjects if id(m) not in on_scene]
+            if off_scene:
+                held[name] = off_scene
+                if len(off_scene) == len(mobjects):
+                    only_off_scene.add(name)
+
+        by_section = {}
+        for mobject, section in list(self.created.items()):
+            count, size = by_section.get(section, (0, 0))
+            by_section[section] = (count + 1, size + mobject.points.nbytes)
+
+        current, peak = rss_megabytes()
+        logger.info(
+            "End of %(section)s: %(live)d live mobjects (%(mb).1f MB of points), RSS %(rss).0f MB, peak %(peak).0f MB",
+            {
+                "section": self.section,
+                "live": sum(count for count, _ in by_section.values()),
+                "mb": megabytes(sum(size for _, size in by_section.values())),
+                "rss": current,
+                "peak": peak,
+            },
+        )
+        for section, (count, size) in by_section.items():
+            logger.info("    created in %(s)s: %(n)d (%(mb).2f MB)", {"s": section, "n": count, "mb": megabytes(size)})
+        if invisible:
+            logger.warning(
+                "    %(n)d invisible mobject(s) still on the scene (%(mb).2f MB): %(names)s",
+                {
+                    "n": len(invisible),
+                    "mb": megabytes(family_bytes(invisible)),
+                    "names": ", ".join(sorted({type(m).__name__ for m in invisible})),
+                },
+            )
+        for name, mobjects in held.items():
+            logger.warning(
+                "    self.%(name)s holds %(n)d off-screen mobject(s) (%(mb).2f MB)",
+                {"name": name, "n": len(mobjects), "mb": megabytes(family_bytes(mobjects))},
+            )
+
+        if self.policy == "remove":
+            scene.remove(*invisible)
+            for name in only_off_scene - self.later_reads(next_section):
+                delattr(scene, name)
+            # The last play's animations hold starting and target copies
+            scene.animations = None
+            gc.collect()
+
+        self.history.append({"section": self.section, "rss": current, "peak": peak})
+        self.section = next_section
+
+
+def tracked(scene_class, tracker):
+    """Subclass ``scene_class`` to call ``tracker`` at every section boundary."""
+    section_names = [section.name for section in tracker.sections if section.name != INTRO]
+
+    def wrap(name):
+        method = getattr(scene_class, name)
+
+        def section(self, *args, **kwargs):
+            tracker.boundary(self, name)
+            return method(self, *args, **kwargs)
+
+        return section
+
+    def setup(self):
+        scene_class.setup(self)
+        tracker.baseline = set(self.__dict__)
+
+    def construct(self):
+        scene_class.construct(self)
+        tracker.boundary(self, None)
+
+    attributes = {name: wrap(name) for name in section_names}
+    attributes["setup"] = setup
+    attributes["construct"] = construct
+    attributes["__module__"] = scene_class.__module__
+    return type(scene_class.__name__, (scene_class,), attributes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("file", help="scene file, e.g. backprop.py")
+    parser.add_argument("scene", help="scene class name, e.g. BackpropExplainer")
+    parser.add_argument("-q", "--quality", choices=QUALITIES, default="l")
+    parser.add_argument("--policy", choices=POLICIES, default="report")
+    parser.add_argument("--dry-run", action="store_true", help="run the scene without writing any files")
+    args = parser.parse_args()
+
+    path = Path(args.file).resolve()
+    tracker = MobjectTracker(analyze_sections(path.read_text(), args.scene, path), args.policy)
+    config.quality = QUALITIES[args.quality]
+    config.input_file = str(path)
+    config.dry_run = args.dry_run
+    tracker.install()
+    try:
+        tracked(load_scenes(path)[args.scene], tracker)().render()
+    finally:
+        tracker.uninstall()
+    for entry in tracker.history:
+        print(f"{entry['section']:<32}  RSS {entry['rss']:>7.0f} MB  peak {entry['peak']:>7.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,15 @@
 from manim import *
 import numpy as np
 import random
+from incremental_text import IncrementalText, TypeIn
+from token_streaming import TinyLanguageModel, KVCachePanel
+from group_fade import GroupFadeOut
+
+PROMPT = "What is a transformer model?"
+RESPONSE = (
+    "A transformer model is a neural network that uses self-attention "
+    "to weigh every earlier token when predicting the next one."
+)
 
 class LLMExplainer(Scene):
     def construct(self):
@@ -145,7 +154,7 @@ class LLMExplainer(Scene):
         self.wait(2)
         
         # Clear screen for next section
-        self.play(*[FadeOut(mob) for mob in self.mobjects[1:]])
+        self.play(GroupFadeOut(*self.mobjects[1:]))
 
     def show_finetuning_stage(self):
         # Fine-tuning Stage
@@ -209,7 +218,7 @@ class LLMExplainer(Scene):
         self.wait(2)
         
         # Clear screen
-        self.play(*[FadeOut(mob) for mob in self.mobjects[1:]])
+        self.play(GroupFadeOut(*self.mobjects[1:]))
 
     def show_inference_stage(self):
         # Inference Stage
@@ -227,13 +236,12 @@ class LLMExplainer(Scene):
         
         # Example of a prompt being processed
         prompt_box = Rectangle(width=3, height=1, fill_opacity=0.1, color=WHITE)
-        prompt_text = Text("What is a transformer model?", font_size=16).move_to(prompt_box)
+        prompt_text = Text(PROMPT, font_size=16).move_to(prompt_box)
         prompt = VGroup(prompt_box, prompt_text)
         
-        # Generated response
+        # Generated response, filled in token by token below
         response_box = Rectangle(width=3, height=2, fill_opacity=0.2, fill_color="#2F4F4F")
-        response_text = Text("A transformer model is\na neural network...", font_size=16).move_to(response_box)
-        response = VGroup(response_box, response_text)
+        response = VGroup(response_box)
         
         # Arrange horizontally
         top_row = VGroup(query, model).arrange(RIGHT, buff=2)
@@ -242,6 +250,11 @@ class LLMExplainer(Scene):
         
         inference_title.next_to(components, UP, buff=0.5)
         
+        # KV cache panel between the model and the right edge; it is 3.5 wide, so
+        # next_to(model_circle) would push its last column off the frame
+        kv_panel = KVCachePanel()
+        kv_panel.to_edge(RIGHT, buff=0.25).match_y(model_circle)
+        
         # Arrows
         query_to_model = Arrow(query_box.get_right(), model_circle.get_left(), color=WHITE)
         model_to_prompt = Arrow(model_circle.get_bottom(), prompt_box.get_top(), color=WHITE)
@@ -260,10 +273,59 @@ class LLMExplainer(Scene):
         self.play(Create(query_to_model))
         self.play(Create(prompt_box), Write(prompt_text))
         self.play(Create(model_to_prompt))
-        self.play(Create(response_box), Write(response_text))
+        self.play(Create(response_box))
         self.play(Create(prompt_to_response))
+        self.play(FadeIn(kv_panel))
+        self.stream_response(PROMPT, response_box, kv_panel)
         self.play(Write(explanation))
         self.wait(2)
         
         # Clear screen
-        self.play(*[FadeOut(mob) for mob in self.mobjects[1:]]) 
\ No newline at end of file
+        self.play(GroupFadeOut(*self.mobjects[1:]))
+
+    def stream_response(self, prompt, response_box, kv_panel, model=None,
+                        max_new_tokens=1000, tokens_per_play=4, tokens_per_second=8):
+        """Stream generated tokens into ``response_box`` while the KV cache fills up.
+
+        Every token adds one cached glyph to an ``IncrementalText`` and one cache
+        column, so nothing already on screen is rebuilt and the work per token
+        stays constant. ``model`` can be any object with a
+        ``generate(prompt, max_new_tokens)`` method yielding (token, key, value).
+        """
+        if model is None:
+            script = RESPONSE.split()
+            model = TinyLanguageModel(prompt.split() + script)
+            tokens = model.generate(prompt.split(), max_new_tokens, script=script)
+        else:
+            tokens = model.generate(prompt.split(), max_new_tokens)
+        
+        # Response text grows inside the box; old lines scroll out once it is full
+        text = IncrementalText(font_size=16, max_width=response_box.width - 0.3)
+        text.max_lines = max(1, int((response_box.height - 0.3) // text.line_height))
+        text.move_to(response_box.get_corner(UL) + RIGHT * 0.15 + DOWN * 0.15)
+        self.add(text)
+        
+        new_tokens = []
+        new_columns = []
+        for token, key, value in tokens:
+            column, dropped_columns = kv_panel.append(key, value)
+            if dropped_columns:
+                self.remove(*dropped_columns)
+                new_columns = [c for c in new_columns if c not in dropped_columns]
+            
+            new_tokens.append(token)
+            new_columns.append(column)
+            if len(new_tokens) == tokens_per_play:
+                self.play_tokens(text, new_tokens, new_columns, tokens_per_second)
+                new_tokens = []
+                new_columns = []
+        
+        if new_tokens:
+            self.play_tokens(text, new_tokens, new_columns, tokens_per_second)
+
+    def play_tokens(self, text, tokens, columns, tokens_per_second):
+        self.play(
+            TypeIn(text, " ".join(tokens), rate_func=linear),
+            *[FadeIn(column) for column in columns],
+            run_time=len(tokens) / tokens_per_second
+        )
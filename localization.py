@@ -0,0 +1,230 @@
+"""Render a scene in several languages, sharing every animation without text.
+
+Usage::
+
+    python localization.py extract rag_visualization_v2.py RAGVisualizationV2 --languages de fr
+    python localization.py render rag_visualization_v2.py RAGVisualizationV2 --languages en de fr -q h
+
+While a language is active, every ``Text`` looks its string up in that
+language's catalogue, ``locales/<language>.json``, which maps the source
+string to its translation. Strings that are missing or ``null`` stay as they
+are, so the source language needs no catalogue. Strings that reach the screen another way (typed into an
+``IncrementalText``, say) go through ``localize()``. ``extract`` runs the
+scene without rendering, collects every string that was shown and adds the
+missing ones to each catalogue as ``null``.
+
+``render`` makes all variants in one job. A quick pass per language records
+the partial movie hash of every ``play()``. Plays whose hash is the same in
+every language show no localized text; they are rendered once, spread over
+the workers. Then every language renders in parallel into its own movie,
+``<Scene>_<language>.mp4``. Each language has its own partial movie
+directory, ``<Scene>_<language>``, into which the shared plays are hard-linked
+(or copied), so they are cache hits and only the plays with text are rendered
+again, while the file list manim joins them from stays per language.
+"""
+
+from manim import Text, config
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+import argparse
+import json
+import multiprocessing
+import numpy as np
+import os
+import random
+import shutil
+import time
+from pathlib import Path
+
+LOCALES = Path(__file__).resolve().parent / "locales"
+
+language = None
+catalogue = {}
+seen = {}
+verbatim_depth = 0
+
+
+def catalogue_path(name):
+    return LOCALES / f"{name}.json"
+
+
+def activate(name):
+    """Translate every string shown from now on into ``name``."""
+    global language, catalogue
+    install()
+    path = catalogue_path(name)
+    language = name
+    catalogue = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+
+
+def localize(string):
+    """``string`` in the active language."""
+    if verbatim_depth:
+        return string
+    seen.setdefault(string, None)
+    return catalogue.get(string) or string
+
+
+@contextmanager
+def verbatim():
+    """Shape text exactly as given, e.g. single words already localized."""
+    global verbatim_depth
+    verbatim_depth += 1
+    try:
+        yield
+    finally:
+        verbatim_depth -= 1
+
+
+text_init = Text.__init__
+
+
+def localized_text_init(self, text, *args, **kwargs):
+    text_init(self, localize(text), *args, **kwargs)
+
+
+def install():
+    """Route the string of every ``Text`` through ``localize``."""
+    Text.__init__ = localized_text_init
+
+
+# Scenes import this module too, so the render machinery is imported only by the jobs
+
+
+def plan_language(path, scene_name, quality, name=None):
+    """Hashes and durations of every play in ``name``, and the strings shown."""
+    from parallel_render import render_plays
+
+    if name is None:
+        install()
+    else:
+        activate(name)
+    plan = render_plays(path, scene_name, quality, (), True)
+    plan["strings"] = list(seen)
+    return plan
+
+
+def render_shared(path, scene_name, quality, name, plays):
+    from parallel_render import render_plays
+
+    activate(name)
+    return render_plays(path, scene_name, quality, plays)
+
+
+def link_partials(source, target, hashes):
+    """Hard-link (or copy) the partial movies of ``hashes`` from ``source`` into ``target``."""
+    target.mkdir(parents=True, exist_ok=True)
+    for play_hash in hashes:
+        name = f"{play_hash}{config.movie_file_extension}"
+        if not (source / name).exists() or (target / name).exists():
+            continue
+        try:
+            os.link(source / name, target / name)
+        except OSError:
+            shutil.copy2(source / name, target / name)
+
+
+def render_language(path, scene_name, quality, name, shared_hashes):
+    """Render the whole scene in ``name``; shared plays come from the cache."""
+    from parallel_render import SEED
+    from render import QUALITIES, render_scene
+
+    activate(name)
+    random.seed(SEED)
+    np.random.seed(SEED)
+    config.quality = QUALITIES[quality]
+    config.output_file = f"{scene_name}_{name}"
+    # Languages render at the same time, and manim writes the list of partial
+    # movies to join (and cleans the cache) in the partial movie directory
+    shared = config.get_dir("partial_movie_dir", module_name=Path(path).stem, scene_name=scene_name)
+    own = shared.parent / f"{scene_name}_{name}"
+    link_partials(shared, own, shared_hashes)
+    config.partial_movie_dir = str(own)
+    started = time.perf_counter()
+    output = render_scene(path, scene_name, quality)
+    return output, time.perf_counter() - started
+
+
+def render_languages(path, scene_name, languages, quality="l", workers=None):
+    """Render ``scene_name`` once per language; returns the movies and the shared plays."""
+    from parallel_render import assign_plays, predict_plays
+
+    path = Path(path).resolve()
+    workers = workers or os.cpu_count() or 1
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(workers, mp_context=context, max_tasks_per_child=1) as pool:
+        futures = {name: pool.submit(plan_language, path, scene_name, quality, name) for name in languages}
+        plans = {name: future.result() for name, future in futures.items()}
+        counts = {len(plan["hashes"]) for plan in plans.values()}
+        if len(counts) > 1:
+            raise ValueError(f"{scene_name} plays a different number of animations per language")
+
+        hashes = list(zip(*(plan["hashes"] for plan in plans.values())))
+        shared = [index for index, per_language in enumerate(hashes) if len(set(per_language)) == 1]
+        costs = predict_plays(plans[languages[0]], quality)
+        owned, _ = assign_plays(
+            [costs[index] for index in shared], workers, [hashes[index][0] for index in shared]
+        )
+        futures = [
+            pool.submit(render_shared, path, scene_name, quality, languages[0], [shared[i] for i in plays])
+            for plays in owned
+            if plays
+        ]
+        for future in futures:
+            future.result()
+
+        shared_hashes = [hashes[index][0] for index in shared]
+        futures = {
+            name: pool.submit(render_language, path, scene_name, quality, name, shared_hashes) for name in languages
+        }
+        outputs = {name: future.result() for name, future in futures.items()}
+    return outputs, shared, len(hashes)
+
+
+def extract(path, scene_name, languages):
+    """Add every string the scene shows to each catalogue; returns the missing counts."""
+    plan = plan_language(Path(path).resolve(), scene_name, "l")
+    LOCALES.mkdir(exist_ok=True)
+    missing = {}
+    for name in languages:
+        path = catalogue_path(name)
+        entries = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+        for string in plan["strings"]:
+            entries.setdefault(string, None)
+        path.write_text(json.dumps(entries, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        missing[name] = sum(1 for string in plan["strings"] if not entries[string])
+    return missing
+
+
+def main():
+    from render import QUALITIES
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    for name in ("extract", "render"):
+        command = commands.add_parser(name)
+        command.add_argument("file", help="scene file, e.g. rag_visualization_v2.py")
+        command.add_argument("scene", help="scene class name, e.g. RAGVisualizationV2")
+        command.add_argument("--languages", nargs="+", required=True, help="catalogue names, e.g. en de fr")
+    render = commands.choices["render"]
+    render.add_argument("-q", "--quality", choices=QUALITIES, default="l")
+    render.add_argument("-j", "--workers", type=int, help="number of worker processes (default: one per core)")
+    args = parser.parse_args()
+
+    if args.command == "extract":
+        for name, count in extract(args.file, args.scene, args.languages).items():
+            print(f"{catalogue_path(name)}: {count} strings to translate")
+        return
+    started = time.perf_counter()
+    outputs, shared, plays = render_languages(args.file, args.scene, args.languages, args.quality, args.workers)
+    print(f"{len(shared)} of {plays} plays have no localized text and were rendered once")
+    for name, (output, seconds) in outputs.items():
+        print(f"{name}: {seconds:.1f}s -> {output}")
+    print(f"all languages in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    # Workers and scenes import this module by name; run from it so they share its state
+    import localization
+
+    localization.main()
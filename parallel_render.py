@@ -0,0 +1,184 @@
+"""Render one scene on several cores by sharing its plays between processes.
+
+Usage::
+
+    python parallel_render.py backprop.py BackpropExplainer -q h -j 8
+
+Cairo rasterizes a frame on one core, and the Python that builds its paths
+holds the GIL, so threads drawing tiles of the same frame barely help. Instead
+every worker process runs the whole scene but renders only the ``play()``
+calls assigned to it; the others are skipped the way manim skips animations
+(set up, then jumped to their end). Each worker writes its plays to the same
+partial movie files a serial render would write, and the parent joins them
+in play order, so the video matches ``-j 1`` frame for frame.
+
+A first pass with every play skipped works out the hash and features of
+each play, and ``costs.py`` predicts how long each will take to render from
+earlier timings. The plays are then handed out longest first, each to the
+worker with the least work so far; every worker times its plays for next
+time. Every process seeds ``random`` and NumPy the same way, so they
+all build the same scene.
+"""
+
+from render import QUALITIES, load_scenes
+from costs import CostDatabase, TimedRenderer, play_features
+from manim import config
+from manim.utils.hashing import get_hash_from_play_call
+from watch import concat_videos
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import multiprocessing
+import numpy as np
+import os
+import random
+import time
+from pathlib import Path
+
+SEED = 0
+
+
+class PlayShareRenderer(TimedRenderer):
+    """Renders only the plays in ``owned`` and skips the rest.
+
+    With ``record_hashes``, the partial movie hash and features of every play
+    are kept too, including the skipped ones.
+    """
+
+    def __init__(self, owned=(), record_hashes=False, **kwargs):
+        super().__init__(**kwargs)
+        self.owned = set(owned)
+        self.hashes = [] if record_hashes else None
+        self.features = []
+        self.durations = []
+        self.videos = {}
+        self.frames = 0
+
+    def play(self, scene, *args, **kwargs):
+        index = self.num_plays
+        self._original_skipping_status = index not in self.owned
+        if self.hashes is None:
+            super().play(scene, *args, **kwargs)
+        else:
+            compile_animation_data = scene.compile_animation_data
+
+            def compile_and_hash(*args, **kwargs):
+                compiled = compile_animation_data(*args, **kwargs)
+                self.hashes.append(get_hash_from_play_call(scene, self.camera, scene.animations, scene.mobjects))
+                return compiled
+
+            scene.compile_animation_data = compile_and_hash
+            try:
+                super().play(scene, *args, **kwargs)
+            finally:
+                del scene.compile_animation_data
+            self.features.append(play_features(scene))
+        self.durations.append(scene.duration)
+        if index in self.owned:
+            self.videos[index] = self.file_writer.partial_movie_files[index]
+
+    def add_frame(self, frame, num_frames=1):
+        if not self.skip_animations:
+            self.frames += num_frames
+        super().add_frame(frame, num_frames)
+
+    def scene_finished(self, scene):
+        # The parent joins the partial movies of all workers
+        pass
+
+
+def render_plays(path, scene_name, quality, owned=(), plan_only=False):
+    """Run the scene, rendering only the plays in ``owned``."""
+    started = time.perf_counter()
+    config.quality = QUALITIES[quality]
+    config.input_file = str(path)
+    config.dry_run = plan_only
+    random.seed(SEED)
+    np.random.seed(SEED)
+    renderer = PlayShareRenderer(owned, record_hashes=plan_only)
+    load_scenes(path)[scene_name](renderer=renderer).render()
+    if renderer.timings:
+        database = CostDatabase()
+        database.record(quality, renderer.timings)
+        database.close()
+    return {
+        "durations": renderer.durations,
+        "hashes": renderer.hashes,
+        "features": renderer.features,
+        "videos": renderer.videos,
+        "frames": renderer.frames,
+        "seconds": time.perf_counter() - started,
+        "output": None if plan_only else str(renderer.file_writer.movie_file_path),
+    }
+
+
+def first_plays(hashes):
+    """For every play, the first play with the same partial movie hash."""
+    first = {}
+    return [first.setdefault(play_hash, index) for index, play_hash in enumerate(hashes)]
+
+
+def assign_plays(costs, workers, hashes=None):
+    """Longest first, each play to the least loaded worker.
+
+    Plays with the same entry in ``hashes`` (a repeated ``wait()``, say) share
+    one partial movie file, so only the first of them is assigned; the rest
+    are cache hits.
+    """
+    loads = [0.0] * workers
+    owned = [[] for _ in range(workers)]
+    plays = range(len(costs)) if hashes is None else sorted(set(first_plays(hashes)))
+    for index in sorted(plays, key=lambda index: -costs[index]):
+        worker = loads.index(min(loads))
+        owned[worker].append(index)
+        loads[worker] += costs[index]
+    return owned, loads
+
+
+def predict_plays(plan, quality):
+    """Predicted seconds of every play in a first pass's ``plan``."""
+    database = CostDatabase()
+    costs = database.predict_plays(quality, plan["hashes"], plan["features"])
+    database.close()
+    return costs
+
+
+def render_parallel(path, scene_name, quality="l", workers=None):
+    """Render a scene with ``workers`` processes; returns the movie and per-worker results."""
+    path = Path(path).resolve()
+    workers = workers or os.cpu_count() or 1
+    context = multiprocessing.get_context("spawn")
+    # A fresh process per run keeps manim's global config and caches from leaking
+    with ProcessPoolExecutor(workers, mp_context=context, max_tasks_per_child=1) as pool:
+        plan = pool.submit(render_plays, path, scene_name, quality, (), True).result()
+        owned, _ = assign_plays(predict_plays(plan, quality), workers, plan["hashes"])
+        futures = [pool.submit(render_plays, path, scene_name, quality, plays) for plays in owned if plays]
+        results = [future.result() for future in futures]
+
+    videos = {}
+    for result in results:
+        videos.update(result["videos"])
+    ordered = [videos[first] for first in first_plays(plan["hashes"])]
+    output = concat_videos(ordered, results[0]["output"])
+    return output, plan, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("file", help="scene file, e.g. backprop.py")
+    parser.add_argument("scene", help="scene class name, e.g. BackpropExplainer")
+    parser.add_argument("-q", "--quality", choices=QUALITIES, default="l")
+    parser.add_argument("-j", "--workers", type=int, help="number of worker processes (default: one per core)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    output, plan, results = render_parallel(args.file, args.scene, args.quality, args.workers)
+    seconds = time.perf_counter() - started
+    frames = sum(result["frames"] for result in results)
+    print(f"first pass: {len(plan['durations'])} plays in {plan['seconds']:.1f}s")
+    for worker, result in enumerate(results):
+        print(f"worker {worker}: {len(result['videos'])} plays, {result['frames']} frames in {result['seconds']:.1f}s")
+    print(f"{frames} frames in {seconds:.1f}s ({frames / seconds:.1f} fps) -> {output}")
+
+
+if __name__ == "__main__":
+    main()
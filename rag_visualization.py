@@ -1,7 +1,13 @@
 from manim import *
 import numpy as np
+from group_fade import GroupFadeOut
+from instanced import InstancedGroup, instanced_drawing
+from particles import ParticleFlow
 
 class RAGScene(Scene):
+    def setup(self):
+        instanced_drawing(self.renderer.camera)
+
     def construct(self):
         # Title
         title = Text("Retrieval-Augmented Generation (RAG)", font_size=40)
@@ -25,10 +31,9 @@ class RAGScene(Scene):
         doc_encoder_group = VGroup(doc_encoder, doc_encoder_text).next_to(query_encoder_group, RIGHT, buff=1.5)
         
         # Move document corpus to align with document encoder
-        docs = VGroup(*[
-            Rectangle(height=0.8, width=1.2, fill_opacity=0.3, fill_color=BLUE)
-            for _ in range(5)
-        ]).arrange(RIGHT, buff=0.3)
+        docs = InstancedGroup(
+            Rectangle(height=0.8, width=1.2, fill_opacity=0.3, fill_color=BLUE), 5
+        ).arrange(RIGHT, buff=0.3)
         
         # Position the document corpus above the document encoder
         docs.move_to(doc_encoder.get_center() + UP * 2)
@@ -47,7 +52,7 @@ class RAGScene(Scene):
         # Animate document corpus
         self.play(
             Write(docs_label),
-            *[Create(doc) for doc in docs]
+            Create(docs)
         )
         
         # Animate query
@@ -100,6 +105,11 @@ class RAGScene(Scene):
             *[Create(line) for line in retrieval_lines]
         )
         
+        # Data moving along the pipeline while the explanation is written
+        doc_flow = ParticleFlow(*doc_vecs, *retrieval_lines, count=1500, color=BLUE)
+        query_flow = ParticleFlow(query_vec, query_to_generator, count=500, color=GREEN)
+        self.play(FadeIn(doc_flow), FadeIn(query_flow))
+        
         # Show output generation
         self.play(Create(output_box), Write(output_text))
         
@@ -121,6 +131,4 @@ class RAGScene(Scene):
         self.wait(2)
         
         # Fade out
-        self.play(
-            *[FadeOut(mob) for mob in self.mobjects]
-        ) 
\ No newline at end of file
+        self.play(GroupFadeOut(*self.mobjects)) 
\ No newline at end of file
@@ -1,8 +1,17 @@
 from manim import *
 import numpy as np
-import random
+from incremental_text import IncrementalText, TypeIn
+from instanced import InstancedGroup, instanced_drawing
+from layout import Layout
+from particles import ParticleFlow
+from embedding import EmbeddingPanel, synthetic_embeddings
+from localization import localize
+from group_fade import GroupFadeOut, all_except
 
 class RAGVisualizationV2(Scene):
+    def setup(self):
+        instanced_drawing(self.renderer.camera)
+
     def construct(self):
         # Title
         title = Text("Retrieval-Augmented Generation (RAG)", font_size=40)
@@ -15,7 +24,7 @@ class RAGVisualizationV2(Scene):
         self.play(header.animate.scale(0.6).to_edge(UP))
         
         # Create a stages diagram
-        stages_title = Text("RAG Pipeline Stages", font_size=32).next_to(header, DOWN, buff=0.5)
+        stages_title = Text("RAG Pipeline Stages", font_size=32)
         
         # Create the 5 stages boxes
         stages = ["Loading", "Indexing", "Storing", "Querying", "Evaluation"]
@@ -23,11 +32,15 @@ class RAGVisualizationV2(Scene):
             VGroup(
                 Rectangle(width=2.2, height=1, fill_opacity=0.3, fill_color=BLUE),
                 Text(stage, font_size=24)
-            ).arrange(ORIGIN)
+            )
             for stage in stages
-        ]).arrange(RIGHT, buff=0.5)
+        ])
+        stage_group = VGroup(stages_title, stage_boxes)
         
-        stage_group = VGroup(stages_title, stage_boxes).arrange(DOWN, buff=0.5)
+        layout = Layout()
+        cards = [layout.overlay(*box) for box in stage_boxes]
+        layout.column(stages_title, layout.row(*cards, buff=0.5), buff=0.5)
+        layout.apply()
         
         self.play(Write(stages_title))
         self.play(*[Create(box[0]) for box in stage_boxes])
@@ -44,35 +57,45 @@ class RAGVisualizationV2(Scene):
         loading_title = VGroup(
             Text("Loading", font_size=28, color=BLUE),
             Text("Stage", font_size=28, color=BLUE)
-        ).arrange(DOWN, buff=0.2)
+        )
         
         doc_box = Rectangle(width=1.5, height=2, fill_opacity=0.2, fill_color=GRAY)
-        doc_text = Text("Documents", font_size=20).next_to(doc_box, UP)
+        doc_text = Text("Documents", font_size=20)
         docs = VGroup(doc_box, doc_text)
         
-        node_boxes = VGroup(*[
-            Rectangle(width=1.2, height=0.5, fill_opacity=0.3, fill_color=GREEN_B)
-            for _ in range(4)
-        ]).arrange(DOWN, buff=0.1)
-        node_text = Text("Nodes", font_size=20).next_to(node_boxes, UP)
+        node_boxes = InstancedGroup(
+            Rectangle(width=1.2, height=0.5, fill_opacity=0.3, fill_color=GREEN_B), 4
+        ).arrange(DOWN, buff=0.1)
+        node_text = Text("Nodes", font_size=20)
         nodes = VGroup(node_boxes, node_text)
         
         connector = Arrow(doc_box.get_right(), node_boxes.get_left(), color=WHITE)
-        connector_text = Text("Connectors/\nReaders", font_size=18).next_to(connector, UP, buff=0.1)
-        
-        loading_group = VGroup(loading_title, docs, nodes, connector, connector_text).arrange(RIGHT, buff=1)
-        loading_title.shift(RIGHT * 1)  # Move title more to the right
+        connector_text = Text("Connectors/\nReaders", font_size=18)
         
         # Explanation text for loading stage
         loading_explanation = Text(
             "Loading: Ingesting data from sources (PDFs, websites, APIs).",
             font_size=16
-        ).next_to(loading_group, DOWN)
+        )
+        
+        layout = Layout()
+        title_column = layout.column(*loading_title, buff=0.2)
+        loading_row = layout.row(
+            title_column,
+            layout.column(doc_text, doc_box),
+            layout.column(node_text, node_boxes),
+            connector,
+            connector_text,
+            buff=1
+        )
+        layout.shift(title_column, RIGHT * 1)  # Move title more to the right
+        layout.next_to(loading_explanation, loading_row, DOWN)
+        layout.apply()
         
         self.play(Write(loading_title))
         self.play(Create(doc_box), Write(doc_text))
         self.play(
-            *[Create(box) for box in node_boxes],
+            Create(node_boxes),
             Write(node_text)
         )
         self.play(Create(connector), Write(connector_text))
@@ -81,46 +104,55 @@ class RAGVisualizationV2(Scene):
         
         # Clear previous content
         self.play(
-            *[FadeOut(mob) for mob in [loading_title, docs, nodes, connector, connector_text, loading_explanation]]
+            GroupFadeOut(loading_title, docs, nodes, connector, connector_text, loading_explanation)
         )
         
         # 2. Indexing Stage
         indexing_title = Text("Indexing Stage", font_size=28, color=BLUE)
         
         # Nodes (left side)
-        node_boxes_small = VGroup(*[
-            Rectangle(width=1.5, height=0.3, fill_opacity=0.3, fill_color="#556B2F")  # Dark olive green
-            for _ in range(4)
-        ]).arrange(DOWN, buff=0.1)
-        node_text_small = Text("Nodes", font_size=20).next_to(node_boxes_small, UP)
+        node_boxes_small = InstancedGroup(
+            Rectangle(width=1.5, height=0.3, fill_opacity=0.3, fill_color="#556B2F"), 4  # Dark olive green
+        ).arrange(DOWN, buff=0.1)
+        node_text_small = Text("Nodes", font_size=20)
         nodes_small = VGroup(node_boxes_small, node_text_small)
         
         # Embedding Model box and text (between nodes and embeddings)
         embed_model_box = Rectangle(width=1.8, height=0.6, fill_opacity=0.1, color=WHITE)
         embed_model_text = Text("Embedding\nModel", font_size=16)
-        embed_model = VGroup(embed_model_box, embed_model_text).arrange(ORIGIN)
-        
-        # Embedding vectors (middle)
-        vectors = VGroup(*[
-            Line(
-                start=ORIGIN,
-                end=RIGHT * random.uniform(0.5, 1),
-                color=YELLOW
-            )
-            for _ in range(4)
-        ]).arrange(DOWN, buff=0.2)
-        vector_box = Rectangle(width=1.5, height=1.5, fill_opacity=0.1, color=WHITE)
-        vector_text = Text("Embeddings", font_size=20).next_to(vector_box, UP)
-        vector_group = VGroup(vectors, vector_box, vector_text)
-        vectors.move_to(vector_box)
+        embed_model = VGroup(embed_model_box, embed_model_text)
+        
+        # Embedding space (middle): the nodes' embeddings projected to 2D
+        node_embeddings = synthetic_embeddings(count=20000, dimensions=64)
+        embeddings = EmbeddingPanel(node_embeddings, width=1.5, height=1.5, point_width=1)
+        vector_box = embeddings.frame
+        vector_text = Text("Embeddings", font_size=20)
+        vector_group = Group(embeddings, vector_text)
         
         # Vector database (right)
         db_box = Rectangle(width=2, height=1.8, fill_opacity=0.3, fill_color="#8B4513")  # Brown color
-        db_text = Text("Vector Store", font_size=20).next_to(db_box, UP)
+        db_text = Text("Vector Store", font_size=20)
         db = VGroup(db_box, db_text)
         
+        # Explanation text for indexing stage
+        indexing_explanation = Text(
+            "Indexing: Transforming Nodes into vector embeddings\n"
+            "and storing them in a vector database for efficient retrieval",
+            font_size=14
+        )
+        
         # Position all components horizontally with reduced spacing
-        components = VGroup(nodes_small, embed_model, vector_group, db).arrange(RIGHT, buff=1.2)
+        layout = Layout()
+        components = layout.row(
+            layout.column(node_text_small, node_boxes_small),
+            layout.overlay(embed_model_box, embed_model_text),
+            layout.column(vector_text, embeddings),
+            layout.column(db_text, db_box),
+            buff=1.2
+        )
+        layout.next_to(indexing_title, components, UP, buff=0.5)
+        layout.next_to(indexing_explanation, components, DOWN, buff=0.3)
+        layout.apply()
         
         # Create horizontal arrows
         nodes_to_model = Arrow(
@@ -144,20 +176,10 @@ class RAGVisualizationV2(Scene):
             buff=0.1
         )
         
-        # Position title and explanation
-        indexing_title.next_to(components, UP, buff=0.5)
-        
-        # Explanation text for indexing stage
-        indexing_explanation = Text(
-            "Indexing: Transforming Nodes into vector embeddings\n"
-            "and storing them in a vector database for efficient retrieval",
-            font_size=14
-        ).next_to(components, DOWN, buff=0.3)
-        
         # Animate the indexing stage
         self.play(Write(indexing_title))
         self.play(
-            *[Create(box) for box in node_boxes_small],
+            Create(node_boxes_small),
             Write(node_text_small)
         )
         self.play(Create(nodes_to_model))
@@ -166,8 +188,13 @@ class RAGVisualizationV2(Scene):
         self.play(
             Create(vector_box),
             Write(vector_text),
-            *[Create(v) for v in vectors]
+            FadeIn(embeddings.cloud)
         )
+        
+        # A query lands next to its nearest neighbours
+        query_dot, neighbours = embeddings.query(node_embeddings[0] + 0.3, k=8)
+        self.play(FadeIn(query_dot, scale=2))
+        self.play(FadeIn(neighbours))
         self.play(Create(vectors_to_db))
         self.play(Create(db_box), Write(db_text))
         self.play(Write(indexing_explanation))
@@ -175,9 +202,9 @@ class RAGVisualizationV2(Scene):
         
         # Clear previous content
         self.play(
-            *[FadeOut(mob) for mob in [indexing_title, nodes_small, vector_group, db, 
-                                      nodes_to_model, model_to_vectors, vectors_to_db,
-                                      embed_model, indexing_explanation]]
+            GroupFadeOut(indexing_title, nodes_small, vector_group, query_dot, neighbours, db,
+                         nodes_to_model, model_to_vectors, vectors_to_db,
+                         embed_model, indexing_explanation)
         )
         
         # 3. Querying Stage
@@ -272,6 +299,11 @@ class RAGVisualizationV2(Scene):
         self.play(Create(llm_to_output), Write(response_text))
         self.play(Create(output_box), Write(output_text))
         
+        # Queries and retrieved context flowing through the pipeline
+        query_flow = ParticleFlow(query_to_db, count=600, color=GREEN)
+        context_flow = ParticleFlow(db_to_retrieved, retrieved_to_llm, count=1200, color=YELLOW)
+        self.play(FadeIn(query_flow), FadeIn(context_flow))
+        
         # Explanation text for querying stage
         querying_explanation = Text(
             "Querying: User query is converted to an embedding, relevant context is retrieved,\n"
@@ -284,28 +316,34 @@ class RAGVisualizationV2(Scene):
         
         # Fade out everything except stage diagram at top
         self.play(
-            *[FadeOut(mob) for mob in self.mobjects if mob not in [*stage_boxes, stages_title, header]]
+            GroupFadeOut(*all_except(self.mobjects, *stage_boxes, stages_title, header))
         )
         
         # Benefits of RAG
         benefits_title = Text("Benefits of RAG", font_size=32).move_to(DOWN * 1)
         
-        benefits = VGroup(
-            Text("• No training needed - more cost-effective", font_size=24),
-            Text("• Always up-to-date with latest data", font_size=24),
-            Text("• Transparent and trustworthy results", font_size=24),
-            Text("• Reduces hallucinations with factual grounding", font_size=24)
-        ).arrange(DOWN, aligned_edge=LEFT, buff=0.3).next_to(benefits_title, DOWN, buff=0.5)
+        benefit_lines = [
+            localize("• No training needed - more cost-effective"),
+            localize("• Always up-to-date with latest data"),
+            localize("• Transparent and trustworthy results"),
+            localize("• Reduces hallucinations with factual grounding")
+        ]
+        
+        # Bullets are typed into one incremental text instead of separate Text objects
+        benefits = IncrementalText(font_size=24, line_spacing=1.6)
+        widest = max(benefits.measure(line) for line in benefit_lines)
+        benefits.move_to(benefits_title.get_bottom() + DOWN * 0.5 + LEFT * widest / 2)
+        self.add(benefits)
         
         self.play(Write(benefits_title))
-        for benefit in benefits:
-            self.play(Write(benefit))
+        for i, benefit in enumerate(benefit_lines):
+            self.play(TypeIn(benefits, ("\n" if i else "") + benefit))
             self.wait(0.5)
         
         self.wait(2)
         
         # Final fade out
-        self.play(*[FadeOut(mob) for mob in self.mobjects])
+        self.play(GroupFadeOut(*self.mobjects))
         
         # Final message
         final_message = Text("RAG: Enhancing LLMs with Your Data", font_size=40)
@@ -0,0 +1,176 @@
+"""Render explainer scenes with the project's own renderer options.
+
+Usage::
+
+    python render.py rag_visualization_v2.py RAGVisualizationV2 -q m --encoder pipe
+
+``--encoder partial`` (the default) is manim's stock behaviour of one movie
+file per ``play()`` followed by a concat pass; ``--encoder pipe`` streams the
+whole scene through a single ffmpeg process (see ``frame_pipe.py``), with
+encoding overlapped with rasterization through a ring of ``--ring-slots``
+preallocated frames. ``--pipe-cache`` also keeps a partial movie per rendered
+play for later runs, at the cost of encoding those frames a second time.
+
+Scene files are imported through ``lazy_manim.py``, which loads only the parts
+of manim they use; every run logs how long it took to reach the first
+``play()``. ``--startup-only`` stops there and prints the timings as JSON.
+``--draft`` renders a quick preview with the stand-ins of ``draft.py``, and
+``--dirty-regions`` redraws only the changed tiles of each frame (see
+``dirty_regions.py``). ``--metrics`` and ``--metrics-port`` export live
+progress, cache and memory metrics (see ``telemetry.py``).
+"""
+
+import time
+
+STARTED = time.perf_counter()
+
+# Must run before anything else imports manim
+import lazy_manim
+
+lazy_manim.install()
+
+from manim import Scene, config, logger
+from manim.renderer.cairo_renderer import CairoRenderer
+from manim.scene.scene_file_writer import SceneFileWriter
+from encoder_pipeline import StreamingCairoRenderer
+from frame_pipe import PipeSceneFileWriter
+from telemetry import Telemetry
+from functools import partial
+import argparse
+import importlib.util
+import inspect
+import json
+import sys
+from pathlib import Path
+
+QUALITIES = {
+    "l": "low_quality",
+    "m": "medium_quality",
+    "h": "high_quality",
+    "p": "production_quality",
+    "k": "fourk_quality",
+}
+
+FILE_WRITERS = {
+    "partial": SceneFileWriter,
+    "pipe": PipeSceneFileWriter,
+}
+
+# Seconds from importing this module to each startup milestone
+startup = {"imports": time.perf_counter() - STARTED}
+
+
+class StartupMeasured(Exception):
+    pass
+
+
+def load_scenes(path):
+    """Import a scene file and return its Scene subclasses by name."""
+    path = Path(path).resolve()
+    sys.path.insert(0, str(path.parent))
+    spec = importlib.util.spec_from_file_location(path.stem, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[path.stem] = module
+    lazy_manim.expose(path)
+    spec.loader.exec_module(module)
+    return {
+        name: obj
+        for name, obj in inspect.getmembers(module, inspect.isclass)
+        if issubclass(obj, Scene) and obj.__module__ == module.__name__
+    }
+
+
+def time_first_play(renderer, stop=False):
+    """Log the startup timings when the scene reaches its first ``play()``."""
+    play = renderer.play
+
+    def first_play(*args, **kwargs):
+        renderer.play = play
+        startup["first_play"] = time.perf_counter() - STARTED
+        startup["modules"] = sum(name.split(".")[0] == "manim" for name in sys.modules)
+        logger.info(
+            "Startup: imports %(imports).2fs, scene loaded %(scene_loaded).2fs, "
+            "first play %(first_play).2fs (%(modules)d manim modules, %(mode)s)",
+            dict(startup, mode="lazy" if lazy_manim.is_lazy() else "eager"),
+        )
+        if stop:
+            raise StartupMeasured
+        return play(*args, **kwargs)
+
+    renderer.play = first_play
+
+
+def render_scene(path, scene_name, quality="l", encoder="partial", preview=False, ring_slots=8,
+                 dry_run=False, startup_only=False, draft=False, dirty_regions=False,
+                 metrics=None, metrics_port=None, pipe_cache=False):
+    """Render one scene and return the path of the finished movie."""
+    config.quality = QUALITIES[quality]
+    if draft:
+        import draft as draft_mode
+
+        draft_mode.enable()
+    config.input_file = str(Path(path).resolve())
+    config.preview = preview
+    config.dry_run = dry_run or startup_only
+    scene_class = load_scenes(path)[scene_name]
+    startup["scene_loaded"] = time.perf_counter() - STARTED
+    camera_class = None
+    if dirty_regions:
+        from dirty_regions import DirtyRegionCamera as camera_class
+    if encoder == "pipe":
+        renderer = StreamingCairoRenderer(
+            file_writer_class=partial(PipeSceneFileWriter, ring_slots=ring_slots, cache_partials=pipe_cache),
+            camera_class=camera_class,
+        )
+    else:
+        renderer = CairoRenderer(file_writer_class=FILE_WRITERS[encoder], camera_class=camera_class)
+    telemetry = None
+    if metrics or metrics_port is not None:
+        telemetry = Telemetry(f"{scene_name}/{quality}", metrics).attach(renderer).start(metrics_port)
+    time_first_play(renderer, stop=startup_only)
+    scene = scene_class(renderer=renderer)
+    status = "failed"
+    try:
+        scene.render()
+        status = "done"
+    except StartupMeasured:
+        status = "stopped"
+        return None
+    finally:
+        if telemetry is not None:
+            telemetry.finish(status)
+    if dirty_regions:
+        renderer.camera.log_stats()
+    return config["output_file"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("file", help="scene file, e.g. backprop.py")
+    parser.add_argument("scene", help="scene class name, e.g. BackpropExplainer")
+    parser.add_argument("-q", "--quality", choices=QUALITIES, default="l")
+    parser.add_argument("--encoder", choices=FILE_WRITERS, default="partial")
+    parser.add_argument("--ring-slots", type=int, default=8,
+                        help="preallocated frames between renderer and encoder (pipe only)")
+    parser.add_argument("--pipe-cache", action="store_true",
+                        help="also write a partial movie file per rendered play, encoding its frames twice (pipe only)")
+    parser.add_argument("-p", "--preview", action="store_true")
+    parser.add_argument("--dry-run", action="store_true", help="run the scene without writing any files")
+    parser.add_argument("--draft", action="store_true",
+                        help="low resolution and frame rate, with cheap stand-ins (see draft.py)")
+    parser.add_argument("--dirty-regions", action="store_true",
+                        help="redraw only the parts of each frame that changed")
+    parser.add_argument("--startup-only", action="store_true",
+                        help="stop at the first play() and print the startup timings as JSON")
+    parser.add_argument("--metrics", help="keep live metrics in this Prometheus text file")
+    parser.add_argument("--metrics-port", type=int, help="serve live metrics on this local port")
+    args = parser.parse_args()
+    render_scene(args.file, args.scene, args.quality, args.encoder, args.preview, args.ring_slots,
+                 args.dry_run, args.startup_only, args.draft, args.dirty_regions,
+                 args.metrics, args.metrics_port, args.pipe_cache)
+    if args.startup_only:
+        print(json.dumps(startup))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""Sections of the explainer scenes, found from their source.
+
+A section is every ``self.<method>()`` statement in ``construct`` (for example
+``show_forward_pass``); the rest of ``construct`` is the ``intro``. Each
+section gets a fingerprint of its method's AST plus the helper methods it
+calls, and the sets of ``self`` attributes it reads and writes. Every
+fingerprint also covers the rest of the scene file and, given the file's path,
+the source of the local modules it imports (``instanced.py``, ``draft.py``,
+...), so editing a helper module makes every section of the scene stale.
+"""
+
+import ast
+import hashlib
+from pathlib import Path
+
+
+INTRO = "intro"
+
+
+class SectionInfo:
+    """Fingerprint and ``self`` attribute access of one section."""
+
+    def __init__(self, name, fingerprint, reads, writes):
+        self.name = name
+        self.fingerprint = fingerprint
+        self.reads = reads
+        self.writes = writes
+
+
+def self_attributes(node, context):
+    return {
+        child.attr
+        for child in ast.walk(node)
+        if isinstance(child, ast.Attribute)
+        and isinstance(child.value, ast.Name)
+        and child.value.id == "self"
+        and isinstance(child.ctx, context)
+    }
+
+
+def called_methods(node, methods):
+    return self_attributes(node, ast.Load) & set(methods)
+
+
+def called_attributes(node):
+    return {
+        child.func.attr
+        for child in ast.walk(node)
+        if isinstance(child, ast.Call)
+        and isinstance(child.func, ast.Attribute)
+        and isinstance(child.func.value, ast.Name)
+        and child.func.value.id == "self"
+    }
+
+
+def local_modules(path):
+    """The modules next to ``path`` that it imports at module level, directly or not."""
+    path = Path(path).resolve()
+    seen = {path}
+    stack = [path]
+    while stack:
+        tree = ast.parse(stack.pop().read_text(encoding="utf-8"))
+        for node in tree.body:
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+                names = [node.module]
+            else:
+                continue
+            for name in names:
+                module = path.parent / f"{name}.py"
+                if module.exists() and module not in seen:
+                    seen.add(module)
+                    stack.append(module)
+    return sorted(seen - {path})
+
+
+def analyze_sections(source, scene_name, path=None):
+    """Split a scene class into ordered sections and describe each one.
+
+    ``path`` is the scene file, whose local imports are then fingerprinted too.
+    """
+    tree = ast.parse(source)
+    scene = next(
+        node for node in tree.body
+        if isinstance(node, ast.ClassDef) and node.name == scene_name
+    )
+    methods = {node.name: node for node in scene.body if isinstance(node, ast.FunctionDef)}
+    # Module-level code (imports, constants, other classes) affects every section
+    module_code = ast.dump(ast.Module([node for node in tree.body if node is not scene], []))
+    if path is not None:
+        for module in local_modules(path):
+            module_code += f"\n# {module.name}\n" + module.read_text(encoding="utf-8")
+
+    construct = methods["construct"]
+    section_names = [
+        statement.value.func.attr
+        for statement in construct.body
+        if isinstance(statement, ast.Expr)
+        and isinstance(statement.value, ast.Call)
+        and isinstance(statement.value.func, ast.Attribute)
+        and isinstance(statement.value.func.value, ast.Name)
+        and statement.value.func.value.id == "self"
+        and statement.value.func.attr in methods
+    ]
+
+    def closure(name):
+        # The method plus every helper it reaches, excluding other sections
+        seen = set()
+        stack = [name]
+        while stack:
+            current = stack.pop()
+            if current in seen:
+                continue
+            seen.add(current)
+            stack += [
+                callee for callee in called_methods(methods[current], methods)
+                if callee not in section_names
+            ]
+        return [methods[method] for method in sorted(seen)]
+
+    sections = []
+    for name in [INTRO] + section_names:
+        nodes = closure("construct" if name == INTRO else name)
+        digest = hashlib.sha256(module_code.encode())
+        for node in nodes:
+            digest.update(ast.dump(node).encode())
+        reads = set().union(*[
+            self_attributes(node, ast.Load) - called_attributes(node) for node in nodes
+        ]) - set(methods)
+        writes = set().union(*[self_attributes(node, ast.Store) for node in nodes])
+        sections.append(SectionInfo(name, digest.hexdigest(), reads, writes))
+    return sections
+
+
+def sectioned(scene_class, section_names, dirty):
+    """Subclass ``scene_class`` so each section starts a manim section of its own."""
+
+    def wrap(name):
+        method = getattr(scene_class, name)
+
+        def section(self, *args, **kwargs):
+            self.next_section(name, skip_animations=name not in dirty)
+            return method(self, *args, **kwargs)
+
+        return section
+
+    def setup(self):
+        scene_class.setup(self)
+        self.next_section(INTRO, skip_animations=INTRO not in dirty)
+
+    attributes = {name: wrap(name) for name in section_names}
+    attributes["setup"] = setup
+    attributes["__module__"] = scene_class.__module__
+    return type(scene_class.__name__, (scene_class,), attributes)
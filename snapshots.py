@@ -0,0 +1,284 @@
+"""Save scene state at section boundaries and resume rendering from there.
+
+Usage::
+
+    python snapshots.py backprop.py BackpropExplainer              # render and save
+    python snapshots.py backprop.py BackpropExplainer --resume show_backward_pass
+
+Sections are the ``self.<method>()`` statements of ``construct`` (see
+``sections.py``). Before each section starts, the scene's mobjects, the attributes
+it set on ``self`` (``self.network``, ``self.edges``, ...) and the random
+generators' state are written to ``media/snapshots/<Scene>/``. Resuming loads
+one of those files and runs only that section and the rest of ``construct``.
+
+A snapshot is one file: a magic string, a pickled header holding the object
+graph, and one contiguous float64 block with every point (and other float)
+array in it. Arrays come back as copy-on-write views of a memory map, so
+loading does not read the points until they are used. Updaters and other
+locally defined functions can't be pickled and are dropped.
+"""
+
+from manim import *
+from render import QUALITIES, load_scenes
+from sections import INTRO, analyze_sections
+import argparse
+import ast
+import copy
+import inspect
+import io
+import numpy as np
+import os
+import pickle
+import random
+import struct
+import sys
+import types
+from pathlib import Path
+
+MAGIC = b"MNSNAP01"
+ALIGNMENT = 64
+
+
+class SnapshotPickler(pickle.Pickler):
+    """Moves float64 arrays out of the pickle into one contiguous block."""
+
+    def __init__(self, file):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.arrays = []
+        self.array_ids = {}
+        self.size = 0
+
+    def persistent_id(self, obj):
+        if isinstance(obj, np.ndarray) and obj.dtype == np.float64 and obj.size:
+            if id(obj) not in self.array_ids:
+                # Arrays shared between mobjects stay shared after loading
+                self.arrays.append(obj)
+                self.array_ids[id(obj)] = ("array", self.size, obj.shape)
+                self.size += obj.size
+            return self.array_ids[id(obj)]
+        if isinstance(obj, types.FunctionType) and (
+            "<lambda>" in obj.__qualname__ or "<locals>" in obj.__qualname__
+        ):
+            return ("function", obj.__qualname__)
+        return None
+
+
+class SnapshotUnpickler(pickle.Unpickler):
+    def __init__(self, file, block):
+        super().__init__(file)
+        self.block = block
+
+    def persistent_load(self, pid):
+        if pid[0] == "array":
+            _, start, shape = pid
+            return np.asarray(self.block[start:start + int(np.prod(shape))]).reshape(shape)
+        return None
+
+
+def write_snapshot(path, header, state):
+    buffer = io.BytesIO()
+    pickler = SnapshotPickler(buffer)
+    pickler.dump(state)
+    header = dict(header, state=buffer.getvalue())
+    header_bytes = pickle.dumps(header, protocol=pickle.HIGHEST_PROTOCOL)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(f"{path.name}.{os.getpid()}.partial")
+    with open(partial, "wb") as file:
+        file.write(MAGIC)
+        file.write(struct.pack("<Q", len(header_bytes)))
+        file.write(header_bytes)
+        file.write(b"\0" * (-file.tell() % ALIGNMENT))
+        for array in pickler.arrays:
+            file.write(np.ascontiguousarray(array).data)
+    # Renders running in parallel may read this snapshot while it is replaced
+    os.replace(partial, path)
+
+
+def read_header(path):
+    """Return the header of a snapshot and the offset of its array block."""
+    with open(path, "rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a scene snapshot")
+        (header_length,) = struct.unpack("<Q", file.read(8))
+        header = pickle.loads(file.read(header_length))
+        return header, file.tell() + (-file.tell() % ALIGNMENT)
+
+
+def read_snapshot(path):
+    """Return (header, state) with arrays memory-mapped from ``path``."""
+    header, block_offset = read_header(path)
+    if Path(path).stat().st_size > block_offset:
+        block = np.memmap(path, dtype=np.float64, mode="c", offset=block_offset)
+    else:
+        block = np.empty(0)
+    state = SnapshotUnpickler(io.BytesIO(header["state"]), block).load()
+    return header, state
+
+
+def capture_state(scene):
+    attributes = {
+        name: value for name, value in scene.__dict__.items()
+        if name not in scene.snapshot_baseline
+    }
+    return {
+        "mobjects": scene.mobjects,
+        "foreground_mobjects": scene.foreground_mobjects,
+        "attributes": attributes,
+        "random": random.getstate(),
+        "numpy_random": np.random.get_state(),
+    }
+
+
+def restore_state(scene, state):
+    scene.mobjects = state["mobjects"]
+    scene.foreground_mobjects = state["foreground_mobjects"]
+    for name, value in state["attributes"].items():
+        setattr(scene, name, value)
+    random.setstate(state["random"])
+    np.random.set_state(state["numpy_random"])
+    for mobject in scene.get_mobject_family_members():
+        # Updaters that could not be pickled come back as None
+        mobject.updaters = [updater for updater in mobject.updaters if updater is not None]
+
+
+class SnapshotStore:
+    """The snapshots of one scene, validated against the current source."""
+
+    def __init__(self, scene_name, sections, directory=None):
+        self.directory = Path(directory or Path(config.media_dir) / "snapshots") / scene_name
+        self.sections = sections
+
+    def path(self, name):
+        index = [section.name for section in self.sections].index(name)
+        return self.directory / f"{index:02}_{name}.snap"
+
+    def fingerprints_before(self, name):
+        # The state at the start of a section depends on everything before it
+        names = [section.name for section in self.sections]
+        return {
+            section.name: section.fingerprint
+            for section in self.sections[:names.index(name)]
+        }
+
+    def save(self, scene, name):
+        header = {"section": name, "fingerprints": self.fingerprints_before(name)}
+        write_snapshot(self.path(name), header, capture_state(scene))
+
+    def is_valid(self, name):
+        path = self.path(name)
+        if not path.exists():
+            return False
+        try:
+            header, _ = read_header(path)
+        except (OSError, EOFError, ValueError, struct.error, pickle.UnpicklingError):
+            return False
+        return header["fingerprints"] == self.fingerprints_before(name)
+
+    def load(self, name):
+        """The state saved before ``name``, or None if it can no longer be unpickled."""
+        path = self.path(name)
+        try:
+            header, state = read_snapshot(path)
+        except Exception as error:
+            # A class the snapshot refers to changed layout or moved; render from the start
+            logger.warning("Discarding snapshot %(path)s: %(e)s", {"path": str(path), "e": error})
+            path.unlink(missing_ok=True)
+            return None
+        if header["fingerprints"] != self.fingerprints_before(name):
+            raise ValueError(f"The snapshot for {name} is out of date; render the scene again")
+        return state
+
+
+def construct_from(scene_class, section_name):
+    """Compile the statements of ``construct`` from ``section_name``'s call onwards.
+
+    Statements after the resume point may only use names they define themselves
+    (or attributes on ``self``), since earlier locals are never created.
+    """
+    source_file = inspect.getsourcefile(scene_class)
+    tree = ast.parse(Path(source_file).read_text())
+    scene = next(
+        node for node in tree.body
+        if isinstance(node, ast.ClassDef) and node.name == scene_class.__name__
+    )
+    construct = next(node for node in scene.body if isinstance(node, ast.FunctionDef) and node.name == "construct")
+    index = next(
+        i for i, statement in enumerate(construct.body)
+        if isinstance(statement, ast.Expr)
+        and isinstance(statement.value, ast.Call)
+        and isinstance(statement.value.func, ast.Attribute)
+        and statement.value.func.attr == section_name
+    )
+    resumed = copy.deepcopy(construct)
+    resumed.name = "resumed_construct"
+    resumed.decorator_list = []
+    resumed.body = construct.body[index:]
+    namespace = {}
+    module_globals = sys.modules[scene_class.__module__].__dict__
+    exec(compile(ast.Module([resumed], []), source_file, "exec"), module_globals, namespace)
+    return namespace["resumed_construct"]
+
+
+def resumable(scene_class, store, resume_from=None):
+    """Subclass ``scene_class`` to snapshot every section and optionally resume.
+
+    Snapshots are written at the start of each section unless a valid one is
+    already there; with ``resume_from``
+    the scene first restores that section's snapshot and runs from there, or
+    runs from the start if the snapshot can't be loaded.
+    """
+    section_names = [section.name for section in store.sections if section.name != INTRO]
+
+    def wrap(name):
+        method = getattr(scene_class, name)
+
+        def section(self, *args, **kwargs):
+            if not store.is_valid(name):
+                store.save(self, name)
+            return method(self, *args, **kwargs)
+
+        return section
+
+    def setup(self):
+        scene_class.setup(self)
+        self.snapshot_baseline = set(self.__dict__) | {"snapshot_baseline"}
+
+    attributes = {name: wrap(name) for name in section_names}
+    attributes["setup"] = setup
+    attributes["__module__"] = scene_class.__module__
+
+    state = store.load(resume_from) if resume_from is not None else None
+    if state is not None:
+        remaining = construct_from(scene_class, resume_from)
+
+        def construct(self):
+            restore_state(self, state)
+            remaining(self)
+
+        # The resume section itself must not overwrite the snapshot it came from
+        attributes[resume_from] = getattr(scene_class, resume_from)
+        attributes["construct"] = construct
+
+    return type(scene_class.__name__, (scene_class,), attributes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("file", help="scene file, e.g. backprop.py")
+    parser.add_argument("scene", help="scene class name, e.g. BackpropExplainer")
+    parser.add_argument("-q", "--quality", choices=QUALITIES, default="l")
+    parser.add_argument("--resume", metavar="SECTION", help="section to resume rendering from")
+    args = parser.parse_args()
+
+    path = Path(args.file).resolve()
+    sections = analyze_sections(path.read_text(), args.scene, path)
+    store = SnapshotStore(args.scene, sections)
+    config.quality = QUALITIES[args.quality]
+    config.input_file = str(path)
+    scene_class = load_scenes(path)[args.scene]
+    resumable(scene_class, store, args.resume)().render()
+
+
+if __name__ == "__main__":
+    main()
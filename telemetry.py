@@ -0,0 +1,312 @@
+"""Live metrics of a render: progress, encoding, caches and memory.
+
+Usage::
+
+    python render.py rag_visualization_v2.py RAGVisualizationV2 -q h --metrics media/metrics/rag.prom
+    python render.py backprop.py BackpropExplainer --metrics-port 9464
+    curl localhost:9464/metrics
+
+A ``Telemetry`` attached to a renderer counts plays and rendered frames, and
+every lookup in the three caches a render goes through: partial movie files
+(one per ``play()``), the SVGs Pango draws for ``Text`` and ``MarkupText``,
+and the SVGs LaTeX compiles for ``Tex`` and ``MathTex``. Every couple of
+seconds it samples the frame rate, the depth of the encode queue (with
+``--encoder pipe``) and the current and peak RSS, and writes them all, with
+the scene and section being rendered, as a Prometheus text file (for
+node_exporter's textfile collector) and/or serves them at
+``http://127.0.0.1:<port>/metrics``. ``manim_seconds_since_last_frame`` tells
+a stuck render from a slow one.
+
+When the render ends, a JSON summary goes next to the metrics file (or to
+``media/metrics/``). ``batch.py`` workers write both for every section job to
+``media/metrics/``.
+"""
+
+from manim import config
+import http.server
+import json
+import os
+import resource
+import sys
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+LAYERS = ("partial_movie", "text_svg", "tex")
+# Seconds of recent frames the frame rate is measured over
+RATE_WINDOW = 10.0
+
+# The telemetry of the render running in this process
+current = None
+
+
+def rss_bytes():
+    """Current and peak resident set size of this process."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform != "darwin":
+        peak *= 1024
+    try:
+        with open("/proc/self/statm") as statm:
+            rss = int(statm.read().split()[1]) * resource.getpagesize()
+    except OSError:
+        rss = peak
+    # The kernel updates the peak lazily
+    return rss, max(rss, peak)
+
+
+def count_lookup(layer, hit):
+    if current is not None:
+        (current.hits if hit else current.misses)[layer] += 1
+
+
+def counted_text2svg(text2svg):
+    def wrapper(self, color):
+        path = config.get_dir("text_dir") / f"{self._text2hash(color)}.svg"
+        count_lookup("text_svg", path.exists())
+        return text2svg(self, color)
+
+    wrapper.counted = True
+    return wrapper
+
+
+def install():
+    """Count cache lookups for text and formulas; call after the scene file is imported."""
+    from manim.utils import tex_file_writing
+
+    text_module = sys.modules.get("manim.mobject.text.text_mobject")
+    if text_module is not None:
+        for text_class in (text_module.Text, text_module.MarkupText):
+            if not hasattr(text_class._text2svg, "counted"):
+                text_class._text2svg = counted_text2svg(text_class._text2svg)
+
+    tex_to_svg_file = tex_file_writing.tex_to_svg_file
+    if hasattr(tex_to_svg_file, "counted"):
+        return
+
+    def counted_tex_to_svg_file(expression, environment=None, tex_template=None):
+        # The path generate_tex_file picks, without writing the .tex file first
+        template = tex_template or config["tex_template"]
+        if environment is not None:
+            code = template.get_texcode_for_expression_in_env(expression, environment)
+        else:
+            code = template.get_texcode_for_expression(expression)
+        svg_file = config.get_dir("tex_dir") / f"{tex_file_writing.tex_hash(code)}.svg"
+        count_lookup("tex", svg_file.exists())
+        return tex_to_svg_file(expression, environment, tex_template)
+
+    counted_tex_to_svg_file.counted = True
+    # tex_mobject binds the function by name when it is imported
+    tex_file_writing.tex_to_svg_file = counted_tex_to_svg_file
+    tex_module = sys.modules.get("manim.mobject.text.tex_mobject")
+    if tex_module is not None:
+        tex_module.tex_to_svg_file = counted_tex_to_svg_file
+
+
+def label_value(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def write_atomically(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(f"{path.name}.{os.getpid()}.partial")
+    partial.write_text(text)
+    os.replace(partial, path)
+
+
+class Telemetry:
+    """Metrics of one render job, exported while it runs."""
+
+    def __init__(self, job, path=None, interval=2.0):
+        self.job = job
+        self.path = Path(path) if path else None
+        self.interval = interval
+        self.renderer = None
+        self.scene = None
+        self.section = None
+        self.status = "starting"
+        self.plays = 0
+        self.frames = 0
+        self.hits = dict.fromkeys(LAYERS, 0)
+        self.misses = dict.fromkeys(LAYERS, 0)
+        self.started = time.time()
+        self.last_frame = None
+        self.max_queue_depth = 0
+        # (time, frames) over the last RATE_WINDOW seconds
+        self.samples = deque([(self.started, 0)])
+        self.stopped = threading.Event()
+        self.thread = None
+        self.server = None
+
+    def attach(self, renderer):
+        """Count the plays and frames of ``renderer``; attach before ``time_first_play``."""
+        global current
+        current = self
+        install()
+        self.renderer = renderer
+        play, add_frame = renderer.play, renderer.add_frame
+
+        def counted_play(scene, *args, **kwargs):
+            file_writer = renderer.file_writer
+            if not hasattr(file_writer.is_already_cached, "counted"):
+                file_writer.is_already_cached = self.counted_is_already_cached(file_writer.is_already_cached)
+            self.scene = type(scene).__name__
+            self.section = file_writer.sections[-1].name if file_writer.sections else None
+            self.status = "rendering"
+            play(scene, *args, **kwargs)
+            self.plays += 1
+
+        def counted_add_frame(frame, num_frames=1):
+            add_frame(frame, num_frames)
+            if not renderer.skip_animations:
+                self.frames += num_frames
+                self.last_frame = time.time()
+
+        renderer.play = counted_play
+        renderer.add_frame = counted_add_frame
+        return self
+
+    def counted_is_already_cached(self, is_already_cached):
+        def wrapper(hash_invocation):
+            cached = is_already_cached(hash_invocation)
+            count_lookup("partial_movie", cached)
+            return cached
+
+        wrapper.counted = True
+        return wrapper
+
+    def encoder(self):
+        """The encode queue of a ``--encoder pipe`` render, if any."""
+        return getattr(getattr(self.renderer, "file_writer", None), "pipeline", None)
+
+    def sample(self):
+        now = time.time()
+        self.samples.append((now, self.frames))
+        while len(self.samples) > 2 and self.samples[1][0] < now - RATE_WINDOW:
+            self.samples.popleft()
+        encoder = self.encoder()
+        if encoder is not None:
+            self.max_queue_depth = max(self.max_queue_depth, encoder.max_queue_depth)
+
+    def frame_rate(self):
+        (start, first), (end, last) = self.samples[0], self.samples[-1]
+        return (last - first) / (end - start) if end > start else 0.0
+
+    def metrics(self):
+        """(name, type, help, [(labels, value)]) of every metric."""
+        now = time.time()
+        rss, peak = rss_bytes()
+        encoder = self.encoder()
+        info = {"scene": self.scene or "", "section": self.section or "", "status": self.status}
+        return [
+            ("manim_render_info", "gauge", "Scene and section being rendered.", [(info, 1)]),
+            ("manim_render_seconds", "gauge", "Seconds since the render started.", [({}, now - self.started)]),
+            ("manim_plays_total", "counter", "play() and wait() calls run.", [({}, self.plays)]),
+            ("manim_frames_total", "counter", "Frames rendered (not read from the cache).", [({}, self.frames)]),
+            ("manim_frames_per_second", "gauge", f"Frames rendered per second over the last {RATE_WINDOW:g}s.",
+             [({}, self.frame_rate())]),
+            ("manim_seconds_since_last_frame", "gauge", "Seconds since a frame was last rendered.",
+             [({}, now - (self.last_frame or self.started))]),
+            ("manim_encode_queue_depth", "gauge", "Frames waiting for the encoder.",
+             [({}, encoder.queue_depth if encoder is not None else 0)]),
+            ("manim_encode_queue_slots", "gauge", "Frames the encode queue holds.",
+             [({}, encoder.slots if encoder is not None else 0)]),
+            ("manim_cache_hits_total", "counter", "Cache lookups that found a file.",
+             [({"layer": layer}, self.hits[layer]) for layer in LAYERS]),
+            ("manim_cache_misses_total", "counter", "Cache lookups that had to render.",
+             [({"layer": layer}, self.misses[layer]) for layer in LAYERS]),
+            ("manim_rss_bytes", "gauge", "Resident set size.", [({}, rss)]),
+            ("manim_peak_rss_bytes", "gauge", "Peak resident set size.", [({}, peak)]),
+        ]
+
+    def prometheus(self):
+        lines = []
+        for name, kind, description, values in self.metrics():
+            lines += [f"# HELP {name} {description}", f"# TYPE {name} {kind}"]
+            for labels, value in values:
+                labels = ",".join(f'{key}="{label_value(item)}"' for key, item in {"job": self.job, **labels}.items())
+                lines.append(f"{name}{{{labels}}} {value:g}" if isinstance(value, float) else f"{name}{{{labels}}} {value}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        seconds = time.time() - self.started
+        return {
+            "job": self.job,
+            "scene": self.scene,
+            "section": self.section,
+            "status": self.status,
+            "seconds": seconds,
+            "plays": self.plays,
+            "frames": self.frames,
+            "frames_per_second": self.frames / seconds if seconds else 0.0,
+            "max_encode_queue_depth": self.max_queue_depth,
+            "cache": {layer: {"hits": self.hits[layer], "misses": self.misses[layer]} for layer in LAYERS},
+            "peak_rss_bytes": rss_bytes()[1],
+        }
+
+    def summary_path(self):
+        if self.path is not None:
+            return self.path.with_suffix(".json")
+        return Path(config.media_dir) / "metrics" / f"{self.job.replace('/', '.')}.json"
+
+    def write(self):
+        if self.path is not None:
+            write_atomically(self.path, self.prometheus())
+
+    def export(self):
+        while not self.stopped.wait(self.interval):
+            self.sample()
+            self.write()
+
+    def start(self, port=None):
+        """Export every ``interval`` seconds, and serve on ``port`` if given."""
+        if port is not None:
+            self.server = serve(self, port)
+        self.thread = threading.Thread(target=self.export, daemon=True)
+        self.thread.start()
+        return self
+
+    def finish(self, status="done"):
+        """Write the final metrics and the JSON summary; returns the summary."""
+        global current
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+        self.status = status
+        self.sample()
+        self.write()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+        summary = self.summary()
+        write_atomically(self.summary_path(), json.dumps(summary, indent=4) + "\n")
+        if current is self:
+            current = None
+        return summary
+
+
+def serve(telemetry, port, host="127.0.0.1"):
+    """Serve ``/metrics`` and ``/summary`` of ``telemetry`` from a background thread."""
+
+    class MetricsHandler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/metrics":
+                body, content_type = telemetry.prometheus(), "text/plain; version=0.0.4"
+            elif self.path == "/summary":
+                body, content_type = json.dumps(telemetry.summary()), "application/json"
+            else:
+                self.send_error(404)
+                return
+            body = body.encode()
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
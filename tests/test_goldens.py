@@ -0,0 +1,20 @@
+"""Golden frames of every scene, checked by ``goldens.py`` (see its docstring)."""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+# Scenes can only be rasterized where manim's Cairo and Pango bindings load
+pytest.importorskip("cairo")
+pytest.importorskip("manimpango")
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_goldens():
+    result = subprocess.run(
+        [sys.executable, "goldens.py"], cwd=ROOT, capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
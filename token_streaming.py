@@ -0,0 +1,130 @@
+from manim import *
+import numpy as np
+from collections import deque
+
+
+class TinyLanguageModel:
+    """A single-head, single-layer NumPy language model with a sliding KV cache.
+
+    It is only meant to drive the inference animation, so the weights are random.
+    Keys and values live in a preallocated ring buffer of ``window`` rows, which
+    keeps the cost of every generation step constant no matter how long the
+    response gets.
+
+    Any object with a ``generate(prompt, max_new_tokens)`` method yielding
+    ``(token, key, value)`` tuples can stand in for this model.
+    """
+
+    def __init__(self, vocab, d_model=16, window=64, seed=0):
+        self.vocab = list(dict.fromkeys(vocab))
+        self.token_ids = {token: i for i, token in enumerate(self.vocab)}
+        self.d_model = d_model
+        self.window = window
+
+        rng = np.random.default_rng(seed)
+        scale = 1 / np.sqrt(d_model)
+        self.embeddings = rng.normal(0, 1, (len(self.vocab), d_model))
+        self.w_q = rng.normal(0, scale, (d_model, d_model))
+        self.w_k = rng.normal(0, scale, (d_model, d_model))
+        self.w_v = rng.normal(0, scale, (d_model, d_model))
+        self.w_out = rng.normal(0, scale, (d_model, len(self.vocab)))
+
+        self.keys = np.zeros((window, d_model))
+        self.values = np.zeros((window, d_model))
+        self.length = 0
+
+    def reset(self):
+        self.length = 0
+
+    def step(self, token):
+        """Append one token to the cache and return (logits, key, value)."""
+        x = self.embeddings[self.token_ids[token]]
+        slot = self.length % self.window
+        self.keys[slot] = x @ self.w_k
+        self.values[slot] = x @ self.w_v
+        self.length += 1
+
+        used = min(self.length, self.window)
+        scores = self.keys[:used] @ (x @ self.w_q) / np.sqrt(self.d_model)
+        weights = np.exp(scores - scores.max())
+        weights /= weights.sum()
+        context = weights @ self.values[:used]
+
+        logits = (x + context) @ self.w_out
+        return logits, self.keys[slot].copy(), self.values[slot].copy()
+
+    def generate(self, prompt, max_new_tokens, script=None):
+        """Yield (token, key, value) for every generated token.
+
+        With ``script`` the model is teacher-forced onto the given tokens, so the
+        explainer can show a readable answer while still filling a real cache.
+        """
+        self.reset()
+        logits = None
+        for token in prompt:
+            logits, _, _ = self.step(token)
+
+        for i in range(max_new_tokens):
+            if script is not None:
+                if i >= len(script):
+                    return
+                token = script[i]
+            else:
+                token = self.vocab[int(np.argmax(logits))]
+            logits, key, value = self.step(token)
+            yield token, key, value
+
+
+class KVCachePanel(VGroup):
+    """A panel with one key row and one value row that grows a cell per token.
+
+    Only the frame and labels belong to the group; cells are returned to the
+    caller so they can be added to the scene on their own, and at most
+    ``max_columns`` of them are kept on screen.
+    """
+
+    def __init__(self, max_columns=12, cell_size=0.22, **kwargs):
+        self.cell_size = cell_size
+        self.max_columns = max_columns
+        frame = Rectangle(
+            width=max_columns * cell_size + 0.9,
+            height=2 * cell_size + 0.5,
+            fill_opacity=0.1,
+            color=WHITE
+        )
+        title = Text("KV Cache", font_size=16).next_to(frame, UP, buff=0.1)
+        key_label = Text("K", font_size=14)
+        value_label = Text("V", font_size=14)
+        key_label.move_to(frame.get_left() + RIGHT * 0.3 + UP * cell_size * 0.6)
+        value_label.move_to(frame.get_left() + RIGHT * 0.3 + DOWN * cell_size * 0.6)
+        super().__init__(frame, title, key_label, value_label, **kwargs)
+        self.frame = frame
+        self.key_label = key_label
+        self.value_label = value_label
+        self.columns = deque()
+
+    def cell(self, vector, color, row_label):
+        # Map the vector's mean activation to the cell's brightness
+        strength = 1 / (1 + np.exp(-3 * float(np.mean(vector))))
+        return Square(
+            side_length=self.cell_size * 0.85,
+            stroke_width=1,
+            fill_color=color,
+            fill_opacity=0.2 + 0.7 * strength
+        ).set_y(row_label.get_y())
+
+    def append(self, key, value):
+        """Add one cache column and return (new_column, dropped_columns)."""
+        dropped = []
+        if len(self.columns) == self.max_columns:
+            dropped = [self.columns.popleft()]
+            for column in self.columns:
+                column.shift(LEFT * self.cell_size)
+
+        column = VGroup(
+            self.cell(key, BLUE, self.key_label),
+            self.cell(value, GREEN, self.value_label)
+        )
+        column.set_x(self.key_label.get_right()[0] + self.cell_size * (len(self.columns) + 0.8))
+        self.columns.append(column)
+        return column, dropped
@@ -0,0 +1,196 @@
+"""Train the scene's network for many epochs, streaming the loss into a live plot.
+
+Usage::
+
+    run = TrainingRun([3, 5, 4, 2])
+    curve = StreamingCurve(axes, color=YELLOW)
+    self.add(curve)
+    self.play(Train(run, edges, curve, epochs=20000, run_time=8))
+
+    python training.py --epochs 20000     # time the training and the curve
+
+``TrainingRun`` is a small tanh network with NumPy weights, trained by
+full-batch gradient descent on a synthetic classification task sized to the
+network's input and output layers. ``Train`` runs its epochs over the length
+of an animation: every frame it takes the epochs due, appends their losses to
+the curve and sets each edge's width from the magnitude of its weight's
+latest gradient. In a skipped animation the epochs all run at the end, so the
+network always ends up the same.
+
+A ``StreamingCurve`` never rebuilds a graph. Appended values go into at most
+``max_points`` buckets of ``stride`` values each; when the buckets are full,
+neighbours are merged and the stride doubles. Each frame draws at most
+``max_points`` corners, however many values came in, and appending costs O(1)
+amortized.
+"""
+
+from manim import *
+import argparse
+import numpy as np
+import time
+
+MAX_DISPLAY_POINTS = 512
+
+
+def synthetic_dataset(inputs, classes, samples, rng):
+    """Points in a cube, labelled by which of a few random waves is highest."""
+    points = rng.uniform(-1, 1, (samples, inputs))
+    directions = rng.standard_normal((inputs, classes))
+    return points, np.argmax(np.sin(2 * points @ directions), axis=1)
+
+
+class TrainingRun:
+    """A tanh network with ``layer_sizes`` and the data it learns from."""
+
+    def __init__(self, layer_sizes, samples=256, learning_rate=0.05, seed=0):
+        rng = np.random.default_rng(seed)
+        self.inputs, self.labels = synthetic_dataset(layer_sizes[0], layer_sizes[-1], samples, rng)
+        self.weights = [
+            rng.standard_normal((fan_in, fan_out)) / np.sqrt(fan_in)
+            for fan_in, fan_out in zip(layer_sizes, layer_sizes[1:])
+        ]
+        self.biases = [np.zeros(fan_out) for fan_out in layer_sizes[1:]]
+        self.learning_rate = learning_rate
+        self.epoch = 0
+
+    def forward(self):
+        activations = [self.inputs]
+        for index, (weights, biases) in enumerate(zip(self.weights, self.biases)):
+            outputs = activations[-1] @ weights + biases
+            activations.append(outputs if index == len(self.weights) - 1 else np.tanh(outputs))
+        return activations
+
+    def loss(self):
+        return self.step(update=False)[0]
+
+    def step(self, update=True):
+        """One epoch; returns the loss and the gradient of every weight matrix."""
+        activations = self.forward()
+        logits = activations[-1] - activations[-1].max(axis=1, keepdims=True)
+        probabilities = np.exp(logits)
+        probabilities /= probabilities.sum(axis=1, keepdims=True)
+        rows = np.arange(len(self.labels))
+        loss = -np.log(probabilities[rows, self.labels] + 1e-12).mean()
+
+        delta = probabilities
+        delta[rows, self.labels] -= 1
+        delta /= len(self.labels)
+        gradients = [None] * len(self.weights)
+        for index in reversed(range(len(self.weights))):
+            gradients[index] = activations[index].T @ delta
+            bias_gradient = delta.sum(axis=0)
+            if index:
+                delta = (delta @ self.weights[index].T) * (1 - activations[index] ** 2)
+            if update:
+                self.weights[index] -= self.learning_rate * gradients[index]
+                self.biases[index] -= self.learning_rate * bias_gradient
+        if update:
+            self.epoch += 1
+        return loss, gradients
+
+
+class StreamingCurve(VMobject):
+    """A curve on ``axes`` that grows by appending values, drawn with at most ``max_points`` corners."""
+
+    def __init__(self, axes, max_points=MAX_DISPLAY_POINTS, **kwargs):
+        self.axes = axes
+        self.max_points = max_points - max_points % 2
+        self.buckets = np.zeros((self.max_points, 2))
+        self.size = 0
+        self.stride = 1
+        self.pending = np.zeros(2)
+        self.pending_count = 0
+        self.count = 0
+        super().__init__(**kwargs)
+
+    def append(self, x, y):
+        self.count += 1
+        self.pending += (x, y)
+        self.pending_count += 1
+        if self.pending_count < self.stride:
+            return self
+        self.buckets[self.size] = self.pending / self.stride
+        self.size += 1
+        self.pending[:] = 0
+        self.pending_count = 0
+        if self.size == self.max_points:
+            # Halve the resolution: every pair of buckets becomes one
+            self.buckets[: self.size // 2] = (self.buckets[0::2] + self.buckets[1::2]) / 2
+            self.size //= 2
+            self.stride *= 2
+        return self
+
+    def values(self):
+        """The decimated ``(x, y)`` pairs to draw, the unfinished bucket last."""
+        values = self.buckets[: self.size]
+        if self.pending_count:
+            values = np.vstack([values, self.pending / self.pending_count])
+        return values
+
+    def redraw(self):
+        values = self.values()
+        if len(values) < 2:
+            self.clear_points()
+            return self
+        origin = self.axes.c2p(0, 0)
+        x_unit, y_unit = self.axes.c2p(1, 0) - origin, self.axes.c2p(0, 1) - origin
+        self.set_points_as_corners(origin + values[:, :1] * x_unit + values[:, 1:] * y_unit)
+        return self
+
+
+class Train(Animation):
+    """Runs ``epochs`` epochs of ``run``, streaming the loss and pulsing ``edges``."""
+
+    def __init__(self, run, edges, curve, epochs, min_width=0.5, max_width=5, rate_func=linear, **kwargs):
+        self.run = run
+        self.curve = curve
+        self.epochs = epochs
+        self.min_width = min_width
+        self.max_width = max_width
+        self.done = 0
+        # Animating the edges makes the scene redraw them and everything added after
+        super().__init__(edges, rate_func=rate_func, **kwargs)
+
+    def interpolate_mobject(self, alpha):
+        target = int(round(self.rate_func(alpha) * self.epochs))
+        gradients = None
+        while self.done < target:
+            loss, gradients = self.run.step()
+            self.curve.append(self.run.epoch, loss)
+            self.done += 1
+        if gradients is not None:
+            self.curve.redraw()
+            self.pulse(gradients)
+
+    def pulse(self, gradients):
+        magnitudes = np.concatenate([np.abs(gradient).ravel() for gradient in gradients])
+        widths = interpolate(self.min_width, self.max_width, magnitudes / max(magnitudes.max(), 1e-12))
+        for edge, width in zip(self.mobject, widths):
+            edge.set_stroke(width=width)
+
+    def update_mobjects(self, dt):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--epochs", type=int, default=20000)
+    parser.add_argument("--layers", type=int, nargs="+", default=[3, 5, 4, 2])
+    args = parser.parse_args()
+
+    run = TrainingRun(args.layers)
+    curve = StreamingCurve(Axes(x_range=[0, args.epochs], y_range=[0, 1]))
+    started = time.perf_counter()
+    for _ in range(args.epochs):
+        loss, _ = run.step()
+        curve.append(run.epoch, loss)
+    seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    curve.redraw()
+    redraw = time.perf_counter() - started
+    print(f"{args.epochs} epochs in {seconds:.2f}s, final loss {loss:.4f}")
+    print(f"{len(curve.values())} corners drawn for {curve.count} values, redraw {redraw * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""Re-render only the sections of a scene that changed, whenever its file is saved.
+
+Usage::
+
+    python watch.py backprop.py BackpropExplainer -q l
+
+A section is every ``self.<method>()`` statement in ``construct`` (for example
+``show_forward_pass``); the code before the first one is the ``intro``. On each
+save the file is parsed, every section is fingerprinted from its method's AST
+(plus the helper methods it calls), and only sections whose fingerprint changed
+are rendered again, together with any later section that reads ``self``
+attributes a re-rendered section writes or reads (reading ``self.network`` is
+enough to recolor it). Changing the intro, which is the rest of ``construct``,
+or a local module the scene imports (``instanced.py``, ``draft.py``, ...),
+re-renders everything. The other sections still run so the scene state is
+right, but with their animations skipped; when a snapshot of the first changed
+section is still valid (see ``snapshots.py``), the sections before it are not
+run at all. The latest video of every section is stitched into
+``media/watch/<Scene>.mp4``, which a video player can keep open as the preview.
+"""
+
+from manim import *
+from render import QUALITIES, load_scenes
+from sections import INTRO, analyze_sections, local_modules, sectioned
+from snapshots import SnapshotStore, resumable
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+
+def dirty_sections(sections, previous, stored):
+    """Names of the sections that need rendering again.
+
+    ``previous`` maps section names to the fingerprints of the last render and
+    ``stored`` is the set of sections that have a video on disk.
+    """
+    if previous.get(INTRO) != sections[0].fingerprint:
+        # The intro owns construct itself, so everything after it may have moved
+        return {section.name for section in sections}
+
+    dirty = set()
+    written = set()
+    for section in sections:
+        changed = previous.get(section.name) != section.fingerprint or section.name not in stored
+        if changed or section.reads & written:
+            dirty.add(section.name)
+            # Reading e.g. self.network is enough to recolor it for later sections
+            written |= section.writes | section.reads
+    return dirty
+
+
+def concat_videos(videos, output):
+    """Join videos without re-encoding, replacing ``output`` atomically."""
+    output = Path(output)
+    file_list = output.with_name(f"{output.stem}.txt")
+    file_list.write_text("".join(f"file '{Path(video).resolve().as_posix()}'\n" for video in videos))
+    partial = output.with_name(f"{output.stem}.partial{output.suffix}")
+    subprocess.run(
+        [
+            config.ffmpeg_executable,
+            "-y",
+            "-f", "concat",
+            "-safe", "0",
+            "-i", str(file_list),
+            "-c", "copy",
+            "-loglevel", "error",
+            str(partial),
+        ],
+        check=True,
+    )
+    # Swap atomically so a player reloading the preview never sees half a file
+    os.replace(partial, output)
+    return output
+
+
+class SectionWatcher:
+    """Keeps per-section videos of one scene and stitches them into a preview."""
+
+    def __init__(self, path, scene_name, quality="l"):
+        self.path = Path(path).resolve()
+        self.scene_name = scene_name
+        self.quality = quality
+        self.store = Path(config.media_dir) / "watch" / scene_name / QUALITIES[quality]
+        self.store.mkdir(parents=True, exist_ok=True)
+        self.manifest_path = self.store / "manifest.json"
+        self.preview_path = self.store.parent.parent / f"{scene_name}.mp4"
+
+    def load_manifest(self):
+        if self.manifest_path.exists():
+            return json.loads(self.manifest_path.read_text())
+        return {}
+
+    def section_video(self, name):
+        return self.store / f"{name}{config.movie_file_extension}"
+
+    def render(self):
+        sections = analyze_sections(self.path.read_text(), self.scene_name, self.path)
+        names = [section.name for section in sections]
+        previous = self.load_manifest()
+        stored = {name for name in names if self.section_video(name).exists()}
+        dirty = dirty_sections(sections, previous, stored)
+        if not dirty:
+            logger.info("No section changed")
+            return self.preview_path
+
+        logger.info("Rendering sections: %(s)s", {"s": ", ".join(n for n in names if n in dirty)})
+        config.quality = QUALITIES[self.quality]
+        config.input_file = str(self.path)
+        config.save_sections = True
+        # Import the local modules afresh too, or edits to them would not show
+        for module in local_modules(self.path):
+            sys.modules.pop(module.stem, None)
+        scene_class = sectioned(load_scenes(self.path)[self.scene_name], names[1:], dirty)
+        # Jump straight to the first changed section when its snapshot is still valid
+        snapshots = SnapshotStore(self.scene_name, sections)
+        first = next(name for name in names if name in dirty)
+        resume_from = first if first != INTRO and snapshots.is_valid(first) else None
+        scene = resumable(scene_class, snapshots, resume_from)()
+        scene.render()
+
+        # Keep the fresh section videos and remember what they were rendered from
+        file_writer = scene.renderer.file_writer
+        for section in file_writer.sections:
+            if section.video is not None and section.name in dirty:
+                shutil.copy(file_writer.sections_output_dir / section.video, self.section_video(section.name))
+        self.manifest_path.write_text(json.dumps(
+            {section.name: section.fingerprint for section in sections}, indent=4
+        ))
+        self.stitch(names)
+        return self.preview_path
+
+    def stitch(self, names):
+        videos = [self.section_video(name) for name in names if self.section_video(name).exists()]
+        concat_videos(videos, self.preview_path)
+        logger.info("Preview ready at %(p)s", {"p": str(self.preview_path)})
+
+    def watch(self, interval=0.5):
+        last_modified = None
+        while True:
+            try:
+                modified = [path.stat().st_mtime for path in [self.path, *local_modules(self.path)]]
+            except (OSError, SyntaxError):
+                # A module mid-save; look again next time
+                time.sleep(interval)
+                continue
+            if modified != last_modified:
+                last_modified = modified
+                try:
+                    self.render()
+                except Exception as error:
+                    # Keep watching through syntax errors and failing renders
+                    logger.error("Render failed: %(e)s", {"e": error})
+            time.sleep(interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("file", help="scene file, e.g. backprop.py")
+    parser.add_argument("scene", help="scene class name, e.g. BackpropExplainer")
+    parser.add_argument("-q", "--quality", choices=QUALITIES, default="l")
+    parser.add_argument("--once", action="store_true", help="render changed sections once and exit")
+    args = parser.parse_args()
+    watcher = SectionWatcher(args.file, args.scene, args.quality)
+    if args.once:
+        watcher.render()
+    else:
+        watcher.watch()
+
+
+if __name__ == "__main__":
+    main()